@@ -0,0 +1,58 @@
+"""
+Memory footprint of the slotted ports and sensors.
+
+Compares the memory allocated by N instances of the built-in (slotted) ports and sensors with the one of plain
+objects holding the same attributes in an instance dict, as the classes did before declaring ``__slots__``. The
+memory is measured with tracemalloc, and includes the attribute values created by the constructors (e.g. the flows
+of the ports), but not the name strings, which are shared.
+
+Usage::
+
+    python benchmarks/slots_memory.py [--n 20000]
+"""
+import argparse
+import tracemalloc
+import energy_system_control as esc
+from energy_system_control.core.port import HeatPort, FluidPort, ElectricPort
+
+
+def unslotted_copier(cls):
+    # Returns a function copying the attributes of an instance of cls to a plain object, where they are stored in an
+    # instance dict. Each class gets its own plain class, so that the instance dicts share their keys as they would
+    unslotted_cls = type(f'Unslotted{cls.__name__}', (), {})
+    return lambda obj: _copy_attributes(obj, unslotted_cls())
+
+
+def _copy_attributes(obj, copy):
+    for cls in type(obj).__mro__:
+        for name in getattr(cls, '__slots__', ()):
+            if hasattr(obj, name):
+                setattr(copy, name, getattr(obj, name))
+    return copy
+
+
+def allocated_bytes(factory, n: int) -> float:
+    # Memory allocated per instance [B]
+    tracemalloc.start()
+    objects = [factory() for _ in range(n)]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return allocated / n
+
+
+def main(n: int):
+    cases = [(HeatPort, ('port',)), (FluidPort, ('port',)), (ElectricPort, ('port',)),
+             (esc.TankTemperatureSensor, ('sensor', 'tank')), (esc.ElectricPowerSensor, ('sensor', 'port'))]
+    print(f'{"class":<24}{"slotted [B]":>14}{"instance dict [B]":>20}{"saving":>10}')
+    for cls, args in cases:
+        slotted_bytes = allocated_bytes(lambda: cls(*args), n)
+        copy = unslotted_copier(cls)
+        unslotted_bytes = allocated_bytes(lambda: copy(cls(*args)), n)
+        print(f'{cls.__name__:<24}{slotted_bytes:>14.0f}{unslotted_bytes:>20.0f}{1 - slotted_bytes / unslotted_bytes:>10.0%}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Memory footprint of the slotted ports and sensors')
+    parser.add_argument('--n', type=int, default=20000, help='Number of instances of each class')
+    main(parser.parse_args().n)
@@ -0,0 +1,86 @@
+"""
+Accuracy and cost of the tabulated water properties, against the constant properties.
+
+Reports:
+
+- the error of the constant properties (energy_system_control.constants.WATER) with respect to the reference data of
+  liquid water between 10 and 90°C, and the error of the table with respect to the splines it is built from
+- the cost of a lookup in the table and in the splines, for the layers of a tank and for a large array
+- the run time and the heat pump consumption of one week of a hot water system with a multi-node tank, with constant
+  properties, with the table (default update tolerance) and with the table refreshed at every step
+
+Usage::
+
+    python benchmarks/water_properties.py [--repeats 3]
+"""
+import argparse
+import time
+import timeit
+from importlib.resources import files
+import numpy as np
+from scipy.interpolate import CubicSpline
+import energy_system_control as esc
+from energy_system_control.constants import WATER, water_property_table
+from energy_system_control.constants.property_tables import _WATER_REFERENCE_DATA
+
+
+def build_system(**tank_kwargs):
+    dhw = esc.HotWaterDemand.from_csv(name='dhw', time_alignment='daily', path=files('energy_system_control.data') / 'DHW_profiles_IEA.csv', column_name='M')
+    return esc.Environment(
+        components=[dhw,
+                    esc.MultiNodeHotWaterTank(name='tank', tank_volume=200, T_0=55, number_of_layers=8, **tank_kwargs),
+                    esc.HeatPumpLorentzEfficiency(name='hp', Qdot_design=2.0, COP_design=3.0),
+                    esc.ElectricityGrid('grid'), esc.ColdWaterGrid('water', 'fluid')],
+        sensors=[esc.TankTemperatureSensor('T', 'tank')],
+        controllers=[esc.HeaterControllerWithBandwidth('c', 'hp', 'T', 45, 10)],
+        connections=[('dhw_fluid_port', 'tank_hot_water_output_port'), ('hp_heat_output_port', 'tank_main_heat_input_port'),
+                     ('hp_electricity_input_port', 'grid_electricity_port'), ('tank_cold_water_input_port', 'water_fluid_port')])
+
+
+def accuracy(table):
+    reference = _WATER_REFERENCE_DATA[1:10]  # 10-90°C
+    print(f'Constant rho: max error {np.abs(WATER.rho / reference[:, 1] - 1).max():.1%}')
+    print(f'Constant cp: max error {np.abs(WATER.cp / reference[:, 2] - 1).max():.1%}')
+    T = np.random.default_rng(0).uniform(283.15, 363.15, 100_000)
+    splines = {name: CubicSpline(_WATER_REFERENCE_DATA[:, 0] + 273.15, _WATER_REFERENCE_DATA[:, column]) for column, name in enumerate(('rho', 'cp', 'k'), start=1)}
+    for name, spline in splines.items():
+        print(f'Table {name}: max error with respect to the spline {np.abs(table.lookup(name, T) - spline(T)).max():.1e}')
+    return T, splines['cp']
+
+
+def lookup_cost(table, T, spline):
+    for size, number in ((8, 2000), (len(T), 20)):
+        T_lookup = T[:size]
+        table_time = timeit.timeit(lambda: table.cp(T_lookup), number=number) / number
+        spline_time = timeit.timeit(lambda: spline(T_lookup), number=number) / number
+        print(f'Lookup of {size} temperatures: {table_time * 1e6:.1f} us with the table, {spline_time * 1e6:.1f} us with the spline')
+
+
+def simulation(table, repeats: int):
+    cfg = esc.SimulationConfig(simulation_end_h=24 * 7, time_step_h=0.25)
+    cases = {'constant properties': {},
+             'table': {'fluid_properties': table},
+             'table, updated at every step': {'fluid_properties': table, 'property_update_tolerance': 0.0}}
+    for label, tank_kwargs in cases.items():
+        run_time = np.inf
+        for _ in range(repeats):
+            env = build_system(**tank_kwargs)
+            start = time.perf_counter()
+            results = esc.Simulator(env, cfg).run()
+            run_time = min(run_time, time.perf_counter() - start)
+        E_hp = results.get_cumulated_electricity('hp_electricity_input_port')
+        T_end = env.components['tank'].T_layer.mean() - 273.15
+        print(f'{label}: {run_time:.3f} s, E_hp {E_hp:.2f} kWh, final mean tank temperature {T_end:.1f}°C')
+
+
+def main(repeats: int):
+    table = water_property_table()
+    T, spline = accuracy(table)
+    lookup_cost(table, T, spline)
+    simulation(table, repeats)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Accuracy and cost of the tabulated water properties')
+    parser.add_argument('--repeats', type=int, default=3, help='Number of runs of each simulation (the fastest one is reported)')
+    main(parser.parse_args().repeats)
@@ -4,14 +4,15 @@ from .sim.config import SimulationConfig
 from .sim.simulator import Simulator
 from .components.explicit_components.producers import ConstantPowerProducer
 from .components.explicit_components.pv_panels import PVpanel, PVpanelFromPVGISData, PVpanelFromData, PVpanelFromPVGIS
-from .components.storage_units.thermal_storage import HotWaterStorage, MultiNodeHotWaterTank
+from .components.storage_units.thermal_storage import HotWaterStorage, MultiNodeHotWaterTank, HotWaterStorageFleet
 from .components.composite_components.batteries import LithiumIonBattery, Battery
-from .components.explicit_components.demands import ConstantPowerDemand, ElectricityDemand, HotWaterDemand
+from .components.storage_units.electric_storage import BatteryPack, BatteryPackFleet
+from .components.explicit_components.demands import ConstantPowerDemand, ElectricityDemand, HotWaterDemand, TimeSeriesDemandFleet, ElectricityDemandFleet, HotWaterDemandFleet
 from .components.grids.grids import ElectricityGrid, ColdWaterGrid
 from .components.composite_components.inverters import Inverter
 from .components.controlled_components.other_heat_sources import ResistanceHeater
-from .components.controlled_components.heat_pumps import HeatPumpConstantEfficiency, HeatPumpLorentzEfficiency, HeatPump
-from .controllers.base import HeaterControllerWithBandwidth, ChargeController
+from .components.controlled_components.heat_pumps import HeatPumpConstantEfficiency, HeatPumpLorentzEfficiency, HeatPumpPerformanceMap, HeatPump, HeatPumpFleet
+from .controllers.base import HeaterControllerWithBandwidth, HeaterFleetControllerWithBandwidth, ChargeController
 from .controllers.rule_based import HeatPumpRuleBasedController
 from .sensors.sensors import Sensor, PowerSensor, ElectricPowerSensor, FlowTemperatureSensor, SOCSensor, TankTemperatureSensor, HotWaterDemandSensor, SensorWithMemory
 
@@ -19,11 +20,12 @@ __all__ = [
     "Environment",
     "SimulationConfig", "Simulator",
     "PVpanel", "PVpanelFromPVGISData", "PVpanelFromData", "PVpanelFromPVGIS", "ConstantPowerProducer",
-    "HotWaterStorage", "LithiumIonBattery", "MultiNodeHotWaterTank", "Battery",
+    "HotWaterStorage", "LithiumIonBattery", "MultiNodeHotWaterTank", "Battery", "BatteryPack",
+    "HotWaterStorageFleet", "BatteryPackFleet", "TimeSeriesDemandFleet", "ElectricityDemandFleet", "HotWaterDemandFleet", "HeatPumpFleet",
     "HotWaterDemand", "ThermalLoss", "ConstantPowerDemand", "ElectricityDemand",
     "ResistanceHeater", "BalancingUtility", "ColdWaterGrid", "GenericUtility", "Inverter", "ElectricityGrid",
-    "HeatPumpLorentzEfficiency", "HeatPumpConstantEfficiency", "HeatPump",
-    "HeaterControllerWithBandwidth", "ChargeController",
+    "HeatPumpLorentzEfficiency", "HeatPumpConstantEfficiency", "HeatPumpPerformanceMap", "HeatPump",
+    "HeaterControllerWithBandwidth", "HeaterFleetControllerWithBandwidth", "ChargeController",
     "HeatPumpRuleBasedController", 
     "Sensor", "FlowTemperatureSensor", "PowerSensor", "TankTemperatureSensor", "SOCSensor", "ElectricPowerSensor", "HotWaterDemandSensor", "SensorWithMemory",
 ]
\ No newline at end of file
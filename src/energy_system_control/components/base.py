@@ -3,10 +3,12 @@ from dataclasses import dataclass
 import pandas as pd
 import numpy as np
 from datetime import datetime
+import copy
 from energy_system_control.core.port import Port
 from energy_system_control.sim.state import SimulationState
 from energy_system_control.core.base_classes import InitContext
-from energy_system_control.helpers import resample_with_interpolation, TimeAlignment
+from energy_system_control.helpers import TimeAlignment, PeriodicArray
+from energy_system_control.io.resample_cache import cached_resample_with_interpolation
 
 class Component:
     name: str
@@ -15,6 +17,15 @@ class Component:
     registry = {}
     ports_info: Dict[str, str]
     ports: Dict[str, Port]
+    # Internal sub-stepping (see advance): number of sub-steps per simulation step and, optionally, the tolerance on
+    # the internal state used to refine the sub-steps automatically (up to max_substeps)
+    n_substeps: int = 1
+    substep_tolerance: float | None = None
+    max_substeps: int = 64
+    # Optional batch stepping: a subclass can define a classmethod step_batch(components, state), equivalent to calling
+    # step on each of the given instances of the subclass. The simulator then steps the consecutive components of that
+    # class (without sub-steps) with a single call (see Simulator._simulate_components_of_type)
+    step_batch = None
     """Base class for components. Subclasses implement step(dt_s, nodes)."""
     def __init__(self, name: str, ports_info: Dict[str, str]):
         self.name = name
@@ -43,11 +54,94 @@ class Component:
     
     def step(self):
         pass
-    
+
+    def advance(self, state: SimulationState, action = None):
+        """
+        Simulates one step of the simulation. Components declaring ``n_substeps`` > 1 integrate their internal state
+        with that number of shorter steps, while the rest of the simulation advances at the global time step. The port
+        flows (rates) are held constant over the sub-steps.
+
+        If ``substep_tolerance`` is set, the number of sub-steps is chosen by step doubling: it is doubled (starting
+        from ``n_substeps``, or from half the number used at the previous step) until the internal states obtained with
+        n and 2n sub-steps differ by less than the tolerance. This requires ``get_internal_state`` and
+        ``set_internal_state``.
+        """
+        if self.n_substeps == 1 and self.substep_tolerance is None:
+            return self.step(state, action)
+        if self.substep_tolerance is None:
+            return self._run_substeps(state, action, self.n_substeps)
+        n_substeps = max(self.n_substeps, getattr(self, '_last_n_substeps', self.n_substeps) // 2)
+        initial_state = self.get_internal_state()
+        self._run_substeps(state, action, n_substeps)
+        coarse = self.get_internal_state()
+        while True:
+            self.set_internal_state(initial_state)
+            output = self._run_substeps(state, action, 2 * n_substeps)
+            fine = self.get_internal_state()
+            n_substeps *= 2
+            if n_substeps >= self.max_substeps or np.max(np.abs(fine - coarse)) <= self.substep_tolerance:
+                break
+            coarse = fine
+        self._last_n_substeps = n_substeps
+        return output
+
+    def _run_substeps(self, state: SimulationState, action, n_substeps: int):
+        substate = copy.copy(state)
+        substate.time_step = state.time_step / n_substeps
+        for k in range(n_substeps):
+            substate.time = state.time + k * substate.time_step
+            output = self.step(substate, action)
+        return output
+
+    def get_internal_state(self) -> np.ndarray:
+        """Returns a copy of the internal state of the component, as a numpy array (used by the error-controlled sub-stepping)"""
+        raise NotImplementedError(f'{type(self).__name__} does not support error-controlled sub-stepping')
+
+    def set_internal_state(self, internal_state: np.ndarray):
+        """Restores an internal state returned by get_internal_state"""
+        raise NotImplementedError(f'{type(self).__name__} does not support error-controlled sub-stepping')
+
+    def quiescent_dynamics(self, state: SimulationState):
+        """
+        Returns the coefficients (a, b) of the affine map ``x -> a * x + b`` that gives the internal state (as returned
+        by get_internal_state) after one step, if the port flows and the environmental data stay the same as in the
+        previous step. Used by the simulator to fast-forward over quiescent periods. Returns None if the component
+        cannot be integrated analytically, which disables the fast-forward.
+        """
+        return None
+
     def initialize(self, ctx: InitContext):
         pass
 
 
+class FleetComponent:
+    """
+    Mixin for fleet components, which represent n_units similar units (e.g. the hot water tanks of a neighbourhood)
+    as arrays behind a single set of ports, and step all of them at once. The flows of the ports are the totals of the
+    fleet, while the per-unit values are exchanged between connected fleets through Port.unit_flows and Port.unit_T.
+    """
+    n_units: int
+
+    def get_unit_flows(self, port_name: str, layer: str) -> np.ndarray:
+        # If the port is connected to a single component, its flow is split evenly among the units
+        port = self.ports[port_name]
+        if port.unit_flows is not None and layer in port.unit_flows:
+            return port.unit_flows[layer]
+        return np.full(self.n_units, port.flows[layer] / self.n_units)
+
+    def set_unit_flows(self, port_name: str, **flows: np.ndarray):
+        port = self.ports[port_name]
+        if port.unit_flows is None:
+            port.unit_flows = {}
+        for layer, values in flows.items():
+            port.unit_flows[layer] = values
+            port.flows[layer] = float(values.sum())
+
+    def get_unit_temperature(self, port_name: str) -> np.ndarray:
+        port = self.ports[port_name]
+        return port.unit_T if port.unit_T is not None else np.full(self.n_units, port.T)
+
+
 class ExplicitComponent(Component):
     # Definition of a component that does not depend on anything else to be simulated
     def does_something(self):
@@ -172,48 +266,31 @@ class TimeSeriesData:
     var_type: Literal['energy', 'power', 'volume', 'mass', 'temperature']
     var_unit: Literal['Wh', 'kWh', 'MWh', 'W', 'kW', 'MW', 'l', 'm3', 'kg', 'C', 'K']
     time_alignment: TimeAlignment
-    data: np.ndarray | None = None
+    data: np.ndarray | PeriodicArray | None = None
     energy_to_power_converter = {'Wh': 1e-3, 'kWh': 1.0, 'J': 1.0/3_600_000, 'kJ': 1.0/3600}
 
     def resample(self, 
                  time_step_h: float, 
                  simulation_end_h: float, 
                  simulation_start_datetime: datetime | None = None):
-        # Resamples the raw data to the format required 
-        if self.raw is not None:
-            target_freq = f"{int(time_step_h*3600)}s"
-            if self.var_type == 'temperature':
-                self.data = resample_with_interpolation(df = self.raw, 
-                                                        target_freq = target_freq,
-                                                        simulation_end_s = simulation_end_h*3600.0,
-                                                        simulation_start_datetime = simulation_start_datetime,
-                                                        time_alignment = self.time_alignment,
-                                                        var_type="intensive")
-            if self.var_type == 'power':
-                self.data = resample_with_interpolation(df = self.raw, 
-                                                        target_freq = target_freq,
-                                                        simulation_end_s = simulation_end_h*3600.0,
-                                                        simulation_start_datetime = simulation_start_datetime,
-                                                        time_alignment = self.time_alignment,
-                                                        var_type="intensive")
-                if self.var_unit[0] != 'k':
-                    self.data = self.data * 1.0e-3
-            elif self.var_type == 'energy':
-                self.data = resample_with_interpolation(df = self.raw, 
-                                                        target_freq = target_freq,
-                                                        simulation_end_s = simulation_end_h*3600.0,
-                                                        simulation_start_datetime = simulation_start_datetime,
-                                                        time_alignment = self.time_alignment,
-                                                        var_type="extensive")
-                self.data = self.data * (1.0 / time_step_h) * self.energy_to_power_converter[self.var_unit]
-            elif self.var_type in {'volume', 'mass'}:
-                self.data = resample_with_interpolation(df = self.raw, 
-                                                        target_freq = target_freq,
-                                                        simulation_end_s = simulation_end_h*3600.0,
-                                                        simulation_start_datetime = simulation_start_datetime,
-                                                        time_alignment = self.time_alignment,
-                                                        var_type="extensive")
-            else:
-                raise(ValueError, f'Unknown variable type {self.var_type}')
+        # Resamples the raw data to the format required. Results are cached, so that repeated runs with the same raw
+        # data and settings do not repeat the resampling (see energy_system_control.io.resample_cache)
+        if self.raw is None:
+            raise ValueError('No raw data available to resample for TimeSeriesDemand object')
+        if self.var_type in {'temperature', 'power'}:
+            resampling_type = "intensive"
+        elif self.var_type in {'energy', 'volume', 'mass'}:
+            resampling_type = "extensive"
         else:
-            raise(ValueError, 'No raw data available to resample for TimeSeriesDemand object')
\ No newline at end of file
+            raise ValueError(f'Unknown variable type {self.var_type}')
+        self.data = cached_resample_with_interpolation(self.raw,
+                                                       periodic = True,
+                                                       target_freq = f"{int(time_step_h*3600)}s",
+                                                       simulation_end_s = simulation_end_h*3600.0,
+                                                       simulation_start_datetime = simulation_start_datetime,
+                                                       time_alignment = self.time_alignment,
+                                                       var_type = resampling_type)
+        if self.var_type == 'power' and self.var_unit[0] != 'k':
+            self.data = self.data * 1.0e-3
+        elif self.var_type == 'energy':
+            self.data = self.data * (1.0 / time_step_h) * self.energy_to_power_converter[self.var_unit]
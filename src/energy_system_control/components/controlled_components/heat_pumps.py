@@ -1,7 +1,9 @@
 from energy_system_control.components.controlled_components.base import HeatSource
-from energy_system_control.helpers import OnOffComponentError, C2K
+from energy_system_control.components.base import FleetComponent
+from energy_system_control.helpers import OnOffComponentError, C2K, bilinear_interpolation
 from energy_system_control.sim.state import SimulationState
 from abc import abstractmethod
+import numpy as np
 
 class HeatPump(HeatSource):
     def __init__(self, name: str, Qdot_design: float, COP_design: float):
@@ -18,6 +20,14 @@ class HeatPump(HeatSource):
             raise OnOffComponentError(f'The control input to the component {self.name} of type "HeatPumpConstantEfficiency" should be either 1 or 0. {action} was provided at time step {state.time}')
         return super().step(state, action)
 
+    @abstractmethod
+    def get_performance(self, T_air, T_water):
+        """
+        Returns the heat output [kW] and the COP [-] of the heat pump for arrays of ambient air and water temperatures [K],
+        e.g. to build the forecasts used by MPC models
+        """
+        raise NotImplementedError
+
 
 class HeatPumpConstantEfficiency(HeatPump):
     def __init__(self, name: str, Qdot_design: float, COP_design: float):
@@ -29,6 +39,10 @@ class HeatPumpConstantEfficiency(HeatPump):
     def get_heat_output(self, state: SimulationState):
         return self.Qdot_design
 
+    def get_performance(self, T_air, T_water):
+        shape = np.broadcast_shapes(np.shape(T_air), np.shape(T_water))
+        return np.full(shape, self.Qdot_design), np.full(shape, self.COP_design)
+
     
 class HeatPumpLorentzEfficiency(HeatPump):
     COP_design: float
@@ -110,4 +124,134 @@ class HeatPumpLorentzEfficiency(HeatPump):
         return self._get_efficiency(state.environmental_data.temperature_ambient, self.ports[self.heat_output_port_name].T)
     
     def _get_efficiency(self, T_air, T_water):
-        return self.eta_lorentz * self.calculate_Carnot_COP(T_air, T_water)
\ No newline at end of file
+        return self.eta_lorentz * self.calculate_Carnot_COP(T_air, T_water)
+
+    def get_performance(self, T_air, T_water):
+        T_air, T_water = np.broadcast_arrays(np.asarray(T_air, dtype=float), np.asarray(T_water, dtype=float))
+        return np.broadcast_to(self._get_heat_output(T_air, T_water), T_air.shape).copy(), self._get_efficiency(T_air, T_water)
+
+
+class HeatPumpPerformanceMap(HeatPump):
+    T_air_grid: np.ndarray
+    T_water_grid: np.ndarray
+    heat_output_map: np.ndarray
+    COP_map: np.ndarray
+    def __init__(self, name: str, T_air: np.ndarray, T_water: np.ndarray, COP: np.ndarray, Qdot: np.ndarray | float, T_air_design: float = 7, T_water_design: float = 40):
+        """
+        Model of heat pump based on a performance map, e.g. from the data of the manufacturer: the COP and the heat output
+        are given on a grid of ambient air and water temperatures, and bilinearly interpolated between the points of the grid.
+        Outside of the grid, the values at its boundary are used.
+
+        Parameters
+        ----------
+        name : str
+            Name of the component
+        T_air: np.ndarray
+            Increasing values of the ambient air temperature [°C] of the grid
+        T_water: np.ndarray
+            Increasing values of the storage temperature [°C] of the grid
+        COP: np.ndarray
+            The values of the COP [-], with shape (len(T_air), len(T_water))
+        Qdot: np.ndarray | float
+            The values of the heat output [kW], with shape (len(T_air), len(T_water)). A single value means a constant heat output
+        T_air_design: float, optional
+            The value of the ambient air temperature [°C] at which the design values Qdot_design and COP_design are calculated. Defaults to 7°C
+        T_water_design: float, optional
+            The value of the storage temperature [°C] at which the design values Qdot_design and COP_design are calculated. Defaults to 40°C
+        """
+        self.T_air_grid = C2K(np.asarray(T_air, dtype=float))
+        self.T_water_grid = C2K(np.asarray(T_water, dtype=float))
+        shape = (len(self.T_air_grid), len(self.T_water_grid))
+        if min(shape) < 2 or np.any(np.diff(self.T_air_grid) <= 0) or np.any(np.diff(self.T_water_grid) <= 0):
+            raise ValueError(f'The temperatures of the performance map of {name} must be increasing, with at least two values each')
+        self.COP_map = np.asarray(COP, dtype=float)
+        self.heat_output_map = np.broadcast_to(np.asarray(Qdot, dtype=float), shape).copy()
+        if self.COP_map.shape != shape:
+            raise ValueError(f'The COP map of {name} has shape {self.COP_map.shape}, while the grid of temperatures has shape {shape}')
+        # The two maps are interpolated together
+        self._maps = np.stack([self.heat_output_map, self.COP_map])
+        Qdot_design, COP_design = self.interpolate(C2K(T_air_design), C2K(T_water_design))
+        super().__init__(name = name, Qdot_design = Qdot_design, COP_design = COP_design)
+
+    @classmethod
+    def from_model(cls, name: str, heat_pump: HeatPump, T_air: np.ndarray = np.arange(-20.0, 36.0), T_water: np.ndarray = np.arange(35.0, 81.0), **kwargs):
+        """
+        Tabulates the performance of another heat pump model (e.g. a HeatPumpLorentzEfficiency) on a grid of temperatures [°C],
+        so that it is evaluated by interpolation during the simulation. The default grid (1 K resolution) covers the
+        operation of domestic hot water storages, where the water is warmer than the ambient air
+        """
+        heat_output, COP = heat_pump.get_performance(*np.meshgrid(C2K(np.asarray(T_air, dtype=float)), C2K(np.asarray(T_water, dtype=float)), indexing='ij'))
+        return cls(name = name, T_air = T_air, T_water = T_water, COP = COP, Qdot = heat_output, **kwargs)
+
+    def interpolate(self, T_air: float, T_water: float) -> tuple:
+        """Returns the heat output [kW] and the COP [-] for the given ambient air and water temperatures [K]"""
+        heat_output, COP = bilinear_interpolation(self.T_air_grid, self.T_water_grid, self._maps, T_air, T_water)
+        return float(heat_output), float(COP)
+
+    def get_performance(self, T_air, T_water):
+        return tuple(bilinear_interpolation(self.T_air_grid, self.T_water_grid, self._maps, T_air, T_water))
+
+    def get_heat_output(self, state: SimulationState):
+        return self.interpolate(state.environmental_data.temperature_ambient, self.ports[self.heat_output_port_name].T)[0]
+
+    def get_efficiency(self, state: SimulationState):
+        return self.interpolate(state.environmental_data.temperature_ambient, self.ports[self.heat_output_port_name].T)[1]
+
+    def step(self, state: SimulationState, action):
+        if action not in {0.0, 1.0}:
+            raise OnOffComponentError(f'The control input to the component {self.name} of type "HeatPumpPerformanceMap" should be either 1 or 0. {action} was provided at time step {state.time}')
+        if action == 0.0:
+            heat_output = power_input = 0.0
+        else:
+            # The temperatures are read and the maps interpolated once per step
+            heat_output, COP = self.interpolate(state.environmental_data.temperature_ambient, self.ports[self.heat_output_port_name].T)
+            power_input = heat_output / COP
+        self.ports[self.heat_output_port_name].flows['heat'] = -heat_output
+        self.ports[self.power_input_port_name].flows[self.source_type] = power_input
+
+
+class HeatPumpFleet(FleetComponent, HeatPump):
+    model: HeatPump
+    size_factors: np.ndarray
+    def __init__(self, name: str, heat_pump: HeatPump, n_units: int, size_factors: float | np.ndarray = 1.0):
+        """
+        Fleet of n_units heat pumps sharing the performance of a heat pump model, simulated together as arrays. The
+        performance of all units is evaluated in one batched call to the get_performance method of the model. The
+        water temperature of each unit is read from the connected fleet (e.g. a HotWaterStorageFleet), and the ports
+        carry the totals of the fleet.
+
+        Parameters
+        ----------
+        name : str
+            Name of the component
+        heat_pump : HeatPump
+            The model of the units (e.g. a HeatPumpLorentzEfficiency or a HeatPumpPerformanceMap)
+        n_units : int
+            Number of heat pumps
+        size_factors : float | np.ndarray, optional
+            Factor scaling the heat output and the power input of each unit with respect to the model. Defaults to 1.0
+        """
+        self.model = heat_pump
+        self.n_units = n_units
+        self.size_factors = np.broadcast_to(np.asarray(size_factors, dtype=float), (n_units,)).copy()
+        super().__init__(name = name, Qdot_design = heat_pump.Qdot_design * float(self.size_factors.sum()), COP_design = heat_pump.COP_design)
+
+    def get_performance(self, T_air, T_water):
+        heat_output, COP = self.model.get_performance(T_air, T_water)
+        return heat_output * self.size_factors, COP
+
+    def get_heat_output(self, state: SimulationState):
+        return self.get_performance(state.environmental_data.temperature_ambient, self.get_unit_temperature(self.heat_output_port_name))[0]
+
+    def get_efficiency(self, state: SimulationState):
+        return self.get_performance(state.environmental_data.temperature_ambient, self.get_unit_temperature(self.heat_output_port_name))[1]
+
+    def step(self, state: SimulationState, action):
+        # The action is either the same for all units or an array with one value per unit
+        action = np.broadcast_to(np.asarray(action, dtype=float), (self.n_units,))
+        if not np.all((action == 0.0) | (action == 1.0)):
+            raise OnOffComponentError(f'The control inputs to the component {self.name} of type "HeatPumpFleet" should be either 1 or 0. {action} was provided at time step {state.time}')
+        heat_output, COP = self.get_performance(state.environmental_data.temperature_ambient, self.get_unit_temperature(self.heat_output_port_name))
+        heat_output = heat_output * action
+        self.set_unit_flows(self.heat_output_port_name, heat = -heat_output)
+        self.set_unit_flows(self.power_input_port_name, **{self.source_type: heat_output / COP})
@@ -1,10 +1,9 @@
 from energy_system_control.sim.state import SimulationState
-from energy_system_control.components.base import ExplicitComponent
+from energy_system_control.components.base import ExplicitComponent, FleetComponent
 from energy_system_control.helpers import *
-from energy_system_control.constants import WATER
 from energy_system_control.uncertainty import UncertaintyModel, NoUncertainty
 from energy_system_control.components.base import TimeSeriesData
-import os, yaml
+import os, yaml, zlib
 import numpy as np
 from importlib.resources import files
 from typing import List, Dict, Literal
@@ -27,13 +26,14 @@ class Demand(ExplicitComponent):
         super().__init__(name, {self.port_name: self.demand_type})
 
     def initialize(self, ctx) -> None:
-        # Create reproducible RNG per component.
-        if self.uncertainty_model is not NoUncertainty:
-            if not hasattr(ctx, "seed"):
-                raise(KeyError, 'The context information should include the seed for the uncertainty model')
-            else:
-                self.uncertainty_seed = ctx.seed
-                self._rng = np.random.default_rng(self.seed)
+        # Create reproducible RNG per component: the seed is either the one of the component or the one of the
+        # simulation, and the name of the component is mixed in, so that demands sharing a seed get independent streams
+        if not isinstance(self.uncertainty_model, NoUncertainty) and self.uncertainty_model is not NoUncertainty:
+            seed = self.uncertainty_seed
+            if seed is None and getattr(ctx, "config", None):
+                seed = ctx.config.get('seed')
+            self._rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(zlib.crc32(self.name.encode()),)))
+            self.uncertainty_model.reset()
 
     def _apply_uncertainty(self, value: float, time_id: int) -> float:
         return self.uncertainty_model.apply(value, rng=self._rng)
@@ -51,6 +51,7 @@ class ConstantPowerDemand(Demand):
 class TimeSeriesDemand(Demand):
 
     demand_type: DemandType | None = None
+    data: np.ndarray | PeriodicArray | None = None  # The demand [kW] used in the simulation: ts.data, with the uncertainty applied
 
     def __init__(self, 
                  name: str, 
@@ -174,6 +175,13 @@ class TimeSeriesDemand(Demand):
             simulation_end_h=simulation_end_h, 
             simulation_start_datetime=simulation_start_datetime)
         self.ts.data = self.ts.data * self.rescale_factor
+        self.data = self.ts.data
+
+    def initialize(self, ctx) -> None:
+        super().initialize(ctx)
+        # The noise of the whole run is generated at once, leaving ts.data (e.g. used by the predictors) unchanged
+        if self.data is not None and hasattr(self, '_rng'):
+            self.data = self.uncertainty_model.apply_array(self.ts.data, rng=self._rng)
     
 
 class ElectricityDemand(TimeSeriesDemand):
@@ -212,7 +220,7 @@ class ElectricityDemand(TimeSeriesDemand):
         )
 
     def step(self, state: SimulationState, action = None):
-        temp_kW = self.ts.data[state.time_id]  # This calculates the required power in kW (note: time step is in [s], read value in [kWh], hence the 3600)
+        temp_kW = self.data[state.time_id]  # This calculates the required power in kW (note: time step is in [s], read value in [kWh], hence the 3600)
         self.ports[self.port_name].flows['electricity'] = temp_kW  # Value in kJ
 
 
@@ -258,15 +266,16 @@ class HotWaterDemand(TimeSeriesDemand):
     def step(self, state: SimulationState, action = None):
         T_cold_water = state.environmental_data.temperature_cold_water
         T_hot_water = self.ports[self.port_name].T 
-        demand_kW = self.ts.data[state.time_id]  # This calculates the required power in kW (note: time step is in [s], read value in [kWh], hence the 3600)
+        cp = self.ports[self.port_name].specific_heat()  # Same specific heat as the component supplying the hot water
+        demand_kW = self.data[state.time_id]  # This calculates the required power in kW (note: time step is in [s], read value in [kWh], hence the 3600)
         if demand_kW > 0:
             pass
-        mdot_dhw_th = demand_kW / WATER.cp / (self.T_ref - T_cold_water)  # Theroetical hot water mass flow, in kg/s
+        mdot_dhw_th = demand_kW / cp / (self.T_ref - T_cold_water)  # Theroetical hot water mass flow, in kg/s
         if T_hot_water > self.T_ref:
             mdot = mdot_dhw_th * (self.T_ref - T_cold_water) / (T_hot_water - T_cold_water)  # Actual hot water mass flow, in kg/s
         else:
             mdot = mdot_dhw_th
-        Qdot = mdot * WATER.cp * T_hot_water  # Enthalpy flow output, in kW
+        Qdot = mdot * cp * T_hot_water  # Enthalpy flow output, in kW
         # Remember: flows are POSITIVE if they ENTER the component
         self.ports[self.port_name].flows['heat'] = Qdot
         self.ports[self.port_name].flows['mass'] = mdot
@@ -294,4 +303,97 @@ class HotWaterDemand(TimeSeriesDemand):
             var_unit=var_unit,
             rescale_factor=rescale_factor,
             **kwargs,
-        )
\ No newline at end of file
+        )
+
+
+class TimeSeriesDemandFleet(FleetComponent, TimeSeriesDemand):
+    """
+    Fleet of n_units demands, each based on its own time series, simulated together as arrays behind a single port.
+    After resampling, ``data`` holds the demands [kW] with shape (n_steps, n_units), while ``ts`` holds the total of
+    the fleet, which is used e.g. by the predictors.
+
+    Parameters
+    ----------
+    name : str
+        Name of the component
+    ts_data : List[TimeSeriesData]
+        The time series of the units
+    demand_type : str, optional
+        The type of demand. Can be omitted for the subclasses
+    rescale_factor : float | np.ndarray, optional
+        Factor to rescale the data, either the same for all units or one value per unit. Default is 1.0
+    """
+    data: np.ndarray | None = None
+
+    def __init__(self,
+                 name: str,
+                 ts_data: List[TimeSeriesData],
+                 demand_type: str | None = None,
+                 rescale_factor: float | np.ndarray = 1.0,
+                 **kwargs):
+        self.units_ts = list(ts_data)
+        self.n_units = len(self.units_ts)
+        super().__init__(name, ts_data = None, demand_type = demand_type, rescale_factor = rescale_factor, **kwargs)
+
+    @classmethod
+    def from_dataframe(cls,
+                       name: str,
+                       df: pd.DataFrame,
+                       time_alignment: TimeAlignment,
+                       column_names: List[str] | None = None,
+                       var_type: VariableType = "energy",
+                       var_unit: VariableUnit = 'kWh',
+                       **kwargs):
+        """
+        Create a fleet from a DataFrame, where each column (or each of the column_names) is the demand of one unit
+        """
+        column_names = column_names if column_names is not None else list(df.columns)
+        ts_data = [TimeSeriesData(raw = df[column], time_alignment = time_alignment, var_type = var_type, var_unit = var_unit) for column in column_names]
+        return cls(name = name, ts_data = ts_data, **kwargs)
+
+    def resample_data(self, time_step_h: float, simulation_end_h: float, simulation_start_datetime: datetime):
+        for ts in self.units_ts:
+            ts.resample(time_step_h = time_step_h, simulation_end_h = simulation_end_h, simulation_start_datetime = simulation_start_datetime)
+        self.data = np.column_stack([np.asarray(ts.data) for ts in self.units_ts]) * np.asarray(self.rescale_factor, dtype = float)
+        self.ts = TimeSeriesData(raw = None, var_type = 'power', var_unit = 'kW', time_alignment = self.units_ts[0].time_alignment, data = self.data.sum(axis = 1))
+        self._nominal_data = self.data
+
+    def initialize(self, ctx) -> None:
+        Demand.initialize(self, ctx)
+        # Independent noise trajectories for the units
+        if self.data is not None and hasattr(self, '_rng'):
+            self.data = self.uncertainty_model.apply_array(self._nominal_data, rng=self._rng)
+
+
+class ElectricityDemandFleet(TimeSeriesDemandFleet):
+    """Fleet of electricity demands (see ElectricityDemand and TimeSeriesDemandFleet)"""
+    demand_type = "electricity"
+
+    def step(self, state: SimulationState, action = None):
+        self.set_unit_flows(self.port_name, electricity = self.data[state.time_id])
+
+
+class HotWaterDemandFleet(TimeSeriesDemandFleet):
+    """
+    Fleet of hot water demands (see HotWaterDemand and TimeSeriesDemandFleet). The temperature of the hot water of each
+    unit is read from the connected fleet (e.g. a HotWaterStorageFleet).
+
+    Parameters
+    ----------
+    reference_temperature : float, optional
+        Temperature [°C] at which the hot water is used. Defaults to 40°C
+    """
+    demand_type = "fluid"
+
+    def __init__(self, name: str, ts_data: List[TimeSeriesData], reference_temperature: float = 40, rescale_factor: float | np.ndarray = 1.0, **kwargs):
+        self.T_ref = C2K(reference_temperature)
+        super().__init__(name = name, ts_data = ts_data, rescale_factor = rescale_factor, **kwargs)
+
+    def step(self, state: SimulationState, action = None):
+        T_cold_water = state.environmental_data.temperature_cold_water
+        T_hot_water = self.get_unit_temperature(self.port_name)
+        cp = self.ports[self.port_name].specific_heat()
+        mdot_dhw_th = self.data[state.time_id] / cp / (self.T_ref - T_cold_water)  # Theoretical hot water mass flows, in kg/s
+        # Mixing with cold water when the hot water is above the reference temperature
+        mdot = np.where(T_hot_water > self.T_ref, mdot_dhw_th * (self.T_ref - T_cold_water) / np.maximum(T_hot_water - T_cold_water, 1e-9), mdot_dhw_th)
+        self.set_unit_flows(self.port_name, heat = mdot * cp * T_hot_water, mass = mdot)
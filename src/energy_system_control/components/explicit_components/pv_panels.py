@@ -2,7 +2,9 @@ from energy_system_control.components.base import TimeSeriesData
 from energy_system_control.components.explicit_components.producers import Producer
 from energy_system_control.helpers import *
 from energy_system_control.sim.state import SimulationState
-import os, requests
+from energy_system_control.core.base_classes import InitContext
+from energy_system_control.io.pvgis_cache import PVGISCache, cached_pvgis_hourly
+import os
 import numpy as np
 import pandas as pd
 from typing import Literal
@@ -74,7 +76,7 @@ class PVpanelFromPVGISData(PVpanelFromData):
 
 
 class PVpanelFromPVGIS(PVpanel):
-    def __init__(self, name: str, installed_power: float, latitude: float, longitude: float, tilt: float, azimuth: float, loss: float = 14, years: list[int] = [2023], time_alignment: TimeAlignment = 'yearly'):
+    def __init__(self, name: str, installed_power: float, latitude: float, longitude: float, tilt: float, azimuth: float, loss: float = 14, years: list[int] = [2023], time_alignment: TimeAlignment = 'yearly', cache: PVGISCache | None = None):
         """
         Reads data from PVGIS for the selected location. 
 
@@ -92,6 +94,8 @@ class PVpanelFromPVGIS(PVpanel):
             System losses [%] of the raw electric power generated. Defaults to 14.
         years: list[int]
             Years to be loaded from PVGis. Defaults to [2023]
+        cache: PVGISCache, optional
+            Cache of the PVGIS downloads. Defaults to the one returned by get_pvgis_cache
         """
         self.latitude = latitude
         self.longitude = longitude
@@ -100,6 +104,7 @@ class PVpanelFromPVGIS(PVpanel):
         self.loss = loss
         self.years = years
         self.installed_power = installed_power
+        self.cache = cache
         ts = TimeSeriesData(
             raw = self.pvgis_api_call(),
             var_type = 'power',
@@ -109,7 +114,6 @@ class PVpanelFromPVGIS(PVpanel):
         super().__init__(name, ts)
 
     def pvgis_api_call(self):
-        url_base = f"https://re.jrc.ec.europa.eu/api/v5_3/seriescalc?"
         pvgis_params = dict(
             lat = self.latitude,
             lon = self.longitude,
@@ -118,22 +122,19 @@ class PVpanelFromPVGIS(PVpanel):
             angle = self.tilt,
             azimuth = self.azimuth,
             startyear = self.years[0],
-            endyear = self.years[-1],
-            pvcalculation = 1,
-            outputformat = 'json')
-        params = "&".join([f'{key}={value}' for key, value in pvgis_params.items()])
-        url_pvcalc = f'{url_base}&{params}'
-        temp = pd.DataFrame(requests.get(url_pvcalc).json()['outputs']['hourly'])
-        temp['time'] = pd.to_datetime(temp['time'], format="%Y%m%d:%H%M", utc=False)
-        temp = temp.set_index('time')
-        return temp['P']
-        # row_json = json.loads(response.text)   
+            endyear = self.years[-1])
+        return cached_pvgis_hourly(pvgis_params, cache=self.cache)['P']
         #https://re.jrc.ec.europa.eu/api/PVcalc?lat=45&lon=8&peakpower=1&loss=14
 
 
 class PVpanelFromIrradiation(PVpanel):
     """
     PV panel model that calculates power output from solar irradiation.
+
+    When the environmental data provider holds the irradiation of the whole simulation (e.g. CustomEnvironmentalProvider)
+    and the environment has a location, the power output of all the time steps is computed at initialization and
+    stored in ``ts``, so that it can be read by predictors like PerfectTimeSeriesPredictor. Otherwise, the output is
+    calculated at each step from the current environmental data.
     """
 
     def __init__(self, name: str, tilt: float, azimuth: float, installed_power: float):
@@ -153,29 +154,54 @@ class PVpanelFromIrradiation(PVpanel):
         self.tilt = tilt
         self.azimuth = azimuth
         self.installed_power = installed_power
+        self._cos_tilt = np.cos(np.radians(tilt))
+        self._sin_tilt = np.sin(np.radians(tilt))
+        self._panel_az_rad = np.radians(azimuth)
 
-    def step(self, state: SimulationState, action=None):
-        env_data = state.environmental_data
-
-        # Convert angles to radians
-        tilt_rad = np.radians(self.tilt)
-        panel_az_rad = np.radians(self.azimuth)
-        sun_zenith_rad = np.radians(env_data.solar_zenith)
-        sun_az_rad = np.radians(env_data.solar_azimuth)
+    def resample_data(self, time_step_h: float, simulation_end_h: float, simulation_start_datetime: datetime | None = None):
+        pass  # The output is computed from the environmental data in initialize
+
+    def initialize(self, ctx: InitContext):
+        self.ts = None
+        env = ctx.environment
+        data = getattr(env.environmental_data_provider, 'data', None)
+        if not isinstance(data, dict) or not {'direct_irradiation', 'diffuse_irradiation'} <= data.keys() or env.latitude is None or env.longitude is None:
+            return
+        state = ctx.state
+        n_steps = min(len(data['direct_irradiation']), len(data['diffuse_irradiation']), len(state.time_vector_for_prediction))
+        timestamps = pd.DatetimeIndex(state.simulation_start_datetime + pd.to_timedelta(state.time_vector_for_prediction[:n_steps], unit='s'))
+        solar_zenith, solar_azimuth = calculate_solar_angles(env.latitude, env.longitude, timestamps)
+        power_output = self.power_output(np.asarray(data['direct_irradiation'][:n_steps], dtype=float),
+                                         np.asarray(data['diffuse_irradiation'][:n_steps], dtype=float),
+                                         solar_zenith.to_numpy(), solar_azimuth.to_numpy())
+        self.ts = TimeSeriesData(raw=pd.Series(power_output, index=timestamps), var_type='power', var_unit='kW',
+                                 time_alignment='datetime', data=power_output)
+
+    def power_output(self, direct_irradiation, diffuse_irradiation, solar_zenith, solar_azimuth):
+        """
+        AC power output [kW] for the given irradiation [W/m²] and solar angles [deg]. Works both with scalars and arrays
+        """
+        sun_zenith_rad = np.radians(solar_zenith)
 
         # Incidence angle
         cos_theta = (
-            np.cos(sun_zenith_rad) * np.cos(tilt_rad) +
-            np.sin(sun_zenith_rad) * np.sin(tilt_rad) * np.cos(sun_az_rad - panel_az_rad)
+            np.cos(sun_zenith_rad) * self._cos_tilt +
+            np.sin(sun_zenith_rad) * self._sin_tilt * np.cos(np.radians(solar_azimuth) - self._panel_az_rad)
         )
-        cos_theta = max(cos_theta, 0)
+        cos_theta = np.maximum(cos_theta, 0)
 
         # POA irradiance
-        poa_irradiation = env_data.direct_irradiation * cos_theta + env_data.diffuse_irradiation * (1 + np.cos(tilt_rad)) / 2
+        poa_irradiation = direct_irradiation * cos_theta + diffuse_irradiation * (1 + self._cos_tilt) / 2
 
         # AC power
-        power_output = poa_irradiation / 1000 * self.installed_power
+        return poa_irradiation / 1000 * self.installed_power
+
+    def step(self, state: SimulationState, action=None):
+        if self.ts is not None and state.time_id < len(self.ts.data):
+            power_output = self.ts.data[state.time_id]
+        else:
+            env_data = state.environmental_data
+            power_output = self.power_output(env_data.direct_irradiation, env_data.diffuse_irradiation, env_data.solar_zenith, env_data.solar_azimuth)
 
         # Update PV port
         self.ports[self.port_name].flows['electricity'] = -power_output
-
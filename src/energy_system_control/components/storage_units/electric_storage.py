@@ -1,6 +1,7 @@
-from energy_system_control.components.base import StorageUnit
+from energy_system_control.components.base import StorageUnit, FleetComponent
 from energy_system_control.sim.state import SimulationState
 from energy_system_control.core.base_classes import InitContext
+import numpy as np
 
 class BatteryPack(StorageUnit):
     port_name: str
@@ -47,6 +48,23 @@ class BatteryPack(StorageUnit):
         self.check_storage_state()
         self.SOC += self.ports[self.port_name].flows['electricity'] * state.time_step / self.max_capacity
         self.SOC -= self.SOC * self.self_discharge_rate / 3600 * self.max_capacity * state.time_step # The self discharge is input in fraction of current capacity per hour
+
+    def get_internal_state(self) -> np.ndarray:
+        return np.atleast_1d(np.array(self.SOC, dtype=float))
+
+    def set_internal_state(self, internal_state: np.ndarray):
+        self.SOC = float(internal_state[0])
+
+    def quiescent_dynamics(self, state: SimulationState):
+        # SOC -> (SOC + P * dt / capacity) * (1 - self discharge)
+        power = self._charging_power()
+        if power is None:
+            return None
+        retention = 1 - self.self_discharge_rate / 3600 * self.max_capacity * state.time_step
+        return np.atleast_1d(retention), np.atleast_1d(power * state.time_step / self.max_capacity * retention)
+
+    def _charging_power(self):
+        return self.ports[self.port_name].flows['electricity']
         
     def get_maximum_charge_power(self):
         return self.max_charging_power
@@ -61,4 +79,56 @@ class LithiumIonBatteryPack(BatteryPack):
     def __init__(self, name, capacity: float, SOC_0: float = 0.5, SOC_min: float = 0.3, SOC_max: float = 0.9, self_discharge_rate: float = 0.025/30/24):
         super().__init__(name, capacity, SOC_0, self_discharge_rate)
         self.SOC_min = SOC_min
-        self.SOC_max = SOC_max
\ No newline at end of file
+        self.SOC_max = SOC_max
+
+
+class BatteryPackFleet(FleetComponent, BatteryPack):
+    SOC: np.ndarray
+    def __init__(self, name, n_units: int, capacity: float | np.ndarray, SOC_0: float | np.ndarray = 0.5, self_discharge_rate: float = 0.0):
+        """
+        Fleet of n_units battery packs (see BatteryPack), simulated together as arrays. The electricity port carries the
+        total power of the fleet: if it is connected to a single component, the power is split evenly among the packs.
+        The SOC is an array with one value per pack.
+
+        Parameters
+        ----------
+        name : str
+            Name of the component
+        n_units : int
+            Number of battery packs
+        capacity : float | np.ndarray
+         	Design maximum energy capacity [kWh] of the packs, either the same for all packs or one value per pack
+        SOC_0 : float | np.ndarray, optional
+            State of charge [-] of the packs at simulation start. Defaults to 0.5
+        self_discharge_rate: float, optional
+            Self discharge rate [-/h] of the packs. Defaults to 0.0 (no self-discharge)
+        """
+        self.n_units = n_units
+        super().__init__(name,
+                         capacity = np.broadcast_to(np.asarray(capacity, dtype=float), (n_units,)).copy(),
+                         SOC_0 = np.broadcast_to(np.asarray(SOC_0, dtype=float), (n_units,)).copy(),
+                         self_discharge_rate = self_discharge_rate)
+
+    def check_storage_state(self, state: SimulationState | None = None):
+        time = state.time if state is not None else None
+        if np.any(self.SOC > 1.0):
+            raise ValueError(f'Storage unit {self.name} has storage level higher than maximum allowed at time step {time}. Observed max SOC is {self.SOC.max()} while max value is 1.0')
+        elif np.any(self.SOC < 0.0):
+            raise ValueError(f'Storage unit {self.name} has storage level lower than minimum allowed at time step {time}. Observed min SOC is {self.SOC.min()} while min value is 0.0')
+
+    def initialize(self, ctx: InitContext):
+        self.SOC = self.SOC_0.copy()
+
+    def get_internal_state(self) -> np.ndarray:
+        return self.SOC.copy()
+
+    def set_internal_state(self, internal_state: np.ndarray):
+        self.SOC = np.array(internal_state, dtype=float)
+
+    def _charging_power(self):
+        return self.get_unit_flows(self.port_name, 'electricity')
+
+    def step(self, state: SimulationState, action):
+        self.check_storage_state(state)
+        self.SOC = self.SOC + self.get_unit_flows(self.port_name, 'electricity') * state.time_step / self.max_capacity
+        self.SOC -= self.SOC * self.self_discharge_rate / 3600 * self.max_capacity * state.time_step
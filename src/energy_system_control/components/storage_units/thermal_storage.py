@@ -1,10 +1,11 @@
-from energy_system_control.components.base import StorageUnit
+from energy_system_control.components.base import StorageUnit, FleetComponent
 from energy_system_control.helpers import *
 from energy_system_control.core.base_classes import InitContext
-from energy_system_control.constants import WATER
+from energy_system_control.constants import WATER, FluidPropertyTable
 from energy_system_control.sim.state import SimulationState
-from typing import Dict, List
-from scipy.linalg import solve_banded
+from typing import Dict, List, Literal
+from energy_system_control.helpers import solve_tridiagonal, factorize_tridiagonal, solve_factorized_tridiagonal
+from collections import OrderedDict
 import warnings, math
 
         
@@ -30,7 +31,10 @@ class HotWaterStorage(StorageUnit):
                  T_0: float = 40.0, 
                  convection_coefficient_losses: float = 0.8, 
                  located_inside: bool = True, 
-                 T_amb: float = 22):
+                 T_amb: float = 22,
+                 integration: Literal['euler', 'exponential'] = 'euler',
+                 n_substeps: int = 1,
+                 substep_tolerance: float | None = None):
         """
         Simplified model of hot water storage tank, assuming perfect mixing.
         Has potentially two heat sources: main and auxiliary
@@ -51,7 +55,20 @@ class HotWaterStorage(StorageUnit):
             Defines the location where the tank is placed. If True the heat losses are calculated assuming T_amb. If False, the outer air temperature is used. Defaults to True
         T_amb: float, optional
             Temperature [°C] used to calculate heat losses to the ambient from the tank if located_inside is True. Defaults to 22.0
+        integration: str, optional
+            Time integration of the energy balance. "euler" uses an explicit Euler step. "exponential" integrates the
+            linear heat losses exactly over the time step (the other heat flows are constant within the step), which
+            stays accurate and stable with longer time steps. Defaults to "euler"
+        n_substeps: int, optional
+            Number of internal sub-steps per simulation step (see Component.advance). Defaults to 1
+        substep_tolerance: float, optional
+            Tolerance [K] on the tank temperature(s) used to refine the sub-steps automatically. Defaults to None (fixed number of sub-steps)
         """
+        if integration not in ('euler', 'exponential'):
+            raise ValueError(f'Unknown integration method "{integration}" for {name}. Valid options are "euler" and "exponential"')
+        self.integration = integration
+        self.n_substeps = n_substeps
+        self.substep_tolerance = substep_tolerance
         self.volume = tank_volume * 1e-3  # Volume input is in liters, so it is converted to m3 to ensure the use of SI
         self.height = tank_height if tank_height else (self.volume * 16 / math.pi)**(1/3)  # based on the assumption of height over diameter equal to 2.0
         self.diameter = (4 * self.volume / self.height / math.pi)**0.5
@@ -83,9 +100,49 @@ class HotWaterStorage(StorageUnit):
             if input_port in self.ports.keys():
                 heat_input += self.ports[input_port].flows['heat']
         heat_fluid = self.ports[self.hot_water_output_port_name].flows['heat'] + self.ports[self.cold_water_input_port_name].flows['heat']
-        self.temperature += (heat_input + heat_fluid + heat_losses) * state.time_step / (WATER.cp * self.volume * WATER.rho)
+        heat_capacity = WATER.cp * self.volume * WATER.rho
+        loss_coefficient = self.convection_coefficient_losses * self.surface * 1e-3
+        if self.integration == 'exponential' and loss_coefficient > 0:
+            # dT/dt = (Q + UA * (T_amb - T)) / (m * cp): the temperature relaxes exponentially towards the equilibrium one
+            ambient_temperature = self.T_amb if self.located_inside else state.environmental_data.temperature_ambient
+            equilibrium_temperature = ambient_temperature + (heat_input + heat_fluid) / loss_coefficient
+            self.temperature = equilibrium_temperature + (self.temperature - equilibrium_temperature) * math.exp(-loss_coefficient * state.time_step / heat_capacity)
+        else:
+            self.temperature += (heat_input + heat_fluid + heat_losses) * state.time_step / heat_capacity
         self.SOC = self.temperature_to_SOC(state)
 
+    def get_internal_state(self) -> np.ndarray:
+        return np.array([self.temperature])
+
+    def set_internal_state(self, internal_state: np.ndarray):
+        self.temperature = float(internal_state[0])
+
+    def quiescent_dynamics(self, state: SimulationState):
+        if self.substep_tolerance is not None:
+            return None
+        heat_flows = [self.ports[port_name].flows['heat'] for port_name in self.heat_input_port_names + self.fluid_port_names if port_name in self.ports.keys()]
+        if None in heat_flows:
+            return None
+        return self._affine_step_coefficients(sum(heat_flows), state)
+
+    def _affine_step_coefficients(self, heat_flow, state: SimulationState):
+        # With constant heat flows, both integration methods give T -> a * T + b over one step (including the sub-steps)
+        heat_capacity = WATER.cp * self.volume * WATER.rho
+        loss_coefficient = self.convection_coefficient_losses * self.surface * 1e-3
+        ambient_temperature = self.T_amb if self.located_inside else state.environmental_data.temperature_ambient
+        time_step = state.time_step / self.n_substeps
+        if self.integration == 'exponential' and np.all(loss_coefficient > 0):
+            a = np.exp(-loss_coefficient * time_step / heat_capacity)
+            b = (ambient_temperature + heat_flow / loss_coefficient) * (1 - a)
+        else:
+            a = 1 - loss_coefficient * time_step / heat_capacity
+            b = (heat_flow + loss_coefficient * ambient_temperature) * time_step / heat_capacity
+        a, b = np.atleast_1d(np.asarray(a, dtype=float)), np.atleast_1d(np.asarray(b, dtype=float))
+        if self.n_substeps > 1:
+            ratio = np.where(a == 1, self.n_substeps, (1 - a**self.n_substeps) / np.where(a == 1, 1, 1 - a))
+            a, b = a**self.n_substeps, b * ratio
+        return a, b
+
     def calculate_losses(self, state: SimulationState):
         ambient_temperature = self.T_amb if self.located_inside else state.environmental_data.temperature_ambient
         losses = -self.convection_coefficient_losses * self.surface * (self.temperature - ambient_temperature) * 1e-3
@@ -137,6 +194,7 @@ class MultiNodeHotWaterTank(HotWaterStorage):
     ordered_layers: Dict[str, list]
     matrix_A: np.array
     matrix_B: np.array
+    fluid_properties: FluidPropertyTable | None
 
     def __init__(self, 
                  name, 
@@ -152,7 +210,13 @@ class MultiNodeHotWaterTank(HotWaterStorage):
                  convection_effect_coefficient: float = 1_000, 
                  convection_coefficient_losses: float = 0.8, 
                  located_inside: bool = True, 
-                 T_amb: float = 22.0):
+                 T_amb: float = 22.0,
+                 matrix_cache_size: int = 32,
+                 flow_quantization: float = 1e-7,
+                 n_substeps: int = 1,
+                 substep_tolerance: float | None = None,
+                 fluid_properties: FluidPropertyTable | None = None,
+                 property_update_tolerance: float = 0.5):
         """
         Model of hot water storage tank. Modeling reference is Leclercq et al. (2024) "Dynamic modeling and experimental validation of an electric water heater with a double storage tank configuraiton." ECOS 2024 Proceedings.
         Note that it is assumed that:
@@ -186,6 +250,25 @@ class MultiNodeHotWaterTank(HotWaterStorage):
             Defines the location where the tank is placed. If True the heat losses are calculated assuming T_amb. If False, the outer air temperature is used. Defaults to True
         T_amb: float, optional
             Temperature [°C] used to calculate heat losses to the ambient from the tank if located_inside is True. Defaults to 22.0
+        matrix_cache_size: int, optional
+            Number of assembled matrices (with their factorization) kept in a least-recently-used cache, keyed by the 
+            quantized water flow and by the relative temperature state of the layers. Use 0 to disable the cache. Defaults to 32
+        flow_quantization: float, optional
+            Resolution [kg/s] of the water flow in the keys of the matrix cache: flows in the same interval share the 
+            same matrix. Defaults to 1e-7
+        n_substeps: int, optional
+            Number of internal sub-steps per simulation step, e.g. to keep the resolution needed with a high 
+            convection_effect_coefficient while the simulation runs with a coarse time step (see Component.advance). Defaults to 1
+        substep_tolerance: float, optional
+            Tolerance [K] on the layer temperatures used to refine the sub-steps automatically. Defaults to None (fixed number of sub-steps)
+        fluid_properties: FluidPropertyTable, optional
+            Table of temperature-dependent water properties (e.g. constants.water_property_table()). The heat capacity
+            of the layers and the heat conduction between layers are then evaluated at the layer temperatures, and the
+            enthalpy of the water flows at the mean temperature of the tank. Defaults to None (constant properties, constants.WATER)
+        property_update_tolerance: float, optional
+            Change [K] of the layer temperatures after which the properties are evaluated again, with fluid_properties.
+            They are checked at the beginning of each simulation step, when the specific heat of the water flows is
+            published on the hot water outlet. Between updates, matrix A (and its cache) stays valid. Defaults to 0.5
         """
         super().__init__(name, 
                          tank_volume = tank_volume, 
@@ -194,7 +277,9 @@ class MultiNodeHotWaterTank(HotWaterStorage):
                          T_0 = T_0, 
                          convection_coefficient_losses = convection_coefficient_losses, 
                          located_inside = located_inside, 
-                         T_amb = T_amb)
+                         T_amb = T_amb,
+                         n_substeps = n_substeps,
+                         substep_tolerance = substep_tolerance)
         self.number_of_layers = number_of_layers
         self.layer_mass = self.volume * WATER.rho / self.number_of_layers
         self.layer_height = self.height / self.number_of_layers
@@ -217,6 +302,13 @@ class MultiNodeHotWaterTank(HotWaterStorage):
         self.matrix_B = None
         self.matrix_A = None
         self.water_mass_flow_t = None
+        self.matrix_cache_size = matrix_cache_size
+        self.flow_quantization = flow_quantization
+        self.matrix_cache_hits = 0
+        self.matrix_cache_misses = 0
+        self._matrix_cache = OrderedDict()
+        self.fluid_properties = fluid_properties
+        self.property_update_tolerance = property_update_tolerance
     
     def identify_heat_input_layers(self, input_heights: float | list | None = None, default: int | None = None):
         vector_with_heat_input_layers = np.zeros(self.number_of_layers, dtype=np.float16)
@@ -259,6 +351,7 @@ class MultiNodeHotWaterTank(HotWaterStorage):
         self.update_A_matrix(change_in_water_mass_flow)
         C = self.create_C_vector(state)
         D = -(self.matrix_B * self.T_layer + C)
+        from scipy.linalg import solve_banded
         self.T_layer = solve_banded((1, 1), self.matrix_A, D)  
         self.temperature = self.T_layer.mean()
         self.SOC = self.temperature_to_SOC(state)
@@ -268,27 +361,107 @@ class MultiNodeHotWaterTank(HotWaterStorage):
         return output
 
     def step(self, state: SimulationState, action):
+        D = self._assemble_system(state)
+        # Solve the tridiagonal system in place, with the factorization of matrix A
+        solve_factorized_tridiagonal(self._factors, D, out=D)
+        self._apply_solution(state)
+        return {}
+
+    @classmethod
+    def step_batch(cls, tanks: List["MultiNodeHotWaterTank"], state: SimulationState):
+        """
+        Simulates one time step of several tanks, solving the systems of the tanks with the same number of layers as
+        a single stacked batch. The result is the same as calling ``step`` on each tank.
+
+        Parameters
+        ----------
+        tanks : List[MultiNodeHotWaterTank]
+            The tanks to simulate
+        state : SimulationState
+            The current simulation state
+        """
+        groups: Dict[int, List[MultiNodeHotWaterTank]] = {}
+        for tank in tanks:
+            groups.setdefault(tank.number_of_layers, []).append(tank)
+        for group in groups.values():
+            if len(group) == 1:
+                group[0].step(state, None)
+                continue
+            # The batch arrays are small compared to the work of the solver, so they are allocated at each call
+            n_tanks, n_layers = len(group), group[0].number_of_layers
+            A, D, work = np.empty((n_tanks, 3, n_layers)), np.empty((n_tanks, n_layers)), np.empty((n_tanks, n_layers))
+            for i, tank in enumerate(group):
+                D[i] = tank._assemble_system(state)
+                A[i] = tank.matrix_A
+            solve_tridiagonal(A, D, out=D, work=work)
+            for tank, T_new in zip(group, D):
+                tank._D[:] = T_new
+                tank._apply_solution(state)
+
+    def _assemble_system(self, state: SimulationState) -> np.ndarray:
+        """
+        Updates the matrix A if needed, and writes the right-hand side D of the system A T_new = D in a preallocated
+        buffer, which is returned
+        """
         # Sanity check of the current state
         self._check_state(state)
         # Checking if water mass flows changed with respect to the previous time step
         update_coefficients = self._check_need_to_update_coefficients()
+        if self._fluid_properties_changed:
+            self._fluid_properties_changed = False
+            self._set_time_step(state.time_step)
+            update_coefficients = True
+        if state.time_step != self._time_step:  # e.g. when sub-stepping
+            self._set_time_step(state.time_step)
+            update_coefficients = True
         internal_water_flows, inlet_water_flow, outlet_water_flow = self._update_water_flows()
         if update_coefficients is True:
-            internal_heat_exchange_coefficients = self._update_heat_transfer_coefficients()
-            self._update_A_matrix(internal_heat_exchange_coefficients, internal_water_flows, outlet_water_flow)
-        C = self._create_C_vector(state, inlet_water_flow)
-        D = -(self.matrix_B * self.T_layer + C)
-        # Solve the thrediagonal system
-        T_new = solve_banded((1, 1), self.matrix_A, D)
-        # Assign the new temperature values to the layer temperatures
-        self.T_layer = T_new
+            self._set_A_matrix(internal_water_flows, outlet_water_flow)
+        D = self._create_C_vector(state, inlet_water_flow, out=self._D)
+        # D = -(B * T + C)
+        D += self.matrix_B * self.T_layer
+        np.negative(D, out=D)
+        self._inlet_water_flow = inlet_water_flow
+        return D
+
+    def _apply_solution(self, state: SimulationState):
+        """Takes the solution of the system from the D buffer, which is swapped with the previous layer temperatures"""
+        self.T_layer, self._D = self._D, self.T_layer
         # Calculate the overall average temperature and related SOC
         self.temperature = self.T_layer.mean()
         self.SOC = self.temperature_to_SOC(state)
         # In the end, the only value that needs updating is the input from the cold water grid
         self.ports[self.cold_water_input_port_name].flows['mass'] = self.water_mass_flow_t
-        self.ports[self.cold_water_input_port_name].flows['heat'] = self.water_mass_flow_t * WATER.cp * self.ports[self.cold_water_input_port_name].T
-        return {}
+        self.ports[self.cold_water_input_port_name].flows['heat'] = self.water_mass_flow_t * self._cp_flow * self.ports[self.cold_water_input_port_name].T
+
+    def _update_fluid_properties(self, force: bool = False) -> bool:
+        """
+        Evaluates the heat capacity of the layers [kJ/K], the thermal conductivity at the interfaces between layers and
+        the specific heat of the water flows. With fluid_properties, they are evaluated again only when a layer
+        temperature changed by more than property_update_tolerance. Returns True if they were updated.
+
+        The enthalpy of the water flows is cp * T (with T in K), so all flows use the same specific heat, at the mean
+        temperature of the tank: with one cp per layer, a uniform flow through layers at the same temperature would
+        create energy.
+        """
+        n = self.number_of_layers
+        if self.fluid_properties is None:
+            if not force:
+                return False
+            self._cp_flow = WATER.cp
+            self._k_interfaces = np.full(n + 1, WATER.k)
+            self._layer_heat_capacity = np.full(n, self.layer_mass * WATER.cp)
+            return True
+        if not force and np.max(np.abs(self.T_layer - self._properties_T)) <= self.property_update_tolerance:
+            return False
+        self._properties_T = self.T_layer.copy()
+        self._cp_flow = self.fluid_properties.cp(self.T_layer.mean())
+        self._k_interfaces = np.empty(n + 1)
+        self._k_interfaces[1:-1] = self.fluid_properties.k(0.5 * (self.T_layer[1:] + self.T_layer[:-1]))
+        self._k_interfaces[[0, -1]] = self._k_interfaces[[1, -2]]  # Not used: there is no conduction through the top and bottom
+        self._layer_heat_capacity = self.volume / n * self.fluid_properties.rho(self.T_layer) * self.fluid_properties.cp(self.T_layer)
+        self._matrix_cache.clear()  # The cached matrices were assembled with the previous properties
+        return True
 
     def _check_need_to_update_coefficients(self):
         """
@@ -355,12 +528,49 @@ class MultiNodeHotWaterTank(HotWaterStorage):
 
     def _update_heat_transfer_coefficients(self):
         # First we update the vector of internal heat exchange coefficients
-        internal_heat_exchange_coefficients_new = np.ones(self.number_of_layers+1, dtype=np.float32) * WATER.k
+        k = self._k_interfaces
+        internal_heat_exchange_coefficients_new = np.where(self.relative_temperature_layers_state==1, k * self.convection_effect_coefficient, k).astype(np.float32)
         internal_heat_exchange_coefficients_new[0] = 0.0
         internal_heat_exchange_coefficients_new[self.number_of_layers] = 0.0
-        internal_heat_exchange_coefficients_new[self.relative_temperature_layers_state==1] = WATER.k * self.convection_effect_coefficient
         return internal_heat_exchange_coefficients_new
 
+    def _set_time_step(self, time_step: float):
+        self._time_step = time_step
+        self.matrix_B = (-self._layer_heat_capacity / time_step).astype(np.float32)
+
+    def get_internal_state(self) -> np.ndarray:
+        return self.T_layer.copy()
+
+    def set_internal_state(self, internal_state: np.ndarray):
+        self.T_layer = np.array(internal_state, dtype=np.float64)
+        self._D = np.empty_like(self.T_layer)
+        self.temperature = self.T_layer.mean()
+        self.water_mass_flow_t = math.nan  # Forces the update of matrix A at the next step
+
+    def quiescent_dynamics(self, state: SimulationState):
+        return None  # The layers are coupled by the water flows and the mixing: no scalar closed form
+
+    def _set_A_matrix(self, internal_water_flows: np.ndarray, outlet_water_flow: float):
+        """
+        Sets matrix A and its factorization for the current water flow and relative temperature state of the layers,
+        taking them from the cache of assembled matrices when possible
+        """
+        key = (self._time_step, round(outlet_water_flow / self.flow_quantization), self.relative_temperature_layers_state.astype(bool).tobytes())
+        cached = self._matrix_cache.get(key)
+        if cached is not None:
+            self._matrix_cache.move_to_end(key)
+            self.matrix_cache_hits += 1
+            self.matrix_A, self._factors = cached
+            return
+        self.matrix_cache_misses += 1
+        internal_heat_exchange_coefficients = self._update_heat_transfer_coefficients()
+        self._update_A_matrix(internal_heat_exchange_coefficients, internal_water_flows, outlet_water_flow)
+        self._factors = factorize_tridiagonal(self.matrix_A)
+        if self.matrix_cache_size > 0:
+            self._matrix_cache[key] = (self.matrix_A, self._factors)
+            if len(self._matrix_cache) > self.matrix_cache_size:
+                self._matrix_cache.popitem(last=False)
+
     def _update_A_matrix(self, 
                          internal_heat_exchange_coefficients: np.ndarray, 
                          internal_water_flows: np.ndarray, 
@@ -381,7 +591,7 @@ class MultiNodeHotWaterTank(HotWaterStorage):
         # ------------------------------------------------------------------
         # Water-flow contributions
         # ------------------------------------------------------------------
-        water_cp = WATER.cp
+        water_cp = self._cp_flow
         # Initialization
         beta_water = np.zeros(n)
         gamma_water = np.zeros(n - 1)
@@ -415,24 +625,27 @@ class MultiNodeHotWaterTank(HotWaterStorage):
         A[2, :-1] = alpha_heat + alpha_water
         self.matrix_A = A
         
-    def _create_C_vector(self, state: SimulationState, inlet_water_flow: float):
+    def _create_C_vector(self, state: SimulationState, inlet_water_flow: float, out: np.ndarray | None = None):
         ambient_temperature = self.T_amb if self.located_inside else state.environmental_data.temperature_ambient
         total_heat_from_main_heating_source = self.ports[self.main_heat_input_port_name].flows['heat']
         if self.aux_heat_input_port_name in self.ports.keys():
             total_heat_from_aux_heating_source = self.ports[self.aux_heat_input_port_name].flows['heat']
         else:
             total_heat_from_aux_heating_source = 0.0
-        # Calculating useful vectors
-        vector_cold_water_input = self.cold_water_input_location * inlet_water_flow * WATER.cp * self.ports[self.cold_water_input_port_name].T
-        vector_heat_from_main_heating_source = total_heat_from_main_heating_source / self.main_heating_source_location.sum() * self.main_heating_source_location
-        vector_heat_from_aux_heating_source = total_heat_from_aux_heating_source / self.aux_heating_source_location.sum() * self.aux_heating_source_location
-        # Finally calculating the C vector
-        C = -self.convection_coefficient_losses * self.surface_losses_layer_vec * ambient_temperature * 1e-3 - vector_heat_from_main_heating_source - vector_heat_from_aux_heating_source - vector_cold_water_input
+        # The constant vectors (losses coefficients and distribution of the heat inputs) are computed in initialize
+        C = np.multiply(self._losses_coefficients, -ambient_temperature, out=out)
+        C -= total_heat_from_main_heating_source * self._main_heat_share
+        C -= total_heat_from_aux_heating_source * self._aux_heat_share
+        C -= (inlet_water_flow * self._cp_flow * self.ports[self.cold_water_input_port_name].T) * self.cold_water_input_location
         return C
     
     def set_inherited_fluid_port_values(self, state):
         T_port = self.T_layer[np.nonzero(self.hot_water_output_location==1)][0]
         self.ports[self.hot_water_output_port_name].T = T_port
+        # The properties are updated here, before the demands take their step: the outlet enthalpy is removed with the
+        # specific heat of the flows, and the demands compute it with the same one
+        self._fluid_properties_changed |= self._update_fluid_properties()
+        self.ports[self.hot_water_output_port_name].cp = self._cp_flow
         return {self.hot_water_output_port_name: T_port}
     
     def set_inherited_heat_port_values(self, state):
@@ -447,12 +660,22 @@ class MultiNodeHotWaterTank(HotWaterStorage):
     def initialize(self, ctx: InitContext):
         state = ctx.state
         self.water_mass_flow_t = 0.0
-        self.T_layer = self.T_layer = np.array([self.T_0 - 0.01 * x for x in range(self.number_of_layers)], dtype=np.float32)
+        self.T_layer = np.array([self.T_0 - 0.01 * x for x in range(self.number_of_layers)], dtype=np.float32).astype(np.float64)
+        # Constant vectors and work buffer used at each step
+        self._D = np.empty(self.number_of_layers)
+        self._losses_coefficients = self.convection_coefficient_losses * self.surface_losses_layer_vec * 1e-3
+        self._main_heat_share = self.main_heating_source_location.astype(np.float64) / self.main_heating_source_location.sum()
+        self._aux_heat_share = self.aux_heating_source_location.astype(np.float64) / self.aux_heating_source_location.sum()
         self.relative_temperature_layers_state = np.zeros(self.number_of_layers + 1, dtype=np.int16)
-        internal_heat_exchange_coefficients = self._update_heat_transfer_coefficients()
         internal_water_flows, inlet_water_flow, outlet_water_flow = self._update_water_flows()
-        self.matrix_B = np.array([-self.layer_mass * WATER.cp / state.time_step] * self.number_of_layers, dtype=np.float32)
-        self._update_A_matrix(internal_heat_exchange_coefficients, internal_water_flows, outlet_water_flow)
+        self._update_fluid_properties(force=True)
+        self._fluid_properties_changed = False
+        self._set_time_step(state.time_step)
+        # The cached matrices depend on the time step, so they are not kept between runs
+        self._matrix_cache.clear()
+        self.matrix_cache_hits = 0
+        self.matrix_cache_misses = 0
+        self._set_A_matrix(internal_water_flows, outlet_water_flow)
         super().initialize(ctx)
 
     def _check_state(self, state, stage="unknown"):
@@ -475,4 +698,113 @@ class MultiNodeHotWaterTank(HotWaterStorage):
                 f"{self.name}: physically unreasonable temperature at "
                 f"t={state.time}, step={state.time_id}, stage={stage}\n"
                 f"T_layer={self.T_layer}"
-            )
\ No newline at end of file
+            )
+
+
+class HotWaterStorageFleet(FleetComponent, HotWaterStorage):
+    temperature: np.ndarray
+    def __init__(self, 
+                 name, 
+                 n_units: int,
+                 tank_volume: float | np.ndarray, 
+                 max_temperature: float = 80,
+                 T_0: float | np.ndarray = 40.0, 
+                 convection_coefficient_losses: float | np.ndarray = 0.8, 
+                 located_inside: bool = True, 
+                 T_amb: float | np.ndarray = 22,
+                 integration: Literal['euler', 'exponential'] = 'euler'):
+        """
+        Fleet of n_units fully mixed hot water storage tanks (see HotWaterStorage), simulated together as arrays.
+        The ports carry the totals of the fleet and the mean temperature of the tanks, while the per-unit values are
+        exchanged with connected fleets (e.g. HotWaterDemandFleet, HeatPumpFleet). The temperature and the SOC are
+        arrays with one value per tank.
+
+        Parameters
+        ----------
+        name : str
+            Name of the component
+        n_units : int
+            Number of tanks
+        tank_volume : float | np.ndarray
+            Storage capacity of the tanks [l], either the same for all tanks or one value per tank
+        max_temperature : float, optional
+            Maximum temperature [°C] of the tanks, used for the SOC. Defaults to 80°C
+        T_0: float | np.ndarray, optional
+            Starting temperature [°C] in the tanks. Defaults to 40°C
+        convection_coefficient_losses: float | np.ndarray, optional
+            The convection coefficient [W/m2K] used to calculate losses to the ambient
+        located_inside: bool, optional
+            If True the heat losses are calculated assuming T_amb. If False, the outer air temperature is used. Defaults to True
+        T_amb: float | np.ndarray, optional
+            Temperature [°C] used to calculate heat losses to the ambient if located_inside is True. Defaults to 22.0
+        integration: str, optional
+            Time integration of the energy balance, as in HotWaterStorage. Defaults to "euler"
+        """
+        self.n_units = n_units
+        per_unit = lambda value: np.broadcast_to(np.asarray(value, dtype=float), (n_units,)).copy()
+        super().__init__(name,
+                         tank_volume = per_unit(tank_volume),
+                         max_temperature = max_temperature,
+                         T_0 = per_unit(T_0),
+                         convection_coefficient_losses = per_unit(convection_coefficient_losses),
+                         located_inside = located_inside,
+                         T_amb = per_unit(T_amb),
+                         integration = integration)
+
+    def step(self, state: SimulationState, action):
+        mass_output = self.get_unit_flows(self.hot_water_output_port_name, 'mass')
+        cold_water_temperature = self.get_unit_temperature(self.cold_water_input_port_name)
+        self.set_unit_flows(self.cold_water_input_port_name, mass = -mass_output, heat = np.abs(mass_output) * WATER.cp * cold_water_temperature)
+        heat_input = 0.0
+        for input_port in self.heat_input_port_names:
+            if input_port in self.ports.keys():
+                heat_input = heat_input + self.get_unit_flows(input_port, 'heat')
+        heat_fluid = self.get_unit_flows(self.hot_water_output_port_name, 'heat') + self.ports[self.cold_water_input_port_name].unit_flows['heat']
+        heat_capacity = WATER.cp * self.volume * WATER.rho
+        loss_coefficient = self.convection_coefficient_losses * self.surface * 1e-3
+        if self.integration == 'exponential' and np.all(loss_coefficient > 0):
+            ambient_temperature = self.T_amb if self.located_inside else state.environmental_data.temperature_ambient
+            equilibrium_temperature = ambient_temperature + (heat_input + heat_fluid) / loss_coefficient
+            self.temperature = equilibrium_temperature + (self.temperature - equilibrium_temperature) * np.exp(-loss_coefficient * state.time_step / heat_capacity)
+        else:
+            self.temperature = self.temperature + (heat_input + heat_fluid + self.calculate_losses(state)) * state.time_step / heat_capacity
+        self.SOC = self.temperature_to_SOC(state)
+
+    def get_internal_state(self) -> np.ndarray:
+        return self.temperature.copy()
+
+    def set_internal_state(self, internal_state: np.ndarray):
+        self.temperature = np.array(internal_state, dtype=float)
+
+    def quiescent_dynamics(self, state: SimulationState):
+        cold_water_flows = self.ports[self.cold_water_input_port_name].unit_flows
+        if cold_water_flows is None:
+            return None
+        heat_flow = self.get_unit_flows(self.hot_water_output_port_name, 'heat') + cold_water_flows['heat']
+        for input_port in self.heat_input_port_names:
+            if input_port in self.ports.keys():
+                heat_flow = heat_flow + self.get_unit_flows(input_port, 'heat')
+        return self._affine_step_coefficients(heat_flow, state)
+
+    def set_inherited_fluid_port_values(self, state: SimulationState):
+        if self.hot_water_output_port_name in self.ports.keys():
+            self.ports[self.hot_water_output_port_name].unit_T = self.temperature
+            self.ports[self.hot_water_output_port_name].T = float(self.temperature.mean())
+            return {self.hot_water_output_port_name: self.ports[self.hot_water_output_port_name].T}
+        return {}
+
+    def set_inherited_heat_port_values(self, state: SimulationState):
+        output = {}
+        for port_name in self.heat_input_port_names:
+            if port_name in self.ports.keys():
+                self.ports[port_name].unit_T = self.temperature
+                self.ports[port_name].T = output[port_name] = float(self.temperature.mean())
+        return output
+
+    def initialize(self, state: SimulationState):
+        super().initialize(state)
+        self.temperature = self.T_0.copy()
+        for port_name in self.heat_input_port_names:
+            if port_name in self.ports.keys():
+                self.ports[port_name].T = float(self.T_0.mean())
+                self.ports[port_name].unit_T = self.temperature
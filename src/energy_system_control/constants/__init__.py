@@ -2,5 +2,6 @@
 from .thermo import THERMO
 from .fluids import WATER, AIR
 from .base import override
+from .property_tables import FluidPropertyTable, water_property_table
 
-__all__ = ["THERMO", "WATER", "AIR", "ELECTRO", "override"]
+__all__ = ["THERMO", "WATER", "AIR", "ELECTRO", "override", "FluidPropertyTable", "water_property_table"]
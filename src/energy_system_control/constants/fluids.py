@@ -5,7 +5,7 @@ from .base import FrozenNamespace
 
 @dataclass(frozen=True)
 class Water(FrozenNamespace):
-    # Reference ~20°C, 1 atm (use CoolProp if you need T,p dependence)
+    # Reference ~20°C, 1 atm (see property_tables for temperature-dependent properties)
     rho: float = 998.2     # density [kg·m⁻³]
     cp: float = 4.187     # specific heat [kJ·kg⁻¹·K⁻¹]
     k: float = 0.62856    # [W/mK] @ 40°C
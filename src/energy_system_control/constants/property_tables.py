@@ -0,0 +1,139 @@
+# src/energy_system_control/constants/property_tables.py
+from __future__ import annotations
+from functools import lru_cache
+from typing import Callable, Dict
+import numpy as np
+
+# Liquid water at atmospheric pressure (saturation at 100°C): temperature [°C], density [kg·m⁻³],
+# specific heat [kJ·kg⁻¹·K⁻¹] and thermal conductivity [W·m⁻¹·K⁻¹]
+_WATER_REFERENCE_DATA = np.array([
+    [0.01,  999.84, 4.2199, 0.5611],
+    [10.0,  999.70, 4.1955, 0.5800],
+    [20.0,  998.21, 4.1844, 0.5984],
+    [30.0,  995.65, 4.1801, 0.6154],
+    [40.0,  992.22, 4.1796, 0.6305],
+    [50.0,  988.04, 4.1815, 0.6435],
+    [60.0,  983.20, 4.1851, 0.6543],
+    [70.0,  977.76, 4.1902, 0.6631],
+    [80.0,  971.79, 4.1969, 0.6700],
+    [90.0,  965.31, 4.2053, 0.6753],
+    [100.0, 958.35, 4.2157, 0.6791],
+])
+
+
+class FluidPropertyTable:
+    """
+    Properties of a fluid tabulated on a uniform temperature grid, with vectorized linear interpolation.
+
+    The tables are computed once (e.g. from a property library or from reference data), so that components can use
+    temperature-dependent properties at every step at the cost of an array lookup. Temperatures outside of the range
+    of the table are clamped to its bounds.
+
+    Parameters
+    ----------
+    T_min, T_max : float
+        Range of the table [K]
+    values : Dict[str, np.ndarray]
+        Values of each property on the grid of ``n_points`` temperatures between T_min and T_max, in the units of
+        energy_system_control.constants (e.g. cp in kJ·kg⁻¹·K⁻¹)
+    """
+    def __init__(self, T_min: float, T_max: float, values: Dict[str, np.ndarray]):
+        lengths = {len(table) for table in values.values()}
+        if len(lengths) != 1 or lengths.pop() < 2:
+            raise ValueError('All property tables must have the same length, of at least 2 points')
+        if T_max <= T_min:
+            raise ValueError(f'Invalid temperature range of the property table: [{T_min}, {T_max}]')
+        self.T_min = float(T_min)
+        self.T_max = float(T_max)
+        self.values = {name: np.array(table, dtype=np.float64) for name, table in values.items()}
+        for table in self.values.values():
+            table.flags.writeable = False  # Tables are shared between components
+        self.n_points = len(next(iter(self.values.values())))
+        self.dT = (self.T_max - self.T_min) / (self.n_points - 1)
+        self._grid = np.linspace(self.T_min, self.T_max, self.n_points)
+        # Slopes of each interval, so that a lookup on the uniform grid is a single multiply-add
+        self._slopes = {name: np.append(np.diff(table), 0.0) for name, table in self.values.items()}
+
+    @classmethod
+    def from_functions(cls, functions: Dict[str, Callable[[np.ndarray], np.ndarray]], T_min: float, T_max: float, n_points: int = 1001):
+        """Tabulates each property function (of the temperature [K], vectorized) on a uniform grid"""
+        T = np.linspace(T_min, T_max, n_points)
+        return cls(T_min, T_max, {name: np.asarray(function(T), dtype=np.float64) for name, function in functions.items()})
+
+    @property
+    def temperatures(self) -> np.ndarray:
+        return self._grid.copy()
+
+    def lookup(self, name: str, T):
+        """
+        Returns the property ``name`` at the temperature(s) T [K], interpolated linearly in the table
+
+        Parameters
+        ----------
+        name : str
+            Name of the property (e.g. 'rho', 'cp', 'k')
+        T : float | np.ndarray
+            Temperature(s) [K]
+
+        Returns
+        -------
+        float | np.ndarray
+            The property, with the same shape as T
+        """
+        table = self.values[name]
+        if np.ndim(T) == 0:
+            position = (min(max(float(T), self.T_min), self.T_max) - self.T_min) / self.dT
+            index = min(int(position), self.n_points - 2)
+            return float(table[index] + (position - index) * self._slopes[name][index])
+        T = np.asarray(T, dtype=np.float64)
+        if T.size < 256:
+            return np.interp(T, self._grid, table)  # Lowest overhead on small arrays (e.g. the layers of a tank)
+        # On large arrays, the index in the uniform grid is computed directly instead of being searched
+        position = (np.clip(T, self.T_min, self.T_max) - self.T_min) / self.dT
+        index = np.minimum(position.astype(np.intp), self.n_points - 2)
+        return table[index] + (position - index) * self._slopes[name][index]
+
+    def rho(self, T):
+        return self.lookup('rho', T)
+
+    def cp(self, T):
+        return self.lookup('cp', T)
+
+    def k(self, T):
+        return self.lookup('k', T)
+
+
+@lru_cache(maxsize=8)
+def water_property_table(T_min: float = 273.15, T_max: float = 373.15, n_points: int = 1001, source: str = 'reference') -> FluidPropertyTable:
+    """
+    Returns the table of the properties of liquid water (rho, cp, k) at atmospheric pressure. Tables are cached, so
+    that components using the same settings share the same table.
+
+    Parameters
+    ----------
+    T_min, T_max : float, optional
+        Range of the table [K]. Defaults to 0-100°C
+    n_points : int, optional
+        Number of points of the table. Defaults to 1001 (0.1 K resolution over the default range)
+    source : str, optional
+        'reference' (default) interpolates reference data of liquid water between 0 and 100°C with cubic splines.
+        'coolprop' evaluates the properties with CoolProp (optional dependency, see the 'fluids' extra)
+    """
+    match source:
+        case 'reference':
+            from scipy.interpolate import CubicSpline
+            T_ref = _WATER_REFERENCE_DATA[:, 0] + 273.15
+            if T_min < T_ref[0] - 0.01 or T_max > T_ref[-1]:
+                raise ValueError(f'The reference data of water cover {T_ref[0] - 0.01:.2f}-{T_ref[-1]:.2f} K only: use source="coolprop" for a wider range')
+            functions = {name: CubicSpline(T_ref, _WATER_REFERENCE_DATA[:, column]) for column, name in enumerate(('rho', 'cp', 'k'), start=1)}
+        case 'coolprop':
+            try:
+                from CoolProp.CoolProp import PropsSI
+            except ImportError as e:
+                raise ImportError('CoolProp is required to compute the property tables with source="coolprop" (pip install CoolProp)') from e
+            functions = {'rho': lambda T: PropsSI('D', 'T', T, 'P', 101325.0, 'Water'),
+                         'cp': lambda T: PropsSI('C', 'T', T, 'P', 101325.0, 'Water') * 1e-3,
+                         'k': lambda T: PropsSI('L', 'T', T, 'P', 101325.0, 'Water')}
+        case _:
+            raise ValueError(f'Unknown source of the water properties: {source}')
+    return FluidPropertyTable.from_functions(functions, T_min, T_max, n_points)
@@ -38,8 +38,9 @@ class MPCController(Controller):
         predictors: Dict[str, str],
         horizon: float,
         solver: SolverName = "HIGHS",
+        execution_interval_h: float | None = None,
     ):
-        super().__init__(name, controlled_components, sensors, predictors)
+        super().__init__(name, controlled_components, sensors, predictors, execution_interval_h=execution_interval_h)
         if horizon <= 0:
             raise ValueError("horizon_steps must be > 0")
         self.horizon = horizon 
@@ -61,6 +62,7 @@ class MPCController_HybridDHW(MPCController):
     - Battery (optional)
     - Thermal solar panels (optional)
     """
+    action_storage = "rle"  # Actions are discrete levels that change rarely
 
     def __init__(self,
                     name: str,
@@ -73,7 +75,8 @@ class MPCController_HybridDHW(MPCController):
                     electricity_demand_predictor_name: str | None = None,
                     bounds_SOC: Tuple[float, float] = (0.3, 0.9),
                     bounds_temperature: Tuple[float, float] = (313.15, 353.15),
-                    cost_of_temperature_violation: float = 1000.0
+                    cost_of_temperature_violation: float = 1000.0,
+                    execution_interval_h: float | None = None
                     ):
         self.PV_power_predictor_name = PV_power_predictor_name
         self.heat_demand_predictor_name = heat_demand_predictor_name
@@ -91,7 +94,8 @@ class MPCController_HybridDHW(MPCController):
             sensors = sensors,
             predictors = predictors,
             horizon = horizon,
-            solver = cp.HIGHS)
+            solver = cp.HIGHS,
+            execution_interval_h = execution_interval_h)
         
     def load_controlled_components(self, components):
         self.heat_pump = find_object_of_type(HeatPump, components)
@@ -263,7 +267,7 @@ class MPCController_HybridDHW(MPCController):
     
     def safe_predict(self, predictor: Predictor | None, state: SimulationState):
         if predictor:  # If no predictor is loaded, it takes "None" value
-            return predictor.predict(self.horizon, state)
+            return predictor.get_prediction(self.horizon, state)
         else:  # If there is no predictor, we interpret it as that there is no demand
             return np.zeros(int(self.horizon // (state.time_step/3600)))
 
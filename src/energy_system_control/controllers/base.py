@@ -20,13 +20,23 @@ class Controller(ABC):
     predictors: Dict[str, Predictor]
     obs: dict
     previous_action: dict
+    action_storage: str = "float32"  # Storage policy of the recorded actions (see energy_system_control.sim.simulation_data)
+    signal_handles: Dict[str, int]  # Column of each recorded action in the controllers registry, assigned by the environment
+    # Whether the actions only depend on the current observations and on the previous action (and on-off timers), which
+    # allows the simulator to fast-forward over quiescent periods (see SimulationConfig.fast_forward_steps)
+    supports_fast_forward: bool = False
+    # Time [h] between two executions of the controller (a multiple of the time step). Between executions, the last
+    # action is held (zero-order hold). None: the controller is executed at every time step
+    execution_interval_h: float | None = None
+    execution_steps: int = 1  # Number of time steps between two executions, set by the simulator from execution_interval_h
     def __init__(self, 
                  name, 
                  controlled_components: List[str], 
                  sensors: Dict[str, str],
                  minimum_time_off_between_activations_h: dict = {},
                  minimum_time_on_between_deactivations_h: dict = {},
-                 predictors: Dict[str, str] = {}):
+                 predictors: Dict[str, str] = {},
+                 execution_interval_h: float | None = None):
         """
         Class for a generic controller
 
@@ -44,6 +54,8 @@ class Controller(ABC):
             Minimum time that the controller must wait before turning off again the component [hours]. Defaults to an empty dictionary
         predictors: dict, optional
             A dictionary of the predictors used by the controller
+        execution_interval_h: float, optional
+            Time between two executions of the controller [hours], a multiple of the time step. Defaults to None (executed at every time step)
         """
         self.name = name
         self.controlled_component_names = controlled_components
@@ -52,6 +64,7 @@ class Controller(ABC):
         self.minimum_time_on_between_activations = {k: v*3600 for k, v in minimum_time_off_between_activations_h.items()}
         self.minimum_time_off_between_deactivations = {k: v*3600 for k, v in minimum_time_on_between_deactivations_h.items()}
         self.on_off_time_limitations = bool(len(self.minimum_time_off_between_deactivations) + len(self.minimum_time_on_between_activations))
+        self.execution_interval_h = execution_interval_h
 
     def initialize(self, ctx: InitContext):
         self.load_controlled_components(ctx.environment.components)
@@ -62,7 +75,7 @@ class Controller(ABC):
 
     def get_obs(self, environment, state) -> Dict[str, Any]:
         self.obs = {var: sensor.get_measurement() for var, sensor in self.sensors.items()}
-        self.predictions = {var: predictor.predict(self.horizon, state) for var, predictor in self.predictors.items()}
+        self.predictions = {var: predictor.get_prediction(self.horizon, state) for var, predictor in self.predictors.items()}
         return self.obs
 
     def load_controlled_components(self, components: Dict[str, Any]):
@@ -81,19 +94,19 @@ class Controller(ABC):
                 # Check whether the action is valid
                 # First, if no change of action is required, all is good and we simply update the time elapsed since last state change
                 if action[component_name] == self.previous_action[component_name]:
-                    self.time_elapsed_since_last_state_change[component_name] += state.time_step
+                    self.time_elapsed_since_last_state_change[component_name] += state.time_step * self.execution_steps
                 elif action[component_name] == True and self.previous_action[component_name] == False:
                     if self.time_elapsed_since_last_state_change[component_name] >= self.minimum_time_off_between_deactivations[component_name]:
                         self.time_elapsed_since_last_state_change[component_name] = 0.0
                     else:
                         action[component_name] = False
-                        self.time_elapsed_since_last_state_change[component_name] += state.time_step
+                        self.time_elapsed_since_last_state_change[component_name] += state.time_step * self.execution_steps
                 elif action[component_name] == False and self.previous_action[component_name] == True:
                     if self.time_elapsed_since_last_state_change[component_name] >= self.minimum_time_on_between_activations[component_name]:
                         self.time_elapsed_since_last_state_change[component_name] = 0.0
                     else:
                         action[component_name] = True
-                        self.time_elapsed_since_last_state_change[component_name] += state.time_step
+                        self.time_elapsed_since_last_state_change[component_name] += state.time_step * self.execution_steps
                 else:
                     raise ValueError('There should be no other option')
 
@@ -109,6 +122,8 @@ class HeaterControllerWithBandwidth(Controller):
     """
     Controller for a heater with a bandwidth: it tries to keep the temperature within the specific band
     """
+    action_storage = "rle"
+    supports_fast_forward = True
     def __init__(self, 
                  name, 
                  controlled_component: str, 
@@ -116,7 +131,8 @@ class HeaterControllerWithBandwidth(Controller):
                  temperature_comfort: float, 
                  temperature_bandwidth: float,
                  minimum_time_off_between_activations_h: float | None = None,
-                 minimum_time_on_between_deactivations_h: float | None = None):
+                 minimum_time_on_between_deactivations_h: float | None = None,
+                 execution_interval_h: float | None = None):
         if minimum_time_off_between_activations_h is not None:
             minimum_time_off_between_activations_h = {controlled_component: minimum_time_off_between_activations_h}
         else:
@@ -129,7 +145,8 @@ class HeaterControllerWithBandwidth(Controller):
                          [controlled_component], 
                          {'Storage temperature': temperature_sensor}, 
                          minimum_time_off_between_activations_h=minimum_time_off_between_activations_h,
-                         minimum_time_on_between_deactivations_h=minimum_time_on_between_deactivations_h)
+                         minimum_time_on_between_deactivations_h=minimum_time_on_between_deactivations_h,
+                         execution_interval_h=execution_interval_h)
         self.temperature_comfort = C2K(temperature_comfort)
         self.temperature_bandwidth = temperature_bandwidth
         self.temperature_sensor_name = temperature_sensor
@@ -151,6 +168,28 @@ class HeaterControllerWithBandwidth(Controller):
         return action
 
 
+class HeaterFleetControllerWithBandwidth(HeaterControllerWithBandwidth):
+    """
+    Bandwidth controller for a fleet of heaters (e.g. a HeatPumpFleet): the same logic of HeaterControllerWithBandwidth
+    is applied to each unit, based on the per-unit temperatures measured on the controlled fleet (e.g. by a
+    TankTemperatureSensor on a HotWaterStorageFleet). The action is an array with one value per unit.
+    """
+    def __init__(self, name, controlled_component: str, temperature_sensor: str, temperature_comfort: float, temperature_bandwidth: float,
+                 execution_interval_h: float | None = None):
+        super().__init__(name, controlled_component, temperature_sensor, temperature_comfort, temperature_bandwidth,
+                         execution_interval_h=execution_interval_h)
+
+    def get_action(self, state: SimulationState, external_input: int | float = 0):
+        temperature = np.asarray(self.obs["Storage temperature"])
+        previous_action = np.broadcast_to(self.previous_action[self.controlled_heater_name], temperature.shape)
+        action = np.where(temperature <= self.temperature_comfort, 1.0,
+                          np.where(temperature <= self.temperature_comfort + self.temperature_bandwidth, previous_action, 0.0))
+        if external_input > 0:
+            action = np.maximum(action, external_input)
+        self.previous_action = {self.controlled_heater_name: action}
+        return self.previous_action
+
+
 class ChargeController(Controller):
     battery_name: str
     battery_charger_name: str
@@ -158,6 +197,7 @@ class ChargeController(Controller):
     SOC_min: float
     baseline_battery_efficiency: float
     baseline_inverter_efficiency: float
+    supports_fast_forward = True
     def __init__(self, name, 
                  battery_name: str,   
                  battery_SOC_sensor_name: str, 
@@ -166,7 +206,8 @@ class ChargeController(Controller):
                  SOC_min: float = 0.3, 
                  SOC_max: float = 0.9, 
                  baseline_battery_efficiency: float = 0.9,
-                 baseline_inverter_efficiency: float = 0.92):
+                 baseline_inverter_efficiency: float = 0.92,
+                 execution_interval_h: float | None = None):
         self.battery_name = battery_name
         self.battery_charger_name = f'{battery_name}_charger'
         self.SOC_min = SOC_min
@@ -178,7 +219,8 @@ class ChargeController(Controller):
             sensors['PV power'] = PV_power_sensor_name
         if AC_output_sensor_name is not None:
             sensors['output power'] = AC_output_sensor_name
-        super().__init__(name, controlled_components=[self.battery_charger_name, self.battery_name], sensors = sensors)
+        super().__init__(name, controlled_components=[self.battery_charger_name, self.battery_name], sensors = sensors,
+                         execution_interval_h = execution_interval_h)
     
     def initialize(self, ctx):
         super().initialize(ctx)      
@@ -6,10 +6,6 @@ import numpy as np
 import pandas as pd
 from typing import Literal
 from collections import deque
-from sklearn.neural_network import MLPRegressor
-from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor, ExtraTreesRegressor
-from sklearn.preprocessing import StandardScaler
-from sklearn.multioutput import MultiOutputRegressor
 from energy_system_control.sim.state import SimulationState
 from energy_system_control.components.base import Component
 AlignMethod = Literal["raise", "ffill", "linear"]
@@ -18,16 +14,46 @@ ANNModelType = Literal["pure regressor", "regressor-classifier"]
 class Predictor(ABC):
     variable_to_predict: str | None
     name : str
+    # Time [h] between two forecasts (a multiple of the time step). Between forecasts, get_prediction returns the
+    # remaining part of the last one (zero-order hold of the forecast). None: a new forecast is made at every call
+    execution_interval_h: float | None = None
+    execution_steps: int = 1  # Number of time steps between two forecasts, set by the simulator from execution_interval_h
+    _forecasts: dict | None = None
 
-    def __init__(self, name: str, variable_to_predict: str):
+    def __init__(self, name: str, variable_to_predict: str, execution_interval_h: float | None = None):
         self.name = name
         self.variable_to_predict = variable_to_predict
+        self.execution_interval_h = execution_interval_h
 
     def initialize(self):
         return None
     
     def update(self):
         return None
+
+    def get_prediction(self, horizon: float, state: SimulationState) -> np.array:
+        """
+        Returns the forecast over ``horizon`` [h] used by the controllers, starting at the current time step.
+
+        ``predict`` is called at most once every ``execution_steps`` time steps (for each horizon), over the horizon
+        extended by the execution interval. In between, the part of the last forecast starting at the current time step
+        is returned, so that its first element always refers to the current time step.
+        """
+        if self.execution_steps <= 1:
+            return self.predict(horizon, state)
+        if self._forecasts is None:
+            self._forecasts = {}
+        time_id, forecast = self._forecasts.get(horizon, (None, None))
+        if time_id is None or not 0 <= state.time_id - time_id < self.execution_steps:
+            time_id = state.time_id
+            forecast = self.predict(horizon + self.execution_steps * state.time_step / 3600, state)
+            self._forecasts[horizon] = (time_id, forecast)
+        n_steps = int(round(horizon * 3600 / state.time_step))
+        return forecast[state.time_id - time_id:][:n_steps]
+
+    def clear_forecasts(self):
+        """Discards the forecasts held by get_prediction, e.g. before a new run"""
+        self._forecasts = {}
     
     @abstractmethod
     def predict(
@@ -96,9 +122,10 @@ class OfflineForecastPredictor(Predictor):
                  variable_to_predict: str,
                  issue_level: str = "issue_time",
                  valid_level: str = "valid_time",
-                 align: AlignMethod = "ffill"
+                 align: AlignMethod = "ffill",
+                 execution_interval_h: float | None = None
                  ):
-        super().__init__(name = name, variable_to_predict = variable_to_predict)
+        super().__init__(name = name, variable_to_predict = variable_to_predict, execution_interval_h = execution_interval_h)
         self.forecast_df = forecast_df
         self.issue_level = issue_level
         self.valid_level = valid_level
@@ -260,12 +287,12 @@ class DailyProfilePredictor(Predictor):
     especially for testing
     """
     
-    def __init__(self, name: str, variable_to_predict: str, profile: pd.DataFrame):
+    def __init__(self, name: str, variable_to_predict: str, profile: pd.DataFrame, execution_interval_h: float | None = None):
         self.check_raw_profile(profile)
         self.profile = profile
         self.profile.index = self.profile.index * 3600  # Converting profile indeces to seconds
         self.original_frequency = self.profile.index.to_series().diff().median()
-        super().__init__(name = name, variable_to_predict=variable_to_predict)
+        super().__init__(name = name, variable_to_predict=variable_to_predict, execution_interval_h=execution_interval_h)
         
     def predict(self, horizon, state):
         """
@@ -311,8 +338,8 @@ class DailyProfilePredictor(Predictor):
 
 class PerfectTimeSeriesPredictor(Predictor):
     read_component: str
-    def __init__(self, name: str, read_component: str, variable_to_predict: str = None):
-        super().__init__(name = name, variable_to_predict=variable_to_predict)
+    def __init__(self, name: str, read_component: str, variable_to_predict: str = None, execution_interval_h: float | None = None):
+        super().__init__(name = name, variable_to_predict=variable_to_predict, execution_interval_h=execution_interval_h)
         self.read_component = read_component
 
     def initialize(self, ctx):
@@ -369,6 +396,7 @@ class MLBasedPredictor(Predictor):
         buffer_size_h: float = 144,
         retrain_interval_h: float = 50,
         min_sample_size_h: float = 200,
+        execution_interval_h: float | None = None,
         **model_kwargs
     ):
         """
@@ -388,6 +416,8 @@ class MLBasedPredictor(Predictor):
             The interval of time between model retraining. Defaults to 50.
         min_sample_size_h : float, optional
             The minimum length of time required to train the model. Defaults to 200.
+        execution_interval_h : float, optional
+            Time between two forecasts [h] (see Predictor). Defaults to None (a forecast at every call).
         **ann_kwargs
             Additional keyword arguments to pass to the MLPRegressor.
         """
@@ -395,7 +425,7 @@ class MLBasedPredictor(Predictor):
         if name is None:
             name = sensor_name
 
-        super().__init__(name=name, variable_to_predict=sensor_name)
+        super().__init__(name=name, variable_to_predict=sensor_name, execution_interval_h=execution_interval_h)
 
         self.model_type = model_type
 
@@ -424,6 +454,11 @@ class MLBasedPredictor(Predictor):
         self.is_trained = False
 
         # --- Model selection ---
+        # scikit-learn is imported here, so that it is only loaded when an ML-based predictor is used
+        from sklearn.neural_network import MLPRegressor
+        from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor, ExtraTreesRegressor
+        from sklearn.preprocessing import StandardScaler
+        from sklearn.multioutput import MultiOutputRegressor
         if self.model_type == "ann":
             self.model = MLPRegressor(**model_kwargs)
             self.x_scaler = StandardScaler()
@@ -603,17 +638,20 @@ class AutocorrPredictor(Predictor):
         Number of hours to predict into the future.
     lags_h : list of float
         List of lags to use in hours. Example: [1, 24, 168] for 1h, 24h, 1 week.
+    execution_interval_h : float, optional
+        Time between two forecasts [h] (see Predictor). Defaults to None (a forecast at every call).
     """
     def __init__(
         self,
         sensor_name: str,
         prediction_horizon_h: float,
         lags_h: list,
-        name: str = None
+        name: str = None,
+        execution_interval_h: float | None = None
     ):
         if name is None:
             name = sensor_name
-        super().__init__(name=name, variable_to_predict=sensor_name)
+        super().__init__(name=name, variable_to_predict=sensor_name, execution_interval_h=execution_interval_h)
 
         self.sensor_name = sensor_name
         self.prediction_horizon_h = prediction_horizon_h
@@ -701,6 +739,8 @@ class ProfileARPredictor(Predictor):
     sensor_name : str
     residual_lags_h : list of float
         Lags (in hours) for residual AR model (e.g. [1, 24])
+    execution_interval_h : float, optional
+        Time between two forecasts [h] (see Predictor)
     """
 
     def __init__(
@@ -710,11 +750,12 @@ class ProfileARPredictor(Predictor):
         residual_lags_h: list = [1, 24],
         name: str = None,
         buffer_size_h: float = 24 * 14,  # 2 weeks default
+        execution_interval_h: float | None = None,
     ):
         if name is None:
             name = sensor_name
 
-        super().__init__(name=name, variable_to_predict=sensor_name)
+        super().__init__(name=name, variable_to_predict=sensor_name, execution_interval_h=execution_interval_h)
 
         self.sensor_name = sensor_name
         self.prediction_horizon_h = prediction_horizon_h
@@ -33,6 +33,9 @@ class HeatPumpRuleBasedController(HeaterControllerWithBandwidth):
     max_storage_temperature_for_activation : float, default=60
         Maximum storage temperature for PV-based activation, in degrees
         Celsius.
+    execution_interval_h : float, optional
+        Time between two executions of the controller, in hours. Defaults
+        to None (executed at every time step).
     """
     def __init__(self, name, 
                  controlled_component: str, 
@@ -43,14 +46,16 @@ class HeatPumpRuleBasedController(HeaterControllerWithBandwidth):
                  power_PV_activation: float, 
                  max_storage_temperature_for_activation: float = 60,
                  minimum_time_off_between_activations_h: float | None = None,
-                 minimum_time_on_between_deactivations_h: float | None = None):
+                 minimum_time_on_between_deactivations_h: float | None = None,
+                 execution_interval_h: float | None = None):
         super().__init__(name, 
                          controlled_component, 
                          temperature_sensor, 
                          temperature_comfort, 
                          temperature_bandwidth,
                          minimum_time_off_between_activations_h,
-                         minimum_time_on_between_deactivations_h)
+                         minimum_time_on_between_deactivations_h,
+                         execution_interval_h)
         self.sensor_names.update({'PV power': PV_power_sensor})
         self.max_storage_temperature_for_activation = C2K(max_storage_temperature_for_activation)
         self.power_PV_activation = power_PV_activation
@@ -31,7 +31,8 @@ class Environment:
                  predictors: List[Predictor] = [],
                  environmental_data_provider: EnvironmentalDataProvider | None = None,
                  latitude: float | None = None,
-                 longitude: float | None = None
+                 longitude: float | None = None,
+                 signal_storage: Dict[str, str] | None = None
                  ):
         self.nodes: Dict[str, Node] = {}
         self.ports: Dict[str, Port] = {}
@@ -45,6 +46,8 @@ class Environment:
         self.environmental_data_provider = environmental_data_provider
         self.latitude = latitude
         self.longitude = longitude
+        # Overrides of the storage policy of the recorded signals, by signal name ("port:layer", "controller:component" or "sensor")
+        self.signal_storage = signal_storage if signal_storage else {}
         self.signal_registry_ports = SignalRegistry()
         self.signal_registry_controllers = SignalRegistry()
         self.signal_registry_sensors = SignalRegistry()
@@ -118,22 +121,38 @@ class Environment:
 
     
     def create_data_registry(self):
-        # We create a registry for each pair port-layer
+        # Registries are re-created at each initialization, so that running the same environment twice does not duplicate the columns
+        self.signal_registry_ports = SignalRegistry()
+        self.signal_registry_controllers = SignalRegistry()
+        self.signal_registry_sensors = SignalRegistry()
+        # We create a registry for each pair port-layer. Each object keeps the integer handles of its signals, which are
+        # used to record the data at each time step without looking up the registries
         for port_name, port in self.ports.items():
-            for layer in port.layers:
-                self.signal_registry_ports.register(port_name, layer)
-                if isinstance(port, FluidPort):
-                    self.signal_registry_ports.register(port_name, 'temperature')
+            port.signal_handles = {layer: self.signal_registry_ports.register(port_name, layer, port.signal_storage.get(layer, DEFAULT_POLICY))
+                                   for layer in port.layers}
+            if isinstance(port, FluidPort):
+                port.signal_handles['temperature'] = self.signal_registry_ports.register(port_name, 'temperature', port.signal_storage.get('temperature', DEFAULT_POLICY))
         # We create a registry for each pair controller-component that will store the action
         for controller_name, controller in self.controllers.items():
-            for component_name in controller.controlled_component_names:
-                self.signal_registry_controllers.register(controller_name, component_name)
-                if isinstance(controller, RLController):
-                    self.signal_registry_controllers.register(controller_name, "reward")
-                    self.signal_registry_controllers.register(controller_name, "td_error")
+            controller.signal_handles = {component_name: self.signal_registry_controllers.register(controller_name, component_name, controller.action_storage)
+                                         for component_name in controller.controlled_component_names}
+            if isinstance(controller, RLController):
+                controller.signal_handles['reward'] = self.signal_registry_controllers.register(controller_name, "reward")
+                controller.signal_handles['td_error'] = self.signal_registry_controllers.register(controller_name, "td_error")
         # We also create a registry for each sensor
-        for sensor_name in self.sensors.keys():
-            self.signal_registry_sensors.register(sensor_name, "")
+        for sensor_name, sensor in self.sensors.items():
+            sensor.signal_handle = self.signal_registry_sensors.register(sensor_name, "", sensor.storage)
+        self._apply_signal_storage_overrides()
+
+    def _apply_signal_storage_overrides(self):
+        for signal_name, storage in self.signal_storage.items():
+            main_key, _, secondary_key = signal_name.partition(":")
+            for registry in (self.signal_registry_ports, self.signal_registry_controllers, self.signal_registry_sensors):
+                if (main_key, secondary_key) in registry:
+                    registry.set_storage(main_key, secondary_key, storage)
+                    break
+            else:
+                raise KeyError(f'Cannot set the storage policy of signal "{signal_name}": no such signal is recorded')
 
     def connect_ports(self):
         for connection in self.connections:
@@ -1,18 +1,37 @@
+"""
+Ports connecting the components of an environment.
+
+Ports are the most numerous objects of an environment, so they (like the sensors) are slotted: the built-in classes
+have no instance dict. Subclasses that do not declare __slots__ get one back, and can set any attribute.
+"""
 from typing import List, Dict
+import numpy as np
 from energy_system_control.core.base_classes import InitContext
+from energy_system_control.constants import WATER
 
 class Port():
+    # Slotted, see the module docstring
+    __slots__ = ('name', 'layers', 'connected_port', 'flows', 'signal_handles', 'unit_flows', 'unit_T')
     name: str
+    layers: tuple
     connected_port: str
     flows: Dict[str, float]
+    # Storage policy of the recorded layers (see energy_system_control.sim.simulation_data). Missing layers use "float32"
+    signal_storage: Dict[str, str] = {}
+    signal_handles: Dict[str, int]  # Column of each recorded layer in the ports registry, assigned by the environment
+    # Per-unit values of the ports of fleet components (see components.base.FleetComponent). The flows hold their totals
+    unit_flows: Dict[str, np.ndarray] | None
+    unit_T: np.ndarray | None
     def __init__(self, name, layers):
         self.name = name
-        self.layers = layers
+        self.layers = tuple(layers)
         self.connected_port = None
+        self.unit_T = None
         self.reset_flow_data()  # Sets each 
 
     def reset_flow_data(self):
-        self.flows = {name: None for name in self.layers}
+        self.flows = dict.fromkeys(self.layers)
+        self.unit_flows = None
 
     def reset_state_value(self):
         pass # Only implemented for selected port types
@@ -50,9 +69,10 @@ class Port():
                 return ElectricPort(port_name)
 
 class HeatPort(Port):
+    __slots__ = ('T',)
     T: float
     def __init__(self, name):
-        super().__init__(name, ['heat'])
+        super().__init__(name, ('heat',))
 
     def reset_state_value(self):
         self.T = None 
@@ -62,10 +82,18 @@ class HeatPort(Port):
 
 
 class FluidPort(Port):
+    __slots__ = ('T', 'cp')
     T: float
+    # Specific heat [kJ/kgK] with which the component supplying the fluid computes its enthalpy flows. None for WATER.cp
+    cp: float | None
+    signal_storage = {'mass': 'sparse', 'heat': 'sparse'}
     def __init__(self, name):
-        super().__init__(name, ['mass', 'heat'])
+        super().__init__(name, ('mass', 'heat'))
         self.T = None
+        self.cp = None
+
+    def specific_heat(self) -> float:
+        return WATER.cp if self.cp is None else self.cp
         
     def reset_state_value(self):
         self.T = None
@@ -78,5 +106,6 @@ class FluidPort(Port):
         self.connected_port = self.T
 
 class ElectricPort(Port):
+    __slots__ = ()
     def __init__(self, name):
-        super().__init__(name, ['electricity'])
\ No newline at end of file
+        super().__init__(name, ('electricity',))
\ No newline at end of file
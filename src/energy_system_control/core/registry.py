@@ -1,5 +1,6 @@
 from dataclasses import dataclass, field
-from typing import Dict, List
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
 
 @dataclass(frozen=True)
 class SignalKey:
@@ -8,15 +9,62 @@ class SignalKey:
 
 @dataclass
 class SignalRegistry:
+    """
+    Registry mapping each signal (main key, secondary key) to its column in the recorded data.
+
+    The column index returned by ``register`` is a stable integer handle: objects that record data at each time step
+    should keep it, instead of looking it up again with ``col_index``.
+    """
     _key_to_col: Dict[SignalKey, int] = field(default_factory=dict)
     _col_to_key: List[SignalKey] = field(default_factory=list)
+    _col_to_storage: List[str] = field(default_factory=list)
+    # Two-level lookup table (main key -> secondary key -> column), used to avoid building a SignalKey at each lookup
+    _lookup: Dict[str, Dict[str, int]] = field(default_factory=dict)
 
-    def register(self, main_key: str, secondary_key: str) -> int:
+    def register(self, main_key: str, secondary_key: str, storage: str = "float32") -> int:
         key = SignalKey(main_key, secondary_key)
+        if key in self._key_to_col:
+            raise ValueError(f'Signal {main_key}:{secondary_key} is already registered')
         col = len(self._col_to_key)
         self._key_to_col[key] = col
         self._col_to_key.append(key)
+        self._col_to_storage.append(storage)
+        self._lookup.setdefault(main_key, {})[secondary_key] = col
         return col
 
     def col_index(self, main_key: str, secondary_key: str) -> int:
-        return self._key_to_col[SignalKey(main_key, secondary_key)]
\ No newline at end of file
+        try:
+            return self._lookup[main_key][secondary_key]
+        except KeyError:
+            raise KeyError(SignalKey(main_key, secondary_key)) from None
+
+    def col_indices(self, keys: Iterable[Tuple[str, str] | str]) -> np.ndarray:
+        """
+        Bulk lookup of the column indices of several signals
+
+        Parameters
+        ----------
+        keys : Iterable[Tuple[str, str] | str]
+            The signals to look up, as (main key, secondary key) pairs. A string is interpreted as a main key with an
+            empty secondary key (as used for sensors)
+        """
+        lookup = self._lookup
+        cols = []
+        for key in keys:
+            main_key, secondary_key = (key, "") if isinstance(key, str) else key
+            try:
+                cols.append(lookup[main_key][secondary_key])
+            except KeyError:
+                raise KeyError(SignalKey(main_key, secondary_key)) from None
+        return np.asarray(cols, dtype=np.intp)
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        main_key, secondary_key = key
+        return secondary_key in self._lookup.get(main_key, {})
+
+    def storage(self, col: int) -> str:
+        # Storage policy of the signal (see energy_system_control.sim.simulation_data)
+        return self._col_to_storage[col] if col < len(self._col_to_storage) else "float32"
+
+    def set_storage(self, main_key: str, secondary_key: str, storage: str):
+        self._col_to_storage[self.col_index(main_key, secondary_key)] = storage
@@ -1,12 +1,105 @@
+import calendar
+import importlib.util
+import sys
+from types import ModuleType
 import pandas as pd
 import numpy as np
-import pvlib
 from typing import List, Dict, Any, Literal
 from datetime import datetime
 
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Returns the module ``name``, which is only executed when one of its attributes is first accessed. Used for the
+    heavy dependencies that are only needed by a few classes (e.g. pvlib, requests), so that importing
+    energy_system_control stays fast. The module is registered in sys.modules, so that later imports share it.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+pvlib = lazy_import("pvlib")
+
 TimeAlignment = Literal["datetime", "yearly", "daily"]
 TimeMatch = Literal["nearest", "forward", "exact"]
 
+class PeriodicArray(np.lib.mixins.NDArrayOperatorsMixin):
+    """
+    One-dimensional array of a given length, whose values repeat periodically. Only one period is stored in memory,
+    and elements are accessed with modular indexing.
+
+    Element-wise operations with scalars (e.g. ``array * 1e-3``) return a new PeriodicArray; any other operation is
+    performed on the materialized array.
+
+    Parameters
+    ----------
+    period : np.ndarray
+        The values of one period
+    length : int
+        The total length of the array
+    """
+    def __init__(self, period: np.ndarray, length: int):
+        self.period = np.asarray(period).ravel()
+        self.length = int(length)
+
+    def __len__(self) -> int:
+        return self.length
+
+    @property
+    def shape(self):
+        return (self.length,)
+
+    @property
+    def ndim(self) -> int:
+        return 1
+
+    @property
+    def dtype(self):
+        return self.period.dtype
+
+    @property
+    def nbytes(self) -> int:
+        return self.period.nbytes
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self.period[np.arange(*key.indices(self.length)) % len(self.period)]
+        if isinstance(key, (int, np.integer)):
+            if not -self.length <= key < self.length:
+                raise IndexError(f'Index {key} is out of bounds for a PeriodicArray of length {self.length}')
+            return self.period[(key % self.length) % len(self.period)]
+        key = np.asarray(key)
+        if key.dtype == bool:
+            key = np.flatnonzero(key)
+        return self.period[(key % self.length) % len(self.period)]
+
+    def __array__(self, dtype=None, copy=None):
+        output = np.resize(self.period, self.length)  # np.resize repeats the input cyclically
+        return output if dtype is None else output.astype(dtype)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        other_inputs = [x for x in inputs if x is not self]
+        if method == "__call__" and "out" not in kwargs and all(np.ndim(x) == 0 for x in other_inputs):
+            return PeriodicArray(getattr(ufunc, method)(*[self.period if x is self else x for x in inputs], **kwargs), self.length)
+        inputs = [np.asarray(x) if isinstance(x, PeriodicArray) else x for x in inputs]
+        return getattr(ufunc, method)(*inputs, **kwargs)
+
+    def __iter__(self):
+        return iter(np.asarray(self))
+
+    def __repr__(self) -> str:
+        return f'PeriodicArray(period={self.period!r}, length={self.length})'
+
+
 def resample_with_interpolation(
     df: pd.DataFrame,
     target_freq: str,
@@ -57,63 +150,178 @@ def resample_with_interpolation(
     np.ndarray
         Resampled time series as a one-dimensional NumPy array.
     """
+    return np.asarray(resample_periodic(df, target_freq, simulation_end_s, var_type, simulation_start_datetime, time_alignment, match_method, tolerance))
+
+
+def resample_periodic(
+    df: pd.DataFrame,
+    target_freq: str,
+    simulation_end_s: float | None = None,
+    var_type: Literal["extensive", "intensive"] = "extensive",
+    simulation_start_datetime: datetime | None = None,
+    time_alignment: TimeAlignment = "datetime",
+    match_method: TimeMatch = "nearest",
+    tolerance: pd.Timedelta = pd.Timedelta(minutes=30)
+) -> PeriodicArray | np.ndarray:
+    """
+    Same as ``resample_with_interpolation``, but when the simulation is longer than the input data, only one period
+    of the input is resampled and the simulation horizon is covered by a PeriodicArray, whose memory usage does not
+    depend on the simulation length.
+
+    The input is treated as periodic: when the simulation starts in the middle of the data, the data is wrapped
+    around its end. A dense array is returned when the input cannot be treated as a single period (irregular time
+    step, or a period that is not a multiple of the target step). DataFrames with several columns are returned as a
+    flattened dense array, as in ``resample_with_interpolation``: use ``resample_columns`` to get them separately.
+    """
+    frame = df.to_frame() if isinstance(df, pd.Series) else df
+    output = resample_columns(frame, target_freq, simulation_end_s, var_type, simulation_start_datetime, time_alignment, match_method, tolerance, periodic=True)
+    if len(output) == 1:
+        return next(iter(output.values()))
+    return np.column_stack([np.asarray(values) for values in output.values()]).ravel()
+
+
+def resample_columns(
+    df: pd.DataFrame,
+    target_freq: str,
+    simulation_end_s: float | None = None,
+    var_types: Literal["extensive", "intensive"] | Dict[str, Literal["extensive", "intensive"]] = "intensive",
+    simulation_start_datetime: datetime | None = None,
+    time_alignment: TimeAlignment = "datetime",
+    match_method: TimeMatch = "nearest",
+    tolerance: pd.Timedelta = pd.Timedelta(minutes=30),
+    periodic: bool = False
+) -> Dict[str, np.ndarray | PeriodicArray]:
+    """
+    Resample all the columns of a DataFrame in one pass. The matching of the simulation start, the repetition of the
+    data and the inference of the original frequency are done once for the whole frame, and the columns sharing the
+    same variable type are resampled together.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Input DataFrame with a DatetimeIndex.
+
+    target_freq : str
+        New frequency (e.g. "15min", "1h", "1D").
+
+    simulation_end_s : float, optional
+        Simulation duration in seconds. If provided and longer than the
+        input data, the input time series is repeated as necessary.
+
+    var_types : {"extensive", "intensive"} or dict, optional
+        Type of each variable (see ``resample_with_interpolation``). A
+        single value applies to all the columns; columns missing from a
+        dictionary are treated as intensive.
+
+    periodic : bool, optional
+        If True, columns are returned as PeriodicArray objects whenever
+        possible (see ``resample_periodic``). Otherwise, they are converted
+        to dense arrays.
+
+    Returns
+    -------
+    dict
+        The resampled columns, as one-dimensional arrays keyed by column name.
+    """
 
     if not isinstance(df.index, pd.DatetimeIndex):
         raise ValueError("DataFrame must have a DatetimeIndex.")
 
+    if isinstance(var_types, str):
+        var_types = {column: var_types for column in df.columns}
+    groups: Dict[str, List[Any]] = {}
+    for column in df.columns:
+        groups.setdefault(var_types.get(column, "intensive"), []).append(column)
+
+    start_position = 0
     if simulation_start_datetime is not None:
-        matching_timestamp = _find_simulation_start_matching_index(
+        start_position = _find_simulation_start_matching_position(
                 index=df.index,
                 simulation_start=pd.Timestamp(simulation_start_datetime),
                 time_alignment=time_alignment,
                 tolerance=tolerance,
                 match_method=match_method
             )
-        df = df.loc[matching_timestamp:].copy()
-    else:
-        df = df.copy()
+
+    original_step = _infer_time_step(df.index)
+    output = {}
+
+    if simulation_end_s is None:
+        df = df.iloc[start_position:]
+        for var_type, columns in groups.items():
+            resampled = _resample_frame(df[columns].copy(), target_freq, var_type, original_step=original_step).to_numpy()
+            output.update({column: resampled[:, i] for i, column in enumerate(columns)})
+        return {column: output[column] for column in df.columns}
+
+    period = df.index[-1] - df.index[0] + (df.index[1] - df.index[0])
+    target_step = pd.to_timedelta(pd.tseries.frequencies.to_offset(target_freq))
+    simulation_end = pd.to_timedelta(simulation_end_s, unit="s")
 
     # ------------------------------------------------------------------
-    # Repeat the input data if necessary
+    # Rotate the input so that it starts at the matching timestamp
     # ------------------------------------------------------------------
 
-    if simulation_end_s is not None:
-        original_step = df.index[1] - df.index[0]
-        period = df.index[-1] - df.index[0] + original_step
+    values = np.roll(df.to_numpy(dtype=float), -start_position, axis=0)
+    t0 = df.index[start_position]
+    rotated = pd.DataFrame(values, index=t0 + (df.index - df.index[0]), columns=df.columns)
+
+    is_regular = pd.infer_freq(df.index) is not None if len(df.index) > 2 else True
+    first_bin = t0.normalize() + ((t0 - t0.normalize()) // target_step) * target_step
+    is_periodic = (
+        is_regular
+        and period % target_step == pd.Timedelta(0)
+        and first_bin == t0
+        and simulation_end >= period
+    )
 
-        n_repeat = int(
-            np.ceil(
-                pd.to_timedelta(simulation_end_s, unit="s") / period
-            )
-        )
+    # Number of resampled values: the output covers the (repeated) input up to its last timestamp not after the end
+    # of the simulation, plus one original time step
+    step = df.index[1] - df.index[0]
+    n_repeat = int(np.ceil(simulation_end / period))
+    last_position = min(simulation_end // step, n_repeat * len(df.index) - 1)
+    n_values = ((last_position + 1) * step) // target_step + 1
+
+    if not is_periodic:
+        # Materialize the repetitions of the input up to the end of the simulation
+        repeated = np.tile(rotated.to_numpy(), (n_repeat, 1))
+        index = t0 + pd.to_timedelta(np.arange(len(repeated)) * step)
+        repeated = pd.DataFrame(repeated, index=index, columns=rotated.columns)
+        repeated = repeated[repeated.index <= t0 + simulation_end]
+        for var_type, columns in groups.items():
+            resampled = _resample_frame(repeated[columns].copy(), target_freq, var_type, original_step=original_step).to_numpy()
+            output.update({column: resampled[:, i] for i, column in enumerate(columns)})
+        return {column: output[column] for column in df.columns}
+
+    # ------------------------------------------------------------------
+    # Resample a single period, closed by the first value of the next one
+    # ------------------------------------------------------------------
 
-        dfs = []
+    n_period = period // target_step
+    for var_type, columns in groups.items():
+        group = rotated[columns]
+        resampled = _resample_frame(group.copy(), target_freq, var_type, closing_value=group.iloc[0], original_step=original_step).to_numpy()
+        output.update({column: PeriodicArray(resampled[:n_period, i].copy(), n_values) for i, column in enumerate(columns)})
+    return {column: output[column] if periodic else np.asarray(output[column]) for column in df.columns}
 
-        for i in range(n_repeat):
-            df_copy = df.copy()
-            df_copy.index = df_copy.index + i * period
-            dfs.append(df_copy)
 
-        df = pd.concat(dfs)
+def _infer_time_step(index: pd.DatetimeIndex) -> pd.Timedelta:
+    original_freq = pd.infer_freq(index) if len(index) > 2 else None
+    if original_freq is None:
+        return index.to_series().diff().median()
+    return pd.to_timedelta(pd.tseries.frequencies.to_offset(original_freq))
 
-        # Trim to exact simulation end
-        simulation_end = (
-            df.index[0] + pd.to_timedelta(simulation_end_s, unit="s")
-        )
-        df = df[df.index <= simulation_end]
 
+def _resample_frame(df: pd.DataFrame, target_freq: str, var_type: str, closing_value: pd.Series | None = None, original_step: pd.Timedelta | None = None) -> pd.DataFrame:
+    """
+    Resamples the input to the target frequency. A final value, equal to ``closing_value`` or (if None) to the last
+    value of the input, is added one original time step after the end to avoid losing the last interval.
+    """
     # ------------------------------------------------------------------
     # Determine original resolution
     # ------------------------------------------------------------------
 
-    original_freq = pd.infer_freq(df.index)
-
-    if original_freq is None:
-        original_step = df.index.to_series().diff().median()
-    else:
-        original_step = pd.to_timedelta(
-            pd.tseries.frequencies.to_offset(original_freq)
-        )
+    if original_step is None:
+        original_step = _infer_time_step(df.index)
 
     target_step = pd.to_timedelta(
         pd.tseries.frequencies.to_offset(target_freq)
@@ -124,7 +332,7 @@ def resample_with_interpolation(
     # ------------------------------------------------------------------
 
     last_index = df.index[-1] + original_step
-    df.loc[last_index] = df.iloc[-1]
+    df.loc[last_index] = df.iloc[-1] if closing_value is None else closing_value
 
     # ------------------------------------------------------------------
     # Resampling
@@ -173,77 +381,107 @@ def resample_with_interpolation(
                     "Expected 'extensive' or 'intensive'."
                 )
 
-    return output.to_numpy().ravel()
+    return output
 
 
-def _find_simulation_start_matching_index(
+def align_timestamps(
     index: pd.DatetimeIndex,
     simulation_start: pd.Timestamp,
-    time_alignment: TimeAlignment,
-    tolerance: pd.Timedelta | None = pd.Timedelta(minutes=30),
-    match_method: TimeMatch = "nearest"
-) -> pd.Timestamp:
+    time_alignment: TimeAlignment
+) -> np.ndarray:
+    """
+    Map the timestamps of a time series to the simulation calendar, according to the time alignment. The mapping is
+    vectorized, and works on the wall-clock time of the index (time zones are dropped).
 
-    match time_alignment:
+    Parameters
+    ----------
+    index : pd.DatetimeIndex
+        The timestamps of the source time series.
 
-        case "datetime":
-            target = simulation_start
+    simulation_start : pd.Timestamp
+        Start datetime of the simulation.
 
-            # target_index = pd.DatetimeIndex([target])
-            target_index = index
+    time_alignment : {"datetime", "yearly", "daily"}
+        - "datetime": timestamps are not modified.
+        - "yearly": the year of each timestamp is replaced with the year
+          of the simulation start. February 29 is mapped to February 28
+          when the simulation year is not a leap year.
+        - "daily": the date of each timestamp is replaced with the date
+          of the simulation start.
 
-        case "yearly":
-            # Ignore the source year.
-            #
-            # Convert every source timestamp to the simulation year,
-            # preserving month, day and time.
-            try:
-                target_index = pd.DatetimeIndex(
-                    [
-                        timestamp.replace(year=simulation_start.year)
-                        for timestamp in index
-                    ]
-                )
-            except ValueError as exc:
-                raise ValueError(
-                    "Cannot map the source timestamps to the "
-                    f"simulation year {simulation_start.year}. "
-                    "This may be caused by February 29 in a "
-                    "non-leap simulation year."
-                ) from exc
+    Returns
+    -------
+    np.ndarray
+        The aligned timestamps, as a datetime64[ns] array.
+    """
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    simulation_start = pd.Timestamp(simulation_start)
+    if time_alignment == "datetime":
+        return index.to_numpy()
+    time_of_day = (index - index.normalize()).to_numpy()
+
+    match time_alignment:
 
-            target = simulation_start
+        case "yearly":
+            year = simulation_start.year
+            months = index.month.to_numpy()
+            days = index.day.to_numpy()
+            if not calendar.isleap(year):
+                days = np.where((months == 2) & (days == 29), 28, days)
+            month_starts = np.datetime64(f"{year:04d}-01", "M") + (months - 1)
+            dates = month_starts.astype("datetime64[D]") + (days - 1)
+            return dates.astype("datetime64[ns]") + time_of_day
 
         case "daily":
-            # Replace the date of every source timestamp with the
-            # simulation date, preserving the time of day.
-            target_index = pd.DatetimeIndex(
-                [
-                    timestamp.replace(
-                        year=simulation_start.year,
-                        month=simulation_start.month,
-                        day=simulation_start.day,
-                    )
-                    for timestamp in index
-                ]
-            )
-
-            target = simulation_start
+            return np.datetime64(simulation_start.normalize().to_datetime64(), "ns") + time_of_day
 
         case _:
             raise ValueError(
                 f"Invalid time_alignment: {time_alignment!r}."
             )
 
-    positions = target_index.get_indexer(
-        [target],
-        method=match_method,
-        tolerance=tolerance,
-    )
 
-    position = positions[0]
+def _find_simulation_start_matching_position(
+    index: pd.DatetimeIndex,
+    simulation_start: pd.Timestamp,
+    time_alignment: TimeAlignment,
+    tolerance: pd.Timedelta | None = pd.Timedelta(minutes=30),
+    match_method: TimeMatch = "nearest"
+) -> int:
+    """
+    Find the position of the source timestamp matching the simulation start. When several timestamps match equally
+    well (e.g. multi-day data with daily alignment), the first one is returned.
+
+    - "nearest": the closest aligned timestamp.
+    - "forward": the first aligned timestamp at or after the simulation start.
+    - "exact": an aligned timestamp equal to the simulation start.
+    """
+    simulation_start = pd.Timestamp(simulation_start)
+    if simulation_start.tz is not None:
+        if index.tz is not None:
+            simulation_start = simulation_start.tz_convert(index.tz)
+        simulation_start = simulation_start.tz_localize(None)
+    aligned = align_timestamps(index, simulation_start, time_alignment)
+    differences = (aligned - simulation_start.to_datetime64()).astype("timedelta64[ns]").astype(np.int64)
+
+    match match_method:
+        case "nearest":
+            distances = np.abs(differences)
+        case "forward":
+            distances = np.where(differences >= 0, differences, np.iinfo(np.int64).max)
+        case "exact":
+            distances = np.where(differences == 0, 0, np.iinfo(np.int64).max)
+        case _:
+            raise ValueError(
+                f"Invalid match_method: {match_method!r}. "
+                "Expected 'nearest', 'forward' or 'exact'."
+            )
 
-    if position == -1:
+    position = int(np.argmin(distances)) if len(distances) else -1
+    max_distance = np.iinfo(np.int64).max - 1 if tolerance is None else pd.Timedelta(tolerance).value
+
+    if position == -1 or distances[position] > max_distance:
         raise ValueError(
             f"Could not find a matching timestamp for "
             f"{simulation_start} using "
@@ -251,6 +489,17 @@ def _find_simulation_start_matching_index(
             f"within tolerance={tolerance}."
         )
 
+    return position
+
+
+def _find_simulation_start_matching_index(
+    index: pd.DatetimeIndex,
+    simulation_start: pd.Timestamp,
+    time_alignment: TimeAlignment,
+    tolerance: pd.Timedelta | None = pd.Timedelta(minutes=30),
+    match_method: TimeMatch = "nearest"
+) -> pd.Timestamp:
+    position = _find_simulation_start_matching_position(index, simulation_start, time_alignment, tolerance, match_method)
     return index[position]
 
 
@@ -373,6 +622,134 @@ def calculate_solar_angles(latitude: float, longitude: float, timestamps: pd.Dat
     return zenith, azimuth
 
 
+def solve_tridiagonal(ab: np.ndarray, d: np.ndarray, out: np.ndarray | None = None, work: np.ndarray | None = None) -> np.ndarray:
+    """
+    Solve tridiagonal systems with the Thomas algorithm. The matrices are given in the banded format of
+    ``scipy.linalg.solve_banded((1, 1), ab, d)``, but the call overhead is much lower for small systems, and a batch of
+    systems of the same size can be solved at once. No pivoting is done, so the matrices should be diagonally dominant.
+
+    Parameters
+    ----------
+    ab : np.ndarray
+        Banded matrices, with shape (3, n) or (m, 3, n) for a batch of m systems: row 0 contains the upper diagonal
+        (from column 1), row 1 the main diagonal and row 2 the lower diagonal (up to column n-2).
+
+    d : np.ndarray
+        Right-hand sides, with shape (n,) or (m, n).
+
+    out : np.ndarray, optional
+        Array where the solution is written. It may be ``d`` itself, which is then overwritten.
+
+    work : np.ndarray, optional
+        Work array with the same shape as ``d``, to avoid allocating it at each call (only used for batches).
+
+    Returns
+    -------
+    np.ndarray
+        The solutions, with the same shape as ``d``.
+    """
+    n = d.shape[-1]
+    if out is None:
+        out = np.empty(d.shape, dtype=np.result_type(ab.dtype, d.dtype, np.float64))
+    if d.ndim == 1:
+        # Single system: a plain loop on Python floats is faster than numpy operations on single elements
+        upper, diag, lower = ab.tolist()
+        x = d.tolist()
+        c_prime = [0.0] * n
+        denominator = diag[0]
+        x[0] /= denominator
+        for i in range(1, n):
+            c_prime[i - 1] = upper[i] / denominator
+            denominator = diag[i] - lower[i - 1] * c_prime[i - 1]
+            x[i] = (x[i] - lower[i - 1] * x[i - 1]) / denominator
+        for i in range(n - 2, -1, -1):
+            x[i] -= c_prime[i] * x[i + 1]
+        out[:] = x
+        return out
+
+    # Batch of systems: the recursion runs along the layers, vectorized over the systems
+    c_prime = work if work is not None else np.empty(d.shape)
+    upper, diag, lower = ab[:, 0, :], ab[:, 1, :], ab[:, 2, :]
+    denominator = diag[:, 0]
+    np.divide(d[:, 0], denominator, out=out[:, 0])
+    for i in range(1, n):
+        np.divide(upper[:, i], denominator, out=c_prime[:, i - 1])
+        denominator = diag[:, i] - lower[:, i - 1] * c_prime[:, i - 1]
+        out[:, i] = (d[:, i] - lower[:, i - 1] * out[:, i - 1]) / denominator
+    for i in range(n - 2, -1, -1):
+        out[:, i] -= c_prime[:, i] * out[:, i + 1]
+    return out
+
+
+def factorize_tridiagonal(ab: np.ndarray) -> tuple:
+    """
+    Forward-elimination factors of a tridiagonal matrix (in the banded format of ``solve_tridiagonal``), which can be
+    reused by ``solve_factorized_tridiagonal`` to solve systems with the same matrix and different right-hand sides.
+    """
+    upper, diag, lower = ab.tolist()
+    n = len(diag)
+    c_prime = [0.0] * n
+    inverse_denominator = [0.0] * n
+    inverse_denominator[0] = 1.0 / diag[0]
+    for i in range(1, n):
+        c_prime[i - 1] = upper[i] * inverse_denominator[i - 1]
+        inverse_denominator[i] = 1.0 / (diag[i] - lower[i - 1] * c_prime[i - 1])
+    return c_prime, inverse_denominator, lower
+
+
+def solve_factorized_tridiagonal(factors: tuple, d: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    """
+    Solve a tridiagonal system with the factors returned by ``factorize_tridiagonal``. ``out`` may be ``d`` itself.
+    """
+    c_prime, inverse_denominator, lower = factors
+    n = len(inverse_denominator)
+    x = d.tolist()
+    x[0] *= inverse_denominator[0]
+    for i in range(1, n):
+        x[i] = (x[i] - lower[i - 1] * x[i - 1]) * inverse_denominator[i]
+    for i in range(n - 2, -1, -1):
+        x[i] -= c_prime[i] * x[i + 1]
+    if out is None:
+        return np.array(x)
+    out[:] = x
+    return out
+
+
+def bilinear_interpolation(x_grid: np.ndarray, y_grid: np.ndarray, values: np.ndarray, x, y) -> np.ndarray:
+    """
+    Bilinear interpolation of one or more tables defined on a regular (x, y) grid. Points outside the grid are
+    clamped to its boundary.
+
+    Parameters
+    ----------
+    x_grid : np.ndarray
+        Increasing grid values along the first axis of the tables (n_x)
+    y_grid : np.ndarray
+        Increasing grid values along the second axis of the tables (n_y)
+    values : np.ndarray
+        The tables, of shape (n_x, n_y) or (n_tables, n_x, n_y)
+    x, y : float | np.ndarray
+        The query points. Arrays are broadcast against each other
+
+    Returns
+    -------
+    np.ndarray
+        The interpolated values, with the broadcast shape of x and y (preceded by n_tables, if more tables are given)
+    """
+    x, y = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+    i, t = _grid_position(x_grid, x)
+    j, u = _grid_position(y_grid, y)
+    return (values[..., i, j] * (1 - t) * (1 - u) + values[..., i + 1, j] * t * (1 - u)
+            + values[..., i, j + 1] * (1 - t) * u + values[..., i + 1, j + 1] * t * u)
+
+
+def _grid_position(grid: np.ndarray, x: np.ndarray) -> tuple:
+    # Index of the grid interval containing x, and relative position of x inside it (clamped to [0, 1])
+    i = np.clip(np.searchsorted(grid, x, side='right') - 1, 0, len(grid) - 2)
+    t = np.clip((x - grid[i]) / (grid[i + 1] - grid[i]), 0.0, 1.0)
+    return i, t
+
+
 class NodeImbalanceError(Exception):
     pass
 
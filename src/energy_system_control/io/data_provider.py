@@ -11,20 +11,82 @@ EnvironmentalDataProvider
     Abstract base class defining the interface for environmental data providers.
 CSVEnvironmentalProvider
     Reads environmental data from CSV files with automatic resampling.
+StreamingEnvironmentalProvider
+    Reads and resamples environmental data in chunks, keeping the memory bounded for very long inputs.
 APIEnvironmentalProvider
     Fetches environmental data from external APIs in real-time.
+PrefetchingAPIEnvironmentalProvider
+    Fetches windows of environmental data from external APIs ahead of time, on a background thread.
 """
 
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Literal
+import numpy as np
 import pandas as pd
 from energy_system_control.core.base_classes import EnvironmentalData
 from energy_system_control.sim.config import SimulationConfig
 from energy_system_control.sim.state import SimulationState
-from energy_system_control.helpers import resample_with_interpolation, C2K
+from energy_system_control.helpers import C2K, TimeAlignment, _resample_frame
+from energy_system_control.io.resample_cache import cached_resample_columns
 from energy_system_control.io.weather_api import WeatherAPI
+import importlib.util
 import os
 
 
+def read_environmental_data(path: str, datetime_column: str = "datetime", engine: Literal["auto", "pandas", "pyarrow"] = "auto") -> pd.DataFrame:
+    """
+    Read a CSV or Parquet file containing environmental data, returning a DataFrame indexed by datetime.
+
+    Parameters
+    ----------
+    path : str
+        Path to the file. Files with the ".parquet" extension are read as Parquet files, any other file as CSV
+    datetime_column : str
+        Name of the column containing the timestamps
+    engine : {"auto", "pandas", "pyarrow"}
+        Engine used to parse CSV files. "pyarrow" uses the multi-threaded pyarrow parser, "pandas" the default C
+        parser, and "auto" uses pyarrow when it is installed. Parquet files always require pyarrow
+
+    Returns
+    -------
+    pd.DataFrame
+        The environmental data, with a DatetimeIndex
+    """
+    if path.endswith(".parquet"):
+        df = pd.read_parquet(path)
+    else:
+        if engine == "auto":
+            engine = "pyarrow" if importlib.util.find_spec("pyarrow") is not None else "pandas"
+        df = pd.read_csv(path, engine="pyarrow" if engine == "pyarrow" else "c")
+    if datetime_column in df.columns:
+        df = df.set_index(datetime_column)
+    # Timestamps are parsed in one vectorized call after reading, which is faster than parsing them while reading
+    if not isinstance(df.index, pd.DatetimeIndex):
+        df.index = pd.to_datetime(df.index)
+    return df
+
+
+ENVIRONMENTAL_VARIABLES = ('temperature_ambient', 'temperature_cold_water', 'direct_irradiation', 'diffuse_irradiation')
+
+
+def _to_environmental_data(values: dict) -> EnvironmentalData:
+    """Builds the EnvironmentalData of one time step. Missing variables are set to None, temperatures in °C are converted to K"""
+    temp_env_data = {}
+    for key in ENVIRONMENTAL_VARIABLES:
+        temp_env_data[key] = values.get(key)
+        if "temperature" in key and temp_env_data[key] is not None:
+            if temp_env_data[key] < 200:  # Assuming we never work with temperatures below 200K
+                temp_env_data[key] = C2K(temp_env_data[key])
+    return EnvironmentalData(
+        temperature_ambient=temp_env_data["temperature_ambient"],
+        temperature_cold_water=temp_env_data["temperature_cold_water"],
+        direct_irradiation=temp_env_data["direct_irradiation"],
+        diffuse_irradiation=temp_env_data["diffuse_irradiation"]
+    )
+
+
 class EnvironmentalDataProvider(ABC):
     """
     Abstract base class for environmental data providers.
@@ -117,7 +179,14 @@ class CustomEnvironmentalProvider(EnvironmentalDataProvider):
     Additional custom columns may be included and will be loaded automatically.
     """
 
-    def __init__(self, data_path: str | None = None, filename:str | None = None, column_names: dict[str,str] | None = None, df: pd.DataFrame | None = None, var_types=None):
+    def __init__(self, 
+                 data_path: str | None = None, 
+                 filename:str | None = None, 
+                 column_names: dict[str,str] | None = None, 
+                 df: pd.DataFrame | None = None, 
+                 var_types: dict[str, Literal["intensive", "extensive"]] | None = None,
+                 time_alignment: TimeAlignment = "datetime",
+                 reader_engine: Literal["auto", "pandas", "pyarrow"] = "auto"):
         """
         Initialize the CSV environmental data provider.
 
@@ -126,15 +195,24 @@ class CustomEnvironmentalProvider(EnvironmentalDataProvider):
         data_path : str, optional
             Path to the data folder in the project
         filename: str, optional
-            Name of the CSV file containing the environmental data.
+            Name of the file containing the environmental data. Both CSV and Parquet (.parquet) files are supported
         column_names: dict, optional
             A dictionary mapping the required column names to the ones in the file (format: {'new_name': 'old_name'})
         df: pandas Dataframe, optional
             A pandas DataFrame containing the environmental data. If provided, the `data_path` and `filename` parameters are not used. If not provided, the data is loaded from the csv file
+        var_types: dict, optional
+            Dictionary mapping variable names to their type ('intensive' or 'extensive'). Missing variables are treated as intensive
+        time_alignment: str, optional
+            How the data is aligned to the simulation start ("datetime", "yearly" or "daily")
+        reader_engine: str, optional
+            Engine used to read the file (see read_environmental_data)
         """
         self.csv_path = os.path.join(data_path, filename) if data_path is not None else None
         self.column_names = column_names
         self.raw_data = df
+        self.var_types = var_types if var_types else {}
+        self.time_alignment = time_alignment
+        self.reader_engine = reader_engine
         self.data = {}
         self.datetime_index = None
 
@@ -144,7 +222,7 @@ class CustomEnvironmentalProvider(EnvironmentalDataProvider):
 
         Reads the CSV file, resamples all data columns to match the simulation
         time step, and stores the result in the `data` attribute for fast
-        retrieval during simulation.
+        retrieval during simulation. All the columns are resampled in one pass.
 
         Parameters
         ----------
@@ -159,25 +237,18 @@ class CustomEnvironmentalProvider(EnvironmentalDataProvider):
             If required columns are missing from the CSV file.
         """
         if self.raw_data is None:
-            self.raw_data = pd.read_csv(self.csv_path, parse_dates=["datetime"])
-            self.raw_data = self.raw_data.set_index("datetime")
+            self.raw_data = read_environmental_data(self.csv_path, engine=self.reader_engine)
         if self.column_names is not None:
-            self.raw_data.rename(columns = self.column_names)
-
-        target_freq = f"{int(cfg.time_step_h*3600)}s"
-
-        for col in self.raw_data.columns:
-
-            arr = resample_with_interpolation(
-                self.raw_data[[col]],
-                target_freq=target_freq,
-                simulation_end_s=cfg.simulation_end_h*3600.0,
-                simulation_start_datetime = cfg.simulation_start_datetime,
-                var_type='intensive',
-            )
-
-            # flatten (N,1) → (N,)
-            self.data[col] = arr.flatten()
+            self.raw_data = self.raw_data.rename(columns = {old_name: new_name for new_name, old_name in self.column_names.items()})
+
+        self.data = cached_resample_columns(
+            self.raw_data,
+            target_freq=f"{int(cfg.time_step_h*3600)}s",
+            simulation_end_s=cfg.simulation_end_h*3600.0,
+            simulation_start_datetime=cfg.simulation_start_datetime,
+            var_types=self.var_types,
+            time_alignment=self.time_alignment,
+        )
 
     def get_environmental_data(self, time_id: int, current_time: pd.Timestamp) -> EnvironmentalData:
         """
@@ -207,21 +278,281 @@ class CustomEnvironmentalProvider(EnvironmentalDataProvider):
         IndexError
             If time_id exceeds the available data range.
         """
-        temp_env_data = {}
-        for key in {'temperature_ambient', 'temperature_cold_water', 'direct_irradiation', 'diffuse_irradiation'}:
-            if key in self.data.keys():
-                temp_env_data[key] = self.data[key][time_id]
-            else:
-                temp_env_data[key] = None
-            if "temperature" in key:
-                if temp_env_data[key] < 200:  # Assuming we never work with temperatures below 200K
-                    temp_env_data[key] = C2K(temp_env_data[key])
-        return EnvironmentalData(
-            temperature_ambient=temp_env_data["temperature_ambient"],
-            temperature_cold_water=temp_env_data["temperature_cold_water"],
-            direct_irradiation=temp_env_data["direct_irradiation"],
-            diffuse_irradiation=temp_env_data["diffuse_irradiation"]
-        )
+        return _to_environmental_data({key: values[time_id] for key, values in self.data.items() if key in ENVIRONMENTAL_VARIABLES})
+
+
+class StreamingEnvironmentalProvider(EnvironmentalDataProvider):
+    """
+    Environmental data provider that reads and resamples the source in chunks, ahead of the simulation.
+
+    Unlike CustomEnvironmentalProvider, the source is never loaded in memory as a whole: the raw data is read in
+    chunks of ``chunk_rows`` rows and resampled in blocks of about ``block_h`` hours as the simulation advances. Only
+    the block containing the current time step and the blocks covering the prefetch window are kept, so the memory
+    used does not depend on the length of the input (e.g. multi-decade climate scenarios at sub-hourly resolution).
+
+    The source must have a regular time step and cover the whole simulation: the data is matched to the simulation
+    start by datetime, and it is not repeated.
+
+    Examples
+    --------
+    >>> provider = StreamingEnvironmentalProvider(data_path="data", filename="climate_2020_2070.csv", block_h=24*30)
+    >>> provider.initialize(cfg=SimulationConfig(time_step_h=0.25, simulation_end_h=50*8760))
+    >>> env_data = provider.get_environmental_data(time_id=0, current_time=pd.Timestamp('2020-01-01'))
+    >>> forecast = provider.get_values("temperature_ambient", start_id=0, n_steps=96)
+
+    Attributes
+    ----------
+    original_step : pd.Timedelta
+        Time step of the source data.
+    block_steps : int
+        Number of simulation time steps resampled at once.
+    prefetch_steps : int
+        Number of time steps after the current one that are kept available, e.g. for the predictors.
+    """
+
+    def __init__(self,
+                 data_path: str | None = None,
+                 filename: str | None = None,
+                 column_names: dict[str, str] | None = None,
+                 df: pd.DataFrame | None = None,
+                 var_types: dict[str, Literal["intensive", "extensive"]] | None = None,
+                 block_h: float = 168.0,
+                 prefetch_h: float | None = None,
+                 chunk_rows: int = 10_000,
+                 datetime_column: str = "datetime",
+                 tolerance: pd.Timedelta = pd.Timedelta(minutes=30)):
+        """
+        Initialize the streaming environmental data provider.
+
+        Parameters
+        ----------
+        data_path : str, optional
+            Path to the data folder in the project
+        filename: str, optional
+            Name of the file containing the environmental data. CSV files are read with pandas, Parquet (.parquet)
+            files by record batches, which requires pyarrow
+        column_names: dict, optional
+            A dictionary mapping the required column names to the ones in the file (format: {'new_name': 'old_name'})
+        df: pandas Dataframe, optional
+            A pandas DataFrame containing the environmental data, used instead of the file. It is still resampled in
+            blocks, which is mostly useful for testing
+        var_types: dict, optional
+            Dictionary mapping variable names to their type ('intensive' or 'extensive'). Missing variables are treated as intensive
+        block_h: float, optional
+            Approximate duration [h] of the blocks resampled at once. It is rounded up so that each block contains
+            an integer number of source rows and of simulation time steps
+        prefetch_h: float, optional
+            Duration [h] after the current time step that is kept available. Defaults to the prediction horizon margin
+            of the simulation configuration
+        chunk_rows: int, optional
+            Number of rows read from the source at once
+        datetime_column: str, optional
+            Name of the column containing the timestamps
+        tolerance: pd.Timedelta, optional
+            Maximum distance between the simulation start and the first timestamp of the source used
+        """
+        self.csv_path = os.path.join(data_path, filename) if data_path is not None else None
+        self.column_names = column_names
+        self.raw_data = df
+        self.var_types = var_types if var_types else {}
+        self.block_h = block_h
+        self.prefetch_h = prefetch_h
+        self.chunk_rows = chunk_rows
+        self.datetime_column = datetime_column
+        self.tolerance = tolerance
+        self.original_step = None
+        self.block_steps = None
+        self.prefetch_steps = None
+        self._blocks: "OrderedDict[int, dict[str, np.ndarray]]" = OrderedDict()
+
+    def initialize(self, state: SimulationState | None = None, cfg: SimulationConfig | None = None):
+        """
+        Open the source, skip the data before the simulation start and resample the first blocks.
+
+        Parameters
+        ----------
+        cfg : SimulationConfig
+            Simulation configuration containing time step, start, and end times.
+
+        Raises
+        ------
+        ValueError
+            If the source does not cover the simulation start, or if its time step is not compatible with the
+            simulation time step.
+        """
+        self.target_freq = f"{int(cfg.time_step_s)}s"
+        target_s = int(cfg.time_step_s)
+        prefetch_h = self.prefetch_h if self.prefetch_h is not None else cfg.prediction_horizon_margin_h
+        self.prefetch_steps = int(np.ceil(prefetch_h / cfg.time_step_h))
+
+        # Skip the chunks preceding the simulation start
+        start = pd.Timestamp(cfg.simulation_start_datetime)
+        self._chunks = self._iter_chunks()
+        self._exhausted = False
+        self._buffer = None
+        while not self._exhausted and (self._buffer is None or len(self._buffer) < 2):
+            chunk = self._read_chunk()
+            if chunk is not None:
+                chunk = chunk[chunk.index >= start]
+                self._buffer = chunk if self._buffer is None else pd.concat([self._buffer, chunk])
+        if self._buffer is None or len(self._buffer) < 2:
+            raise ValueError(f"The environmental data does not contain at least two values after the simulation start ({start})")
+        t0 = self._buffer.index[0]
+        if t0 - start > self.tolerance:
+            raise ValueError(f"The environmental data starts at {t0}, too far from the simulation start ({start})")
+
+        self.original_step = self._buffer.index[1] - t0
+        original_s = int(self.original_step.total_seconds())
+        target_step = pd.Timedelta(seconds=target_s)
+        if t0.normalize() + ((t0 - t0.normalize()) // target_step) * target_step != t0:
+            raise ValueError(f"The first timestamp of the environmental data ({t0}) is not aligned with the simulation time step")
+
+        # Each block must contain an integer number of source rows and of simulation time steps
+        rows_unit = np.lcm(original_s, target_s) // original_s
+        block_rows = max(1, int(round(self.block_h * 3600 / original_s)))
+        self._block_rows = int(-(-block_rows // rows_unit) * rows_unit)
+        self.block_steps = self._block_rows * original_s // target_s
+
+        self._blocks.clear()
+        self._next_block = 0
+        self._load_until(self.prefetch_steps)
+
+    def get_environmental_data(self, time_id: int, current_time: pd.Timestamp) -> EnvironmentalData:
+        """
+        Get environmental data for a specific simulation timestep. The blocks preceding the current one are
+        discarded, and the blocks covering the prefetch window are resampled if necessary.
+
+        Parameters
+        ----------
+        time_id : int
+            Simulation timestep index (0-indexed). It must not decrease during the simulation.
+        current_time : pd.Timestamp
+            Current simulation time (informational, not used for data lookup).
+
+        Returns
+        -------
+        EnvironmentalData
+            Environmental data object for the time step.
+
+        Raises
+        ------
+        IndexError
+            If time_id exceeds the available data range, or if it refers to a block that was already discarded.
+        """
+        current_block = time_id // self.block_steps
+        while self._blocks and next(iter(self._blocks)) < current_block:
+            self._blocks.popitem(last=False)
+        self._load_until(time_id + self.prefetch_steps)
+        block = self._get_block(current_block)
+        position = time_id - current_block * self.block_steps
+        return _to_environmental_data({key: values[position] for key, values in block.items() if key in ENVIRONMENTAL_VARIABLES})
+
+    def get_values(self, key: str, start_id: int, n_steps: int) -> np.ndarray:
+        """
+        Returns the resampled values of one variable over a range of time steps, e.g. for a predictor. The range
+        should lie within the prefetch window of the current time step, otherwise the blocks in between are
+        resampled (and kept in memory) as well.
+
+        Parameters
+        ----------
+        key : str
+            Name of the variable
+        start_id : int
+            Index of the first time step
+        n_steps : int
+            Number of time steps
+        """
+        self._load_until(start_id + n_steps - 1)
+        output = []
+        time_id = start_id
+        while time_id < start_id + n_steps:
+            block_id = time_id // self.block_steps
+            values = self._get_block(block_id)[key]
+            position = time_id - block_id * self.block_steps
+            output.append(values[position:position + start_id + n_steps - time_id])
+            if block_id + 1 not in self._blocks:
+                break
+            time_id = (block_id + 1) * self.block_steps
+        output = np.concatenate(output)
+        if len(output) < n_steps:
+            raise IndexError(f"The environmental data ends before time step {start_id + n_steps - 1}")
+        return output
+
+    @property
+    def nbytes(self) -> int:
+        """Memory [bytes] used by the resampled blocks and by the raw data read ahead"""
+        output = sum(values.nbytes for block in self._blocks.values() for values in block.values())
+        return output + (int(self._buffer.memory_usage(index=True).sum()) if self._buffer is not None else 0)
+
+    def _get_block(self, block_id: int) -> dict:
+        if block_id not in self._blocks:
+            if self._blocks and block_id < next(iter(self._blocks)):
+                raise IndexError(f"Block {block_id} of the environmental data was already discarded: time steps must not go backwards")
+            raise IndexError(f"The environmental data ends before block {block_id}")
+        return self._blocks[block_id]
+
+    def _load_until(self, time_id: int):
+        """Resamples the blocks up to the one containing time_id, stopping silently at the end of the source"""
+        while self._next_block * self.block_steps <= time_id and self._load_next_block():
+            pass
+
+    def _load_next_block(self) -> bool:
+        while len(self._buffer) <= self._block_rows and not self._exhausted:
+            chunk = self._read_chunk()
+            if chunk is not None:
+                self._buffer = pd.concat([self._buffer, chunk])
+        if len(self._buffer) == 0:
+            return False
+        rows = self._buffer.iloc[:self._block_rows]
+        is_last = len(self._buffer) <= self._block_rows
+        closing = None if is_last else self._buffer.iloc[self._block_rows]
+        index = self._buffer.index[:self._block_rows + 1]
+        if len(index) > 1 and (index[1:] - index[:-1] != self.original_step).any():
+            raise ValueError(f"The environmental data must have a regular time step of {self.original_step} (irregular data after {index[0]})")
+
+        # The block is closed by the first row of the next one, as if the whole source was resampled at once.
+        # The last block keeps the closing value, like the output of resample_columns
+        n_values = None if is_last else self.block_steps
+        block = {}
+        for var_type in ("intensive", "extensive"):
+            columns = [column for column in rows.columns if self.var_types.get(column, "intensive") == var_type]
+            if columns:
+                resampled = _resample_frame(rows[columns].copy(), self.target_freq, var_type,
+                                            closing_value=None if closing is None else closing[columns],
+                                            original_step=self.original_step).to_numpy()
+                block.update({column: resampled[:n_values, i].copy() for i, column in enumerate(columns)})
+        self._blocks[self._next_block] = {column: block[column] for column in rows.columns}
+        self._next_block += 1
+        self._buffer = self._buffer.iloc[self._block_rows:]
+        return True
+
+    def _read_chunk(self) -> pd.DataFrame | None:
+        try:
+            return next(self._chunks)
+        except StopIteration:
+            self._exhausted = True
+            return None
+
+    def _iter_chunks(self):
+        if self.raw_data is not None:
+            for i in range(0, len(self.raw_data), self.chunk_rows):
+                yield self._prepare_chunk(self.raw_data.iloc[i:i + self.chunk_rows])
+        elif self.csv_path.endswith(".parquet"):
+            import pyarrow.parquet as pq
+            for batch in pq.ParquetFile(self.csv_path).iter_batches(batch_size=self.chunk_rows):
+                yield self._prepare_chunk(batch.to_pandas())
+        else:
+            for chunk in pd.read_csv(self.csv_path, chunksize=self.chunk_rows):
+                yield self._prepare_chunk(chunk)
+
+    def _prepare_chunk(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        if self.datetime_column in chunk.columns:
+            chunk = chunk.set_index(self.datetime_column)
+        if not isinstance(chunk.index, pd.DatetimeIndex):
+            chunk.index = pd.to_datetime(chunk.index)
+        if self.column_names is not None:
+            chunk = chunk.rename(columns={old_name: new_name for new_name, old_name in self.column_names.items()})
+        return chunk.astype(float)
 
 
 class APIEnvironmentalProvider(EnvironmentalDataProvider):
@@ -338,4 +669,129 @@ class APIEnvironmentalProvider(EnvironmentalDataProvider):
             temperature_ambient=data["temperature"],
             direct_irradiation=data["dni"],
             diffuse_irradiation=data["dhi"]
-        )
\ No newline at end of file
+        )
+
+
+class PrefetchingAPIEnvironmentalProvider(EnvironmentalDataProvider):
+    """
+    Environmental data provider that fetches windows of hourly weather from an API on a background thread.
+
+    Unlike APIEnvironmentalProvider, which sends a request at each time step, the weather is fetched in windows of
+    ``window_h`` hours with one request each. The next window is requested in the background as soon as the data
+    left after the current time is shorter than the prefetch horizon, so that the simulation step does not wait for
+    the network as long as each request takes less time than the simulation needs to go through that horizon.
+    The hourly values are held constant within each hour.
+
+    Examples
+    --------
+    >>> api = OpenMeteoAPI(latitude=45.5, longitude=9.2, session=make_session(), cache=ResponseCache(ttl_s=900))
+    >>> provider = PrefetchingAPIEnvironmentalProvider(api, window_h=48)
+    >>> provider.initialize(cfg=cfg)
+    >>> env_data = provider.get_environmental_data(time_id=0, current_time=cfg.simulation_start_datetime)
+    >>> provider.close()
+
+    Attributes
+    ----------
+    data : pd.DataFrame
+        The hourly weather fetched so far and not yet discarded
+    n_blocking_fetches : int
+        Number of time steps that had to wait for a request to complete
+    """
+
+    def __init__(self, api_client: WeatherAPI, window_h: int = 48, prefetch_h: float | None = None):
+        """
+        Initialize the prefetching API environmental data provider.
+
+        Parameters
+        ----------
+        api_client : WeatherAPI
+            Client implementing ``get_weather_window(start, end)``, e.g. OpenMeteoAPI
+        window_h : int, optional
+            Number of hours fetched with each request
+        prefetch_h : float, optional
+            Number of hours after the current time that should be available. Defaults to the prediction horizon
+            margin of the simulation configuration. It must be shorter than ``window_h``
+        """
+        self.api_client = api_client
+        self.window_h = window_h
+        self.prefetch_h = prefetch_h
+        self.data = None
+        self.n_blocking_fetches = 0
+        self._executor = None
+        self._pending = None
+
+    def initialize(self, state: SimulationState | None = None, cfg: SimulationConfig | None = None):
+        """Fetch the first window (synchronously), and start prefetching the next one if needed"""
+        prefetch_h = self.prefetch_h if self.prefetch_h is not None else cfg.prediction_horizon_margin_h
+        if prefetch_h >= self.window_h:
+            raise ValueError(f"The prefetch horizon ({prefetch_h} h) must be shorter than the fetched window ({self.window_h} h)")
+        self._prefetch = pd.Timedelta(hours=prefetch_h)
+        self.close()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="weather-prefetch")
+        self.data = self._fetch(pd.Timestamp(cfg.simulation_start_datetime).floor("h"))
+        self._prefetch_after(pd.Timestamp(cfg.simulation_start_datetime))
+
+    def get_environmental_data(self, time_id: int, current_time: pd.Timestamp) -> EnvironmentalData:
+        """
+        Get the environmental data at the current time from the prefetched windows.
+
+        Parameters
+        ----------
+        time_id : int
+            Simulation timestep index (informational, not used for data lookup).
+        current_time : pd.Timestamp
+            Current simulation time. Times must not go backwards by more than one hour.
+
+        Returns
+        -------
+        EnvironmentalData
+            Environmental data object containing the ambient temperature and the irradiation.
+        """
+        current_time = pd.Timestamp(current_time)
+        while self._end() <= current_time:
+            # The prefetch did not keep up with the simulation: wait for the next window
+            if self._pending is None:
+                self._prefetch_after(current_time, force=True)
+            self.n_blocking_fetches += 1
+            self._collect(current_time, wait=True)
+        self._collect(current_time, wait=False)
+        self._prefetch_after(current_time)
+
+        position = self.data.index.searchsorted(current_time, side="right") - 1
+        if position < 0:
+            raise IndexError(f"The weather data before {current_time} was already discarded")
+        row = self.data.iloc[position]
+        return EnvironmentalData(
+            temperature_ambient=row["temperature"],
+            direct_irradiation=row["dni"],
+            diffuse_irradiation=row["dhi"]
+        )
+
+    def close(self):
+        """Stop the background thread. Pending requests are completed, but their result is discarded"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        self._executor = None
+        self._pending = None
+
+    def _end(self) -> pd.Timestamp:
+        """End of the period covered by the data fetched so far"""
+        return self.data.index[-1] + pd.Timedelta(hours=1)
+
+    def _fetch(self, start: pd.Timestamp) -> pd.DataFrame:
+        return self.api_client.get_weather_window(start, start + pd.Timedelta(hours=self.window_h - 1))
+
+    def _prefetch_after(self, current_time: pd.Timestamp, force: bool = False):
+        if self._pending is None and (force or self._end() - current_time < self._prefetch):
+            self._pending = self._executor.submit(self._fetch, self._end())
+
+    def _collect(self, current_time: pd.Timestamp, wait: bool):
+        """Append the prefetched window, if available, discarding the hours before the previous one"""
+        if self._pending is None or not (wait or self._pending.done()):
+            return
+        window = self._pending.result()  # Raises the exception of the request, if any
+        self._pending = None
+        data = pd.concat([self.data, window[window.index > self.data.index[-1]]])
+        if len(data) == len(self.data):
+            raise IndexError(f"The weather API did not return any data after {self.data.index[-1]}")
+        self.data = data[data.index >= current_time.floor("h") - pd.Timedelta(hours=1)]
@@ -0,0 +1,148 @@
+"""
+Local cache of the hourly series downloaded from PVGIS.
+
+Building a PVpanelFromPVGIS downloads a full hourly series from the PVGIS API, which is slow and repeated for every
+environment of a parameter sweep. The responses are therefore stored in a content-addressed cache: the key is a hash of
+the request parameters, and each series is stored column by column (timestamps as int64, values as float32) in a
+compressed .npz file. In offline mode, the network is never used and a missing entry raises an error.
+"""
+from typing import Dict
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+from energy_system_control.helpers import lazy_import
+
+requests = lazy_import("requests")
+
+PVGIS_URL = "https://re.jrc.ec.europa.eu/api/v5_3/seriescalc?"
+
+
+class PVGISCache:
+    """
+    Cache of the PVGIS hourly series, kept in memory and, optionally, in a folder on disk.
+
+    Parameters
+    ----------
+    cache_dir : str, optional
+        Folder where the series are stored. If None, the cache is only kept in memory
+    offline : bool
+        If True, the series are never downloaded: a series missing from the cache raises a LookupError
+    """
+    def __init__(self, cache_dir: str | None = None, offline: bool = False):
+        self.cache_dir = cache_dir
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self._series: Dict[str, pd.DataFrame] = {}
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(params: dict) -> str:
+        """
+        Returns the key of a request: a hash of its parameters, independent of their order and of the numeric type
+        of their values (e.g. 45 and 45.0 are the same latitude)
+        """
+        normalized = {key: float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else str(value)
+                      for key, value in params.items()}
+        return hashlib.sha1(json.dumps(normalized, sort_keys=True).encode()).hexdigest()
+
+    def get(self, params: dict) -> pd.DataFrame | None:
+        key = self.make_key(params)
+        if key in self._series:
+            self.hits += 1
+            return self._series[key].copy()
+        if self.cache_dir is not None and os.path.exists(self._path(key)):
+            with np.load(self._path(key)) as stored:
+                columns = json.loads(str(stored["columns"]))
+                df = pd.DataFrame({column: stored[f"column_{i}"] for i, column in enumerate(columns)},
+                                  index=pd.DatetimeIndex(stored["time"].astype("datetime64[s]"), name="time"))
+            self._series[key] = df
+            self.hits += 1
+            return df.copy()
+        self.misses += 1
+        return None
+
+    def put(self, params: dict, df: pd.DataFrame) -> pd.DataFrame:
+        """Stores a series, with float32 values both in memory and on disk, and returns a copy of the stored series"""
+        key = self.make_key(params)
+        df = self._series[key] = df.astype(np.float32)
+        if self.cache_dir is not None:
+            arrays = {f"column_{i}": df[column].to_numpy() for i, column in enumerate(df.columns)}
+            temp_path = self._path(key) + f".{os.getpid()}.tmp"
+            with open(temp_path, "wb") as f:
+                np.savez_compressed(f, time=df.index.to_numpy().astype("datetime64[s]").astype(np.int64),
+                                    columns=np.array(json.dumps(list(df.columns))), params=np.array(json.dumps(params, default=str)), **arrays)
+            os.replace(temp_path, self._path(key))
+        return df.copy()
+
+    def clear(self, disk: bool = False):
+        self._series.clear()
+        self.hits = 0
+        self.misses = 0
+        if disk and self.cache_dir is not None:
+            for filename in os.listdir(self.cache_dir):
+                if filename.endswith(".npz"):
+                    os.remove(os.path.join(self.cache_dir, filename))
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+
+_default_cache: PVGISCache | None = PVGISCache()
+
+
+def get_pvgis_cache() -> PVGISCache | None:
+    """Returns the cache used by default for the PVGIS downloads (None if caching is disabled)"""
+    return _default_cache
+
+
+def set_pvgis_cache(cache: PVGISCache | None):
+    """
+    Sets the cache used by default for the PVGIS downloads. Use None to disable caching, a PVGISCache with a
+    ``cache_dir`` to keep the series between sessions, and ``offline=True`` to never use the network.
+    """
+    global _default_cache
+    _default_cache = cache
+
+
+def download_pvgis_hourly(params: dict) -> pd.DataFrame:
+    """
+    Downloads the hourly series of PVGIS for the given request parameters (e.g. lat, lon, peakpower, loss, angle,
+    azimuth, startyear, endyear), returning all the output columns indexed by time.
+    """
+    query = "&".join([f'{key}={value}' for key, value in dict(params, pvcalculation=1, outputformat='json').items()])
+    response = requests.get(f'{PVGIS_URL}&{query}')
+    response.raise_for_status()
+    temp = pd.DataFrame(response.json()['outputs']['hourly'])
+    temp['time'] = pd.to_datetime(temp['time'], format="%Y%m%d:%H%M", utc=False)
+    return temp.set_index('time').astype(float)
+
+
+def cached_pvgis_hourly(params: dict, cache: PVGISCache | None = None) -> pd.DataFrame:
+    """
+    Same as ``download_pvgis_hourly``, but the series is looked up in a cache first.
+
+    Parameters
+    ----------
+    params : dict
+        The request parameters
+    cache : PVGISCache, optional
+        The cache to use. Defaults to the one returned by ``get_pvgis_cache``
+
+    Raises
+    ------
+    LookupError
+        If the cache is in offline mode and the series is not cached
+    """
+    cache = cache if cache is not None else _default_cache
+    if cache is None:
+        return download_pvgis_hourly(params)
+    df = cache.get(params)
+    if df is None:
+        if cache.offline:
+            raise LookupError(f"The PVGIS series for {params} is not cached, and the cache is in offline mode")
+        df = cache.put(params, download_pvgis_hourly(params))
+    return df
@@ -0,0 +1,201 @@
+"""
+Cache for the resampled time series used by the simulation.
+
+Resampling the raw data of demands, PV panels and environmental providers is repeated at the beginning of every run,
+even when the raw data and the simulation settings did not change (e.g. in a parameter sweep). The results are
+therefore cached using a key built from the hash of the raw data and from the resampling parameters. The cache is kept
+in memory (with a least-recently-used eviction policy) and, optionally, in a folder on disk, where the arrays are
+stored as .npy files and memory-mapped when loaded. For periodic arrays, only one period is stored.
+"""
+from collections import OrderedDict
+from typing import Any, Callable, Dict
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+from energy_system_control.helpers import resample_with_interpolation, resample_periodic, resample_columns, PeriodicArray
+
+# Version of the resampling algorithms and of the stored format, part of every key: increase it when either changes, so
+# that the arrays cached on disk by previous versions are not used
+CACHE_VERSION = 1
+
+
+class ResampleCache:
+    """
+    In-memory LRU cache of resampled time series, with an optional on-disk store.
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of arrays kept in memory. The least recently used one is discarded when the limit is exceeded
+    cache_dir : str, optional
+        Folder where the arrays are stored on disk. If None, the cache is only kept in memory
+    """
+    def __init__(self, maxsize: int = 64, cache_dir: str | None = None):
+        self.maxsize = maxsize
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._arrays: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(data: pd.Series | pd.DataFrame, **params) -> str:
+        """
+        Returns the key of a resampled array: a hash of the content of the raw data (index, columns and values), of
+        the resampling parameters and of CACHE_VERSION
+
+        Parameters
+        ----------
+        data : pd.Series | pd.DataFrame
+            The raw data
+        **params
+            The parameters used for the resampling
+        """
+        h = hashlib.sha1(f"v{CACHE_VERSION}".encode())
+        h.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+        names = list(data.columns) if isinstance(data, pd.DataFrame) else [data.name]
+        h.update(repr(names).encode())
+        h.update(repr(sorted((key, str(value)) for key, value in params.items())).encode())
+        return h.hexdigest()
+
+    def get(self, key: str) -> np.ndarray | PeriodicArray | None:
+        if key in self._arrays:
+            self._arrays.move_to_end(key)
+            self.hits += 1
+            return self._arrays[key]
+        if self.cache_dir is not None and os.path.exists(self._path(key)):
+            array = np.load(self._path(key), mmap_mode="r")
+            if os.path.exists(self._path(key, ".json")):
+                with open(self._path(key, ".json")) as f:
+                    array = PeriodicArray(array, json.load(f)["length"])
+            self._store_in_memory(key, array)
+            self.hits += 1
+            return array
+        self.misses += 1
+        return None
+
+    def put(self, key: str, array: np.ndarray | PeriodicArray) -> np.ndarray | PeriodicArray:
+        stored = array.period if isinstance(array, PeriodicArray) else np.asarray(array)
+        if self.cache_dir is not None:
+            # Write to a temporary file first, so that a concurrent reader never sees a partially written array.
+            # The length of periodic arrays is written first, since the .npy file signals that the entry exists
+            if isinstance(array, PeriodicArray):
+                with open(self._path(key, ".json"), "w") as f:
+                    json.dump({"length": array.length}, f)
+            temp_path = self._path(key) + f".{os.getpid()}.tmp"
+            with open(temp_path, "wb") as f:
+                np.save(f, stored)
+            os.replace(temp_path, self._path(key))
+        stored = stored.view()
+        stored.flags.writeable = False  # The same array is shared by all the users of the cache
+        array = PeriodicArray(stored, array.length) if isinstance(array, PeriodicArray) else stored
+        self._store_in_memory(key, array)
+        return array
+
+    def get_or_compute(self, data: pd.Series | pd.DataFrame, compute: Callable[[], np.ndarray | PeriodicArray], **params) -> np.ndarray | PeriodicArray:
+        """
+        Returns the cached array related to the raw data and the parameters, computing and storing it if necessary
+
+        Parameters
+        ----------
+        data : pd.Series | pd.DataFrame
+            The raw data
+        compute : Callable[[], np.ndarray | PeriodicArray]
+            The function computing the resampled array
+        **params
+            The parameters used for the resampling
+        """
+        key = self.make_key(data, **params)
+        array = self.get(key)
+        if array is None:
+            array = self.put(key, compute())
+        return array
+
+    def clear(self, disk: bool = False):
+        self._arrays.clear()
+        self.hits = 0
+        self.misses = 0
+        if disk and self.cache_dir is not None:
+            for filename in os.listdir(self.cache_dir):
+                if filename.endswith(".npy") or filename.endswith(".json"):
+                    os.remove(os.path.join(self.cache_dir, filename))
+
+    def __len__(self) -> int:
+        return len(self._arrays)
+
+    def _store_in_memory(self, key: str, array: np.ndarray):
+        self._arrays[key] = array
+        self._arrays.move_to_end(key)
+        while len(self._arrays) > self.maxsize:
+            self._arrays.popitem(last=False)
+
+    def _path(self, key: str, extension: str = ".npy") -> str:
+        return os.path.join(self.cache_dir, f"{key}{extension}")
+
+
+_default_cache: ResampleCache | None = ResampleCache()
+
+
+def get_resample_cache() -> ResampleCache | None:
+    """Returns the cache used by default when preparing the time series (None if caching is disabled)"""
+    return _default_cache
+
+
+def set_resample_cache(cache: ResampleCache | None):
+    """
+    Sets the cache used by default when preparing the time series. Use None to disable caching, or a ResampleCache
+    with a ``cache_dir`` to share the resampled data between different processes.
+    """
+    global _default_cache
+    _default_cache = cache
+
+
+def cached_resample_with_interpolation(df: pd.Series | pd.DataFrame, cache: ResampleCache | None = None, periodic: bool = False, **kwargs: Any) -> np.ndarray | PeriodicArray:
+    """
+    Same as ``resample_with_interpolation``, but the result is looked up in a cache first. The returned array is
+    read-only, since it may be shared between several objects and runs.
+
+    Parameters
+    ----------
+    df : pd.Series | pd.DataFrame
+        Input data with a DatetimeIndex
+    cache : ResampleCache, optional
+        The cache to use. Defaults to the one returned by ``get_resample_cache``
+    periodic : bool
+        If True, uses ``resample_periodic``, which may return a PeriodicArray instead of a dense array
+    **kwargs
+        Arguments passed to ``resample_with_interpolation``
+    """
+    function = resample_periodic if periodic else resample_with_interpolation
+    cache = cache if cache is not None else _default_cache
+    if cache is None:
+        return function(df, **kwargs)
+    return cache.get_or_compute(df, lambda: function(df, **kwargs), periodic=periodic, **kwargs)
+
+
+def cached_resample_columns(df: pd.DataFrame, cache: ResampleCache | None = None, **kwargs: Any) -> Dict[str, np.ndarray | PeriodicArray]:
+    """
+    Same as ``resample_columns``, but each resampled column is looked up in a cache first. The frame is only resampled
+    (in one pass) if at least one of its columns is missing from the cache.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Input data with a DatetimeIndex
+    cache : ResampleCache, optional
+        The cache to use. Defaults to the one returned by ``get_resample_cache``
+    **kwargs
+        Arguments passed to ``resample_columns``
+    """
+    cache = cache if cache is not None else _default_cache
+    if cache is None:
+        return resample_columns(df, **kwargs)
+    frame_key = cache.make_key(df, **kwargs)
+    keys = {column: hashlib.sha1(f"{frame_key}:{column!r}".encode()).hexdigest() for column in df.columns}
+    output = {column: cache.get(key) for column, key in keys.items()}
+    if any(array is None for array in output.values()):
+        output = {column: cache.put(keys[column], array) for column, array in resample_columns(df, **kwargs).items()}
+    return output
@@ -1,7 +1,82 @@
+from __future__ import annotations
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from energy_system_control.helpers import C2K
-import requests
+from dataclasses import dataclass, field
+from energy_system_control.helpers import C2K, lazy_import
+import hashlib
+import json
+import os
+import threading
+import time
+import pandas as pd
+requests = lazy_import("requests")
+
+
+def make_session(pool_size: int = 4, max_retries: int = 2) -> requests.Session:
+    """
+    Create a requests.Session reusing its connections (keep-alive) across requests, with a pool of ``pool_size``
+    connections per host and ``max_retries`` retries on connection errors.
+    """
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=max_retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class ResponseCache:
+    """
+    Thread-safe cache of JSON responses keyed by URL, whose entries expire after ``ttl_s`` seconds.
+
+    Parameters
+    ----------
+    ttl_s : float
+        Time to live of the entries [s]
+    cache_dir : str, optional
+        Folder where the responses are also stored as JSON files, so that they are shared between runs
+    """
+    def __init__(self, ttl_s: float = 3600.0, cache_dir: str | None = None):
+        self.ttl_s = ttl_s
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._responses: dict[str, tuple[float, dict]] = {}
+        self._lock = threading.Lock()
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def get(self, url: str) -> dict | None:
+        with self._lock:
+            entry = self._responses.get(url)
+            if entry is None and self.cache_dir is not None and os.path.exists(self._path(url)):
+                with open(self._path(url)) as f:
+                    stored = json.load(f)
+                entry = (stored["timestamp"], stored["data"])
+            if entry is not None and time.time() - entry[0] < self.ttl_s:
+                self._responses[url] = entry
+                self.hits += 1
+                return entry[1]
+            self._responses.pop(url, None)
+            self.misses += 1
+            return None
+
+    def put(self, url: str, data: dict):
+        timestamp = time.time()
+        with self._lock:
+            self._responses[url] = (timestamp, data)
+            if self.cache_dir is not None:
+                temp_path = self._path(url) + f".{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(temp_path, "w") as f:
+                    json.dump({"url": url, "timestamp": timestamp, "data": data}, f)
+                os.replace(temp_path, self._path(url))
+
+    def clear(self):
+        with self._lock:
+            self._responses.clear()
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode()).hexdigest() + ".json")
+
 
 @dataclass
 class WeatherAPI(ABC):
@@ -19,7 +94,27 @@ class WeatherAPI(ABC):
         pass    
 
 
+@dataclass
 class OpenMeteoAPI(WeatherAPI):
+    """
+    Client of the Open-Meteo forecast API.
+
+    Parameters
+    ----------
+    latitude, longitude : float
+        Coordinates of the location [degrees]
+    session : requests.Session, optional
+        Session used for the requests, e.g. as returned by ``make_session``. If None, each request opens a new
+        connection with ``requests.get``
+    cache : ResponseCache, optional
+        Cache of the responses. If None, every call sends a request
+    timeout : float, optional
+        Timeout of the requests [s]
+    """
+    session: requests.Session | None = field(default=None, repr=False, compare=False)
+    cache: ResponseCache | None = field(default=None, repr=False, compare=False)
+    timeout: float | None = None
+
     base_url = "https://api.open-meteo.com/v1/"
     def get_current_weather(self) -> dict:
         url = f'{self.base_url}forecast?latitude={self.latitude}&longitude={self.longitude}&current=temperature_2m,direct_radiation,diffuse_radiation,global_tilted_irradiance&timezone=GMT'
@@ -42,7 +137,36 @@ class OpenMeteoAPI(WeatherAPI):
             "ghi": data['hourly']['global_tilted_irradiance']
         }
 
+    def get_weather_window(self, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        """
+        Fetch the hourly weather between two times (GMT) with a single request.
+
+        Returns
+        -------
+        pd.DataFrame
+            The hourly "temperature" [K], "dni", "dhi" and "ghi" [W/m²], indexed by time
+        """
+        url = (f'{self.base_url}forecast?latitude={self.latitude}&longitude={self.longitude}&hourly=temperature_2m,direct_radiation,diffuse_radiation,global_tilted_irradiance&timezone=GMT'
+               f'&start_hour={pd.Timestamp(start).floor("h"):%Y-%m-%dT%H:%M}&end_hour={pd.Timestamp(end).ceil("h"):%Y-%m-%dT%H:%M}')
+        hourly = self._send_request(url)['hourly']
+        return pd.DataFrame({
+            "temperature": C2K(pd.Series(hourly['temperature_2m'], dtype=float)).to_numpy(),
+            "dni": hourly['direct_radiation'],
+            "dhi": hourly['diffuse_radiation'],
+            "ghi": hourly['global_tilted_irradiance'],
+        }, index=pd.DatetimeIndex(pd.to_datetime(hourly['time']), name="time"), dtype=float)
+
     def _send_request(self, url) -> dict:
-        response = requests.get(url)
+        if self.cache is not None:
+            data = self.cache.get(url)
+            if data is not None:
+                return data
+        if self.session is not None:
+            response = self.session.get(url, timeout=self.timeout)
+        else:
+            response = requests.get(url, timeout=self.timeout)
         response.raise_for_status()  # Raise an error for bad status codes
-        return response.json()
\ No newline at end of file
+        data = response.json()
+        if self.cache is not None:
+            self.cache.put(url, data)
+        return data
@@ -5,10 +5,22 @@ from collections import deque
 import numpy as np
 
 class Sensor(ABC):
+    # Slotted like the ports (see energy_system_control.core.port)
+    __slots__ = ('name', 'current_measurement', 'signal_handle', 'execution_interval_h', 'execution_steps')
     name: str
     current_measurement: float
-    def __init__(self, name):
+    storage: str = "float32"  # Storage policy of the recorded measurements (see energy_system_control.sim.simulation_data)
+    signal_handle: int  # Column of the sensor in the sensors registry, assigned by the environment
+    supports_fast_forward: bool = True  # False for sensors keeping a history of the measurements (see Simulator._fast_forward)
+    # Time [h] between two measurements (a multiple of the time step), passed to the constructor. Between measurements, the
+    # last one is held. None: the sensor measures at every time step
+    execution_interval_h: float | None
+    execution_steps: int  # Number of time steps between two measurements, set by the simulator from execution_interval_h
+    def __init__(self, name, execution_interval_h: float | None = None):
         self.name = name
+        self.current_measurement = None
+        self.execution_interval_h = execution_interval_h
+        self.execution_steps = 1
 
     def get_measurement(self):
         return self.current_measurement
@@ -25,9 +37,10 @@ class Sensor(ABC):
 
 
 class FlowTemperatureSensor(Sensor):
+    __slots__ = ('port_name',)
     port_name: str
-    def __init__(self, name: str, port_name: str):
-        super().__init__(name)
+    def __init__(self, name: str, port_name: str, execution_interval_h: float | None = None):
+        super().__init__(name, execution_interval_h)
         self.port_name = port_name
 
     def measure(self, environment, state):
@@ -36,9 +49,10 @@ class FlowTemperatureSensor(Sensor):
 
 
 class PowerSensor(Sensor):
+    __slots__ = ('port_name', 'flow_type')
     port_name: str
     flow_type: str
-    def __init__(self, name, port_name, flow_type):
+    def __init__(self, name, port_name, flow_type, execution_interval_h: float | None = None):
         """
         Model of sensor that measures the power flow at a specific port
 
@@ -49,7 +63,7 @@ class PowerSensor(Sensor):
         port_name : str
             Name of the port it measures power from
     """
-        super().__init__(name)
+        super().__init__(name, execution_interval_h)
         self.port_name = port_name
         self.flow_type = flow_type
 
@@ -62,15 +76,18 @@ class PowerSensor(Sensor):
 
 
 class ElectricPowerSensor(PowerSensor):
-    def __init__(self, name: str, port_name: str):
-        super().__init__(name, port_name, 'electricity')
+    __slots__ = ()
+    def __init__(self, name: str, port_name: str, execution_interval_h: float | None = None):
+        super().__init__(name, port_name, 'electricity', execution_interval_h)
 
 
     
 class SOCSensor(Sensor):
+    __slots__ = ('component_name',)
+    storage = "float64"  # Small SOC changes are lost in float32 over long simulations
     component_name: str
-    def __init__(self, name, component_name):
-        super().__init__(name)
+    def __init__(self, name, component_name, execution_interval_h: float | None = None):
+        super().__init__(name, execution_interval_h)
         self.component_name = component_name
 
     def measure(self, environment, state):
@@ -79,11 +96,12 @@ class SOCSensor(Sensor):
 
 
 class TankTemperatureSensor(Sensor):
+    __slots__ = ('component_name', 'sensor_height', 'sensor_height_id')
     component_name: str
     sensor_height: float
     sensor_height_id: int
-    def __init__(self, name: str, component_name: str, sensor_height: float | None = None):
-        super().__init__(name)
+    def __init__(self, name: str, component_name: str, sensor_height: float | None = None, execution_interval_h: float | None = None):
+        super().__init__(name, execution_interval_h)
         self.component_name = component_name
         self.sensor_height = sensor_height
         self.sensor_height_id = None
@@ -116,18 +134,17 @@ class HotWaterDemandSensor(Sensor):
     component_name : str
         Name of the hot water demand component to measure
     """
+    __slots__ = ('component_name', 'port_name')
     component_name: str
     port_name: str
     
-    def __init__(self, name: str, component_name: str):
-        super().__init__(name)
+    def __init__(self, name: str, component_name: str, execution_interval_h: float | None = None):
+        super().__init__(name, execution_interval_h)
         self.component_name = component_name
         # The port name follows the pattern: {component_name}_fluid_port
         self.port_name = f'{component_name}_fluid_port'
 
     def measure(self, environment, state):
-        from energy_system_control.constants import WATER
-        
         # Get the mass flow and heat flow from the port
         mass_flow_kg = environment.ports[self.port_name].flows['mass']  # in kg
         # heat_flow_kJ = environment.ports[self.port_name].flows['heat']  # in kJ
@@ -143,7 +160,7 @@ class HotWaterDemandSensor(Sensor):
             # Calculate net heat flow: Q_net = mass_flow * cp * (T_hot - T_cold)
             # Q_net_kJ = mass_flow_kg * WATER.cp * (T_hot_water - T_cold_water)
             # Convert to power in kW
-            Q_net_kW = mass_flow_kg * WATER.cp * (T_hot_water - T_cold_water)
+            Q_net_kW = mass_flow_kg * environment.ports[self.port_name].specific_heat() * (T_hot_water - T_cold_water)
             self.current_measurement = Q_net_kW
         
         return self.current_measurement
@@ -176,12 +193,14 @@ class SensorWithMemory(Sensor):
         in the lookback window, ordered chronologically.
     """
     
+    __slots__ = ('source_sensor_name', 'lookback_time', 'n_samples', 'memory')
     source_sensor_name: str
     lookback_time: float
     n_samples: int
+    supports_fast_forward = False
     
-    def __init__(self, name: str, source_sensor_name: str, lookback_time: float, n_samples: int):
-        super().__init__(name)
+    def __init__(self, name: str, source_sensor_name: str, lookback_time: float, n_samples: int, execution_interval_h: float | None = None):
+        super().__init__(name, execution_interval_h)
         self.source_sensor_name = source_sensor_name
         self.lookback_time = lookback_time  # in hours
         self.n_samples = n_samples
@@ -24,6 +24,9 @@ class SimulationConfig:
     time_start_h: float | None = 0.0    # hours
     environmental_defaults: EnvironmentalData = field(default_factory=_default_environmental_data)
     prediction_horizon_margin_h: float = 25  # Represents how much more data we load to leave space for prediction
+    seed: int | None = None  # Seed of the random numbers of the run (e.g. the uncertainty of the demands), shared through InitContext
+    fast_forward_steps: int = 0  # Maximum number of quiescent steps skipped at once (see Simulator._fast_forward). 0 disables the fast-forward
+    fast_forward_tolerance: float = 1e-6  # Tolerance on the port flows and on the fitted records used to verify the skipped steps
 
     @property
     def time_step_s(self) -> float:
@@ -0,0 +1,258 @@
+"""
+Monte Carlo ensembles of simulation runs
+
+This module runs the same system many times under different realizations of
+its uncertainty (e.g. the uncertainty models of the demands), and summarizes
+the outcome as distributions of KPIs and percentile bands of signals.
+
+Each member of the ensemble is a run with its own ``SimulationConfig.seed``.
+The seeds only depend on the seed of the ensemble, so that different variants
+of a system (e.g. different controllers) are compared on the same noise
+realizations (common random numbers). Runs can be distributed over several
+processes, and the signals are aggregated as soon as each run is completed:
+the memory used does not grow with the number of runs.
+
+Classes
+-------
+StreamingPercentiles
+    Percentiles of a signal across runs, updated one run at a time.
+EnsembleResults
+    KPIs and signal percentile bands of an ensemble.
+EnsembleRunner
+    Runs ensembles of a system, or of several variants of it.
+"""
+
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from collections import deque
+from typing import Callable, Dict, List, Sequence
+import numpy as np
+import pandas as pd
+from energy_system_control.core.base_environment import Environment
+from energy_system_control.sim.config import SimulationConfig
+from energy_system_control.sim.results import SimulationResults
+from energy_system_control.sim.result_store import ResultStore
+from energy_system_control.sim.simulator import Simulator
+
+
+class StreamingPercentiles:
+    """
+    Percentiles across runs of a signal, computed for each time step and updated one run at a time.
+
+    The first ``exact_runs`` runs are kept in memory and the percentiles are exact. Beyond that, each percentile is
+    tracked with the P² algorithm (Jain and Chlamtac, 1985), which keeps five markers per time step, so that the
+    memory does not depend on the number of runs. The markers are initialized from the runs kept in memory.
+
+    Parameters
+    ----------
+    percentiles : sequence of float
+        The percentiles to compute, between 0 and 100.
+    exact_runs : int, optional
+        Number of runs kept in memory. Defaults to 32, and must be at least 5.
+    """
+
+    def __init__(self, percentiles: Sequence[float] = (5, 50, 95), exact_runs: int = 32):
+        if exact_runs < 5:
+            raise ValueError("At least 5 runs must be kept in memory to initialize the P² markers")
+        self.percentiles = list(percentiles)
+        self.exact_runs = exact_runs
+        self.count = 0
+        self._sum = None
+        self._buffer: List[np.ndarray] | None = []
+        self._heights = self._positions = self._desired = self._increments = None
+
+    def update(self, values: np.ndarray):
+        values = np.asarray(values, dtype=float)
+        self.count += 1
+        self._sum = values.copy() if self._sum is None else self._sum + values
+        if self._buffer is not None:
+            self._buffer.append(values)
+            if len(self._buffer) > self.exact_runs:
+                self._initialize_markers()
+        else:
+            self._update_markers(values)
+
+    @property
+    def mean(self) -> np.ndarray:
+        return self._sum / self.count
+
+    def result(self) -> np.ndarray:
+        """Returns the percentiles, with shape (number of percentiles, number of time steps)"""
+        if self.count == 0:
+            raise ValueError("No run was added")
+        if self._buffer is not None:
+            return np.percentile(np.stack(self._buffer), self.percentiles, axis=0)
+        return self._heights[:, 2, :].copy()
+
+    def _initialize_markers(self):
+        buffer, self._buffer = self._buffer, None
+        p = np.array(self.percentiles)[:, None] / 100
+        n_steps = len(buffer[0])
+        self._heights = np.repeat(np.sort(np.stack(buffer[:5]), axis=0)[None], len(p), axis=0)
+        self._positions = np.broadcast_to(np.arange(1.0, 6.0)[None, :, None], self._heights.shape).copy()
+        self._desired = np.repeat((1 + np.hstack([0 * p, 2 * p, 4 * p, 2 + 2 * p, 4 + 0 * p]))[:, :, None], n_steps, axis=2)
+        self._increments = np.hstack([0 * p, p / 2, p, (1 + p) / 2, 1 + 0 * p])[:, :, None]
+        for values in buffer[5:]:
+            self._update_markers(values)
+
+    def _update_markers(self, x: np.ndarray):
+        q, n = self._heights, self._positions
+        # Cell of each observation, and update of the extreme markers
+        k = (q[:, 1:4, :] <= x).sum(axis=1)
+        q[:, 0, :] = np.minimum(q[:, 0, :], x)
+        q[:, 4, :] = np.maximum(q[:, 4, :], x)
+        n += np.arange(5)[None, :, None] > k[:, None, :]
+        self._desired += self._increments
+        # Adjustment of the three central markers
+        for i in (1, 2, 3):
+            d = self._desired[:, i, :] - n[:, i, :]
+            move = ((d >= 1) & (n[:, i + 1, :] - n[:, i, :] > 1)) | ((d <= -1) & (n[:, i - 1, :] - n[:, i, :] < -1))
+            if not move.any():
+                continue
+            d = np.sign(d) * move
+            q_prev, q_i, q_next = q[:, i - 1, :], q[:, i, :], q[:, i + 1, :]
+            n_prev, n_i, n_next = n[:, i - 1, :], n[:, i, :], n[:, i + 1, :]
+            parabolic = q_i + d / (n_next - n_prev) * ((n_i - n_prev + d) * (q_next - q_i) / (n_next - n_i)
+                                                       + (n_next - n_i - d) * (q_i - q_prev) / (n_i - n_prev))
+            linear = q_i + d * np.where(d > 0, (q_next - q_i) / (n_next - n_i), (q_prev - q_i) / (n_prev - n_i))
+            new = np.where((q_prev < parabolic) & (parabolic < q_next), parabolic, linear)
+            q[:, i, :] = np.where(move, new, q_i)
+            n[:, i, :] += d
+
+
+@dataclass
+class EnsembleResults:
+    """
+    Outcome of an ensemble of runs.
+
+    Attributes
+    ----------
+    seeds : list of int
+        Seed of each run.
+    kpis : pd.DataFrame
+        One row per run (indexed by run id) and one column per KPI.
+    signal_percentiles : dict
+        For each signal, a DataFrame indexed by time, with one column per percentile (e.g. "p5", "p50", "p95").
+    signal_means : dict
+        For each signal, the mean across runs, as a Series indexed by time.
+    """
+    seeds: List[int]
+    kpis: pd.DataFrame
+    signal_percentiles: Dict[str, pd.DataFrame]
+    signal_means: Dict[str, pd.Series]
+
+    def kpi_percentiles(self, percentiles: Sequence[float] = (5, 50, 95)) -> pd.DataFrame:
+        """Returns the percentiles of the KPIs across runs, with one row per percentile"""
+        return self.kpis.quantile(np.array(percentiles) / 100).set_axis([f"p{p:g}" for p in percentiles])
+
+
+def _simulate_member(build_environment: Callable[[], Environment], cfg: SimulationConfig) -> SimulationResults:
+    return Simulator(build_environment(), cfg).run()
+
+
+class EnsembleRunner:
+    """
+    Runs Monte Carlo ensembles of a system.
+
+    Parameters
+    ----------
+    cfg : SimulationConfig
+        Configuration of the runs. The seed of each run replaces ``cfg.seed``.
+    n_runs : int
+        Number of runs of the ensemble.
+    seed : int, optional
+        Seed of the ensemble, from which the seeds of the runs are derived. Defaults to 0.
+    kpis : dict, optional
+        KPIs computed for each run: callables that take the ``SimulationResults`` of the run and return a scalar.
+    signals : list of str, optional
+        Names of the signals for which percentile bands are computed, with the naming of ``ResultStore``
+        (``"<port>:<layer>"``, ``"<controller>:<component>"`` or ``"<sensor>"``).
+    percentiles : sequence of float, optional
+        Percentiles of the signal bands. Defaults to (5, 50, 95).
+    n_workers : int, optional
+        Number of processes used to run the ensemble. With more than one worker, the function building the
+        environment must be picklable (e.g. defined at module level). Defaults to 1 (runs in the current process).
+    exact_runs : int, optional
+        Number of runs for which the signal percentiles are exact (see ``StreamingPercentiles``). Defaults to 32.
+
+    Examples
+    --------
+    >>> runner = EnsembleRunner(cfg, n_runs=200, kpis={"E_hp": lambda r: r.get_cumulated_electricity("hp_electricity_input_port")},
+    ...                         signals=["tank_temperature_sensor"], n_workers=4)
+    >>> outcome = runner.compare({"bandwidth": build_bandwidth_system, "rule_based": build_rule_based_system})
+    >>> outcome["rule_based"].kpi_percentiles()
+    """
+
+    def __init__(self,
+                 cfg: SimulationConfig,
+                 n_runs: int,
+                 seed: int = 0,
+                 kpis: Dict[str, Callable[[SimulationResults], float]] | None = None,
+                 signals: Sequence[str] | None = None,
+                 percentiles: Sequence[float] = (5, 50, 95),
+                 n_workers: int = 1,
+                 exact_runs: int = 32):
+        self.cfg = cfg
+        self.n_runs = n_runs
+        self.seed = seed
+        self.kpis = kpis or {}
+        self.signals = list(signals) if signals else []
+        self.percentiles = list(percentiles)
+        self.n_workers = n_workers
+        self.exact_runs = exact_runs
+
+    @property
+    def seeds(self) -> List[int]:
+        """Seeds of the runs, the same for every system run with this runner (common random numbers)"""
+        return [int(child.generate_state(1)[0]) for child in np.random.SeedSequence(self.seed).spawn(self.n_runs)]
+
+    def run(self, build_environment: Callable[[], Environment]) -> EnsembleResults:
+        """
+        Runs the ensemble of a system.
+
+        Parameters
+        ----------
+        build_environment : callable
+            Function returning a new ``Environment`` of the system, called once per run.
+
+        Returns
+        -------
+        EnsembleResults
+        """
+        seeds = self.seeds
+        bands = {name: StreamingPercentiles(self.percentiles, self.exact_runs) for name in self.signals}
+        rows = []
+        time_vector = None
+        for results in self._iterate_runs(build_environment, seeds):
+            rows.append({name: kpi(results) for name, kpi in self.kpis.items()})
+            for name, band in bands.items():
+                band.update(ResultStore._extract_signal(results, name))
+            time_vector = results.time_vector
+        columns = [f"p{p:g}" for p in self.percentiles]
+        return EnsembleResults(
+            seeds=seeds,
+            kpis=pd.DataFrame(rows, index=pd.RangeIndex(len(rows), name="run_id")),
+            signal_percentiles={name: pd.DataFrame(band.result().T, index=time_vector, columns=columns) for name, band in bands.items()},
+            signal_means={name: pd.Series(band.mean, index=time_vector, name=name) for name, band in bands.items()})
+
+    def compare(self, variants: Dict[str, Callable[[], Environment]]) -> Dict[str, EnsembleResults]:
+        """Runs the ensemble of several variants of a system on the same noise realizations"""
+        return {name: self.run(build_environment) for name, build_environment in variants.items()}
+
+    def _iterate_runs(self, build_environment: Callable[[], Environment], seeds: List[int]):
+        # Yields the results of the runs in order. With several workers, only a few runs are in flight at a time, so
+        # that completed results do not pile up in memory
+        configs = [replace(self.cfg, seed=seed) for seed in seeds]
+        if self.n_workers <= 1:
+            for cfg in configs:
+                yield _simulate_member(build_environment, cfg)
+            return
+        with ProcessPoolExecutor(max_workers=self.n_workers) as executor:
+            pending = deque()
+            for cfg in configs:
+                pending.append(executor.submit(_simulate_member, build_environment, cfg))
+                if len(pending) >= 2 * self.n_workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
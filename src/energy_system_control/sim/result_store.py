@@ -0,0 +1,380 @@
+"""
+Cross-run result store
+
+This module provides a store that collects the outcome of many simulation runs
+(e.g. the runs of a parameter sweep) into a single columnar dataset with a run
+dimension. Each run contributes its parameters, a set of scalar KPIs and a
+selection of recorded signals.
+
+Signals are written to one append-only binary file per signal, with shape
+(number of runs, number of time steps). They are read back through memory maps,
+so that individual signals (or individual runs of a signal) can be loaded lazily
+and aggregated across runs without loading the whole sweep in memory.
+
+Classes
+-------
+ResultStore
+    Append-only store of simulation runs, backed by a folder on disk.
+"""
+
+from __future__ import annotations
+import json
+import os
+from typing import Any, Callable, Dict, List, Sequence
+import numpy as np
+import pandas as pd
+from energy_system_control.sim.results import SimulationResults
+
+Aggregation = str | Callable[[np.ndarray], np.ndarray]
+
+_AGGREGATIONS = {
+    "mean": lambda arr: arr.mean(axis=1),
+    "sum": lambda arr: arr.sum(axis=1),
+    "min": lambda arr: arr.min(axis=1),
+    "max": lambda arr: arr.max(axis=1),
+    "std": lambda arr: arr.std(axis=1),
+}
+
+
+class ResultStore:
+    """
+    Append-only store of simulation runs with a run-id dimension.
+
+    The store is a folder containing:
+        - ``store.json``: metadata (signals, number of time steps, time step)
+        - ``runs.csv``: one row per run with its parameters and KPIs
+        - ``signals/signal_<k>.bin``: one raw binary file per signal, holding
+          the recorded values of all runs one after the other
+
+    Signal names follow the column naming of ``SimulationResults.to_dataframe``:
+    ``"<port>:<layer>"`` for ports, ``"<controller>:<component>"`` for
+    controllers and ``"<sensor>"`` for sensors.
+
+    Parameters
+    ----------
+    path : str
+        Folder where the store is located. It is created if it does not exist,
+        and an existing store found at the same location is re-opened.
+    dtype : str, optional
+        Data type used to store signals on disk. Defaults to "float32", the same
+        used by ``SimulationData``.
+
+    Examples
+    --------
+    >>> store = ResultStore("sweep_results")
+    >>> for volume in [150, 200, 300]:
+    ...     results = Simulator(build_env(volume), cfg).run()
+    ...     store.append(results, parameters={"volume": volume},
+    ...                  kpis={"E_hp": lambda r: r.get_cumulated_electricity("hp_electricity_input_port")},
+    ...                  signals=["tank_temperature_sensor"])
+    >>> store.kpi_table(index="volume", values="E_hp")
+    """
+
+    metadata_filename = "store.json"
+    runs_filename = "runs.csv"
+    signals_folder = "signals"
+
+    def __init__(self, path: str, dtype: str = "float32"):
+        self.path = path
+        os.makedirs(os.path.join(self.path, self.signals_folder), exist_ok=True)
+        if os.path.exists(os.path.join(self.path, self.metadata_filename)):
+            self._load_metadata()
+        else:
+            self.metadata = {
+                "dtype": np.dtype(dtype).name,
+                "n_steps": None,
+                "time_step": None,
+                "signals": {},
+                "parameter_names": [],
+                "kpi_names": [],
+            }
+            self._rows = []
+            self._runs = None
+            self._csv_columns = None
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def append(self,
+               results: SimulationResults,
+               parameters: Dict[str, Any] | None = None,
+               kpis: Dict[str, float | Callable[[SimulationResults], float]] | None = None,
+               signals: Sequence[str] | None = None) -> int:
+        """
+        Add a simulation run to the store.
+
+        Parameters
+        ----------
+        results : SimulationResults
+            Results of the simulation run.
+        parameters : dict, optional
+            Parameters that identify the run (e.g. the design variables of a sweep).
+        kpis : dict, optional
+            KPIs of the run. Values can either be scalars or callables that take the
+            ``SimulationResults`` object and return a scalar.
+        signals : list of str, optional
+            Names of the signals to store. Defaults to all sensors signals. Once the first
+            run is stored, the list of signals of the store is fixed.
+
+        Returns
+        -------
+        int
+            The run id assigned to the run.
+        """
+        parameters = parameters or {}
+        kpis = kpis or {}
+        if signals is None:
+            signals = self.signal_names if self.signal_names else [key.main_key for key in results.signal_registry_sensors._col_to_key]
+        self._check_signals(signals)
+        run_id = self.n_runs
+        # Extracting the signals first, so that a missing signal does not leave the store in an inconsistent state
+        arrays = {name: self._extract_signal(results, name) for name in signals}
+        row = dict(parameters)
+        for kpi_name, kpi in kpis.items():
+            row[kpi_name] = kpi(results) if callable(kpi) else kpi
+        n_steps = len(results.time_vector)
+        if self.metadata["n_steps"] is None:
+            self.metadata["n_steps"] = int(n_steps)
+            self.metadata["time_step"] = float(results.time_step)
+            for id, name in enumerate(signals):
+                self.metadata["signals"][name] = f"signal_{id}.bin"
+        elif n_steps != self.metadata["n_steps"]:
+            raise ValueError(f'All runs in the store must have the same number of time steps. The store has {self.metadata["n_steps"]} time steps, while the run provided has {n_steps}')
+        for name, values in arrays.items():
+            with open(self._signal_path(name), "ab") as f:
+                np.ascontiguousarray(values, dtype=self.dtype).tofile(f)
+        # Updating the runs table
+        for name in parameters:
+            if name not in self.metadata["parameter_names"]:
+                self.metadata["parameter_names"].append(name)
+        for name in kpis:
+            if name not in self.metadata["kpi_names"]:
+                self.metadata["kpi_names"].append(name)
+        self._rows.append(row)
+        self._runs = None
+        self._save()
+        return run_id
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    @property
+    def dtype(self) -> np.dtype:
+        return np.dtype(self.metadata["dtype"])
+
+    @property
+    def n_runs(self) -> int:
+        return len(self._rows)
+
+    @property
+    def runs(self) -> pd.DataFrame:
+        """Parameters and KPIs of all runs, indexed by run id."""
+        if self._runs is None:
+            self._runs = pd.DataFrame(self._rows, columns=self._run_columns(), index=pd.Index(range(len(self._rows)), name="run_id"))
+        return self._runs
+
+    @property
+    def signal_names(self) -> List[str]:
+        return list(self.metadata["signals"].keys())
+
+    @property
+    def time_vector(self) -> np.ndarray:
+        """Time vector [s] shared by all runs in the store."""
+        if self.metadata["n_steps"] is None:
+            return np.array([])
+        return np.arange(self.metadata["n_steps"]) * self.metadata["time_step"]
+
+    @property
+    def parameters(self) -> pd.DataFrame:
+        """Parameters of all runs, indexed by run id."""
+        return self.runs[self.metadata["parameter_names"]]
+
+    @property
+    def kpis(self) -> pd.DataFrame:
+        """KPIs of all runs, indexed by run id."""
+        return self.runs[self.metadata["kpi_names"]]
+
+    def get_signal(self, name: str, run_ids: int | Sequence[int] | None = None) -> np.ndarray:
+        """
+        Lazily read a signal from the store.
+
+        Parameters
+        ----------
+        name : str
+            Name of the signal.
+        run_ids : int or list of int, optional
+            Runs to read. If not provided, a read-only memory map of shape
+            (number of runs, number of time steps) is returned, and values are only
+            loaded from disk when accessed.
+
+        Returns
+        -------
+        np.ndarray
+            The signal values. One-dimensional if a single run id is provided.
+        """
+        data = self._memmap(name)
+        if run_ids is None:
+            return data
+        return np.array(data[run_ids])
+
+    def get_signal_dataframe(self, name: str, run_ids: Sequence[int] | None = None) -> pd.DataFrame:
+        """
+        Read a signal as a DataFrame indexed by time [h], with one column per run.
+
+        Parameters
+        ----------
+        name : str
+            Name of the signal.
+        run_ids : list of int, optional
+            Runs to read. Defaults to all runs.
+        """
+        run_ids = list(self.runs.index) if run_ids is None else list(run_ids)
+        return pd.DataFrame(self.get_signal(name, run_ids).T,
+                            index=pd.Index(self.time_vector / 3600, name="time"),
+                            columns=pd.Index(run_ids, name="run_id"))
+
+    # ------------------------------------------------------------------
+    # Cross-run aggregation
+    # ------------------------------------------------------------------
+
+    def aggregate_signal(self, name: str, how: Aggregation = "mean", time_interval_h: tuple | None = None, chunk_size: int = 64) -> pd.Series:
+        """
+        Reduce a signal over time, for all runs.
+
+        The calculation is vectorized over blocks of ``chunk_size`` runs, so that the
+        memory used does not depend on the number of runs in the store.
+
+        Parameters
+        ----------
+        name : str
+            Name of the signal.
+        how : str or callable, optional
+            Reduction applied along the time axis. Either one of "mean", "sum", "min",
+            "max", "std", "integral" (time-integral, in [signal unit * h]), or a callable
+            that takes a (runs, time steps) array and returns one value per run.
+            Defaults to "mean".
+        time_interval_h : tuple, optional
+            Time interval [h] over which the reduction is calculated. Defaults to the whole run.
+        chunk_size : int, optional
+            Number of runs processed at once. Defaults to 64.
+
+        Returns
+        -------
+        pd.Series
+            One value per run, indexed by run id.
+        """
+        if how == "integral":
+            time_step_h = self.metadata["time_step"] / 3600
+            func = lambda arr: arr.sum(axis=1) * time_step_h
+        elif callable(how):
+            func = how
+        elif how in _AGGREGATIONS:
+            func = _AGGREGATIONS[how]
+        else:
+            raise ValueError(f'Unknown aggregation method "{how}". Valid options are {list(_AGGREGATIONS) + ["integral"]} or a callable')
+        if time_interval_h is None:
+            start_index, end_index = 0, self.metadata["n_steps"]
+        else:
+            start_index = int(time_interval_h[0] * 3600 / self.metadata["time_step"])
+            end_index = int(time_interval_h[1] * 3600 / self.metadata["time_step"])
+        data = self._memmap(name)
+        output = np.empty(self.n_runs, dtype=np.float64)
+        for chunk_start in range(0, self.n_runs, chunk_size):
+            chunk = np.asarray(data[chunk_start:chunk_start + chunk_size, start_index:end_index], dtype=np.float64)
+            output[chunk_start:chunk_start + chunk_size] = func(chunk)
+        return pd.Series(output, index=self.runs.index, name=name)
+
+    def kpi_table(self,
+                  index: str | List[str],
+                  values: str | List[str],
+                  columns: str | List[str] | None = None,
+                  aggfunc: str = "mean") -> pd.DataFrame:
+        """
+        Build a table of KPIs as a function of the run parameters.
+
+        Parameters
+        ----------
+        index : str or list of str
+            Parameter(s) used as rows of the table.
+        values : str or list of str
+            KPI(s) to be reported in the table. Signal names can also be used, in which
+            case the signal is reduced using its time average.
+        columns : str or list of str, optional
+            Parameter(s) used as columns of the table.
+        aggfunc : str, optional
+            Function used to aggregate runs with the same parameters. Defaults to "mean".
+
+        Returns
+        -------
+        pd.DataFrame
+            The pivoted table.
+        """
+        table = self.runs.copy()
+        for value in [values] if isinstance(values, str) else values:
+            if value not in table.columns and value in self.metadata["signals"]:
+                table[value] = self.aggregate_signal(value)
+        return table.pivot_table(index=index, columns=columns, values=values, aggfunc=aggfunc)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _check_signals(self, signals: Sequence[str]):
+        if self.metadata["n_steps"] is not None and set(signals) != set(self.signal_names):
+            raise ValueError(f'The signals of the run ({list(signals)}) do not match the ones of the store ({self.signal_names})')
+
+    @staticmethod
+    def _extract_signal(results: SimulationResults, name: str) -> np.ndarray:
+        """Find the column associated with a signal name in the results object"""
+        if ":" in name:
+            main_key, secondary_key = name.split(":", 1)
+            for category, registry in (("ports", results.signal_registry_ports),
+                                       ("controllers", results.signal_registry_controllers)):
+                try:
+                    return results.data.get_signal(category, registry.col_index(main_key, secondary_key))
+                except KeyError:
+                    continue
+        else:
+            try:
+                return results.data.get_signal("sensors", results.signal_registry_sensors.col_index(name, ""))
+            except KeyError:
+                pass
+        raise KeyError(f'Signal "{name}" was not found in the simulation results')
+
+    def _signal_path(self, name: str) -> str:
+        try:
+            return os.path.join(self.path, self.signals_folder, self.metadata["signals"][name])
+        except KeyError:
+            raise KeyError(f'Signal "{name}" is not available in the store. Available signals are {self.signal_names}')
+
+    def _memmap(self, name: str) -> np.ndarray:
+        path = self._signal_path(name)
+        if self.n_runs == 0:
+            return np.empty((0, 0), dtype=self.dtype)
+        return np.memmap(path, dtype=self.dtype, mode="r", shape=(self.n_runs, self.metadata["n_steps"]))
+
+    def _run_columns(self) -> List[str]:
+        return self.metadata["parameter_names"] + self.metadata["kpi_names"]
+
+    def _save(self):
+        # Saves the metadata and the last run. The row of the run is appended to the runs table, which is only
+        # rewritten when the run adds new parameters or KPIs (i.e. new columns)
+        with open(os.path.join(self.path, self.metadata_filename), "w") as f:
+            json.dump(self.metadata, f, indent=2)
+        path = os.path.join(self.path, self.runs_filename)
+        columns = self._run_columns()
+        if columns != self._csv_columns or not os.path.exists(path):
+            self.runs.to_csv(path)
+            self._csv_columns = columns
+        else:
+            last_run = pd.DataFrame(self._rows[-1:], columns=columns, index=pd.Index([self.n_runs - 1], name="run_id"))
+            last_run.to_csv(path, mode="a", header=False)
+
+    def _load_metadata(self):
+        with open(os.path.join(self.path, self.metadata_filename)) as f:
+            self.metadata = json.load(f)
+        self._runs = pd.read_csv(os.path.join(self.path, self.runs_filename), index_col="run_id")
+        self._rows = self._runs.to_dict("records")
+        self._csv_columns = list(self._runs.columns)
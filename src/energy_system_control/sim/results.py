@@ -2,7 +2,6 @@ from energy_system_control.sim.simulation_data import SimulationData
 from dataclasses import dataclass
 from typing import Any, List, Tuple
 import numpy as np
-import matplotlib.pyplot as plt
 
 @dataclass
 class SimulationResults:
@@ -17,6 +16,28 @@ class SimulationResults:
         """Return the recorded ports, controllers, and sensors as data frames."""
         return self.data.to_dataframe(self.time_vector, self.signal_registry_ports, self.signal_registry_controllers, self.signal_registry_sensors)
 
+    def get_port_values(self, signals: List[Tuple[str, str]]) -> np.ndarray:
+        """Return several port signals at once.
+
+        Args:
+            signals: List of ``(port_name, layer_name)`` pairs.
+
+        Returns:
+            Array of shape ``(n_steps, len(signals))`` with one column per signal.
+        """
+        return self.data.get_signals("ports", self.signal_registry_ports.col_indices(signals))
+
+    def get_sensor_values(self, sensor_names: List[str]) -> np.ndarray:
+        """Return the measurements of several sensors at once.
+
+        Args:
+            sensor_names: Names of the sensors.
+
+        Returns:
+            Array of shape ``(n_steps, len(sensor_names))`` with one column per sensor.
+        """
+        return self.data.get_signals("sensors", self.signal_registry_sensors.col_indices(sensor_names))
+
     def _get_cumulated_result(self, port_name: str, layer_name: str, time_interval_h: Tuple[float, float] = None, scaling_factor: float = 1):
         """Calculate the time-integrated value of a port signal.
 
@@ -31,11 +52,11 @@ class SimulationResults:
         """
         col = self.signal_registry_ports.col_index(port_name, layer_name)
         if time_interval_h is None:
-            return self.data.ports[:, col].sum() * self.time_step * scaling_factor
+            return self.data.get_signal("ports", col).sum() * self.time_step * scaling_factor
         else:
             start_index = int(time_interval_h[0] * 3_600 / self.time_step)
             end_index = int(time_interval_h[1] * 3_600 / self.time_step)
-            return self.data.ports[start_index : end_index, col].sum() * self.time_step * scaling_factor
+            return self.data.get_signal("ports", col)[start_index : end_index].sum() * self.time_step * scaling_factor
 
     def _get_cumulated_result_with_sign(self, port_name: str, layer_name: str, sign: str, time_interval_h: Tuple[float, float] = None, scaling_factor: float = 1):
         """Calculate a time-integrated port signal for one sign only.
@@ -51,14 +72,15 @@ class SimulationResults:
             The positive or negative contribution after integration.
         """
         col = self.signal_registry_ports.col_index(port_name, layer_name)
+        signal = self.data.get_signal("ports", col)
         if time_interval_h is None:
             start_index = 0
-            end_index = self.data.ports.shape[0]
+            end_index = len(signal)
         else:
             start_index = int(time_interval_h[0] * 3_600 / self.time_step)
             end_index = int(time_interval_h[1] * 3_600 / self.time_step)
 
-        temp = self.data.ports[start_index: end_index, col]
+        temp = signal[start_index: end_index]
         match sign:
             case 'only positive':
                 return temp[temp >= 0.0].sum() * self.time_step * scaling_factor
@@ -125,11 +147,12 @@ class SimulationResults:
         Returns:
             Fraction of samples satisfying the selected comparison.
         """
+        signal = self.data.get_signal("sensors", self.signal_registry_sensors.col_index(sensor_name, ""))
         match condition:
             case "gt" | ">" | ">=":
-                return sum(self.data.sensors[:, self.signal_registry_sensors.col_index(sensor_name, "")] >= boundary) / len(self.data.sensors[:, self.signal_registry_sensors.col_index(sensor_name, "")])
+                return sum(signal >= boundary) / len(signal)
             case "lt" | "<" | "<=":
-                return sum(self.data.sensors[:, self.signal_registry_sensors.col_index(sensor_name, "")] <= boundary) / len(self.data.sensors[:, self.signal_registry_sensors.col_index(sensor_name, "")])
+                return sum(signal <= boundary) / len(signal)
 
 
     def plot_sensors(self, sensors: str | List[str] | None= None, labels: str | List[str] | None = None, ylabel: str | None= None, filename: str | None = None, reference_value: float | None = None):
@@ -145,6 +168,7 @@ class SimulationResults:
         Returns:
             The Matplotlib figure and primary axes.
         """
+        import matplotlib.pyplot as plt  # Only needed for plotting: imported here to keep the package import fast
         fig, ax = plt.subplots(figsize=(10, 6))
         if isinstance(sensors, str):
             sensors_list = [sensors]
@@ -152,8 +176,10 @@ class SimulationResults:
         elif isinstance(sensors, list):
             sensors_list = sensors
             labels_list = labels
+        values = self.get_sensor_values(sensors_list)
         for id, sensor in enumerate(sensors_list):
-            self._plot_sensor(ax, sensor, labels_list[id])
+            label = labels_list[id] if labels_list and labels_list[id] else sensor
+            ax.plot(self.time_vector/3600, values[:, id], label=label)
         if reference_value:
             ax.hlines([reference_value], xmin = ax.get_xlim()[0], xmax = ax.get_xlim()[1], colors = ['red'], linestyles=['solid'])
         ax.set_xlabel('Time [h]')
@@ -165,12 +191,6 @@ class SimulationResults:
             fig.savefig(filename)
         return fig, ax
 
-    def _plot_sensor(self, ax, sensor_name: str, label: str | None = None):
-        """Add one sensor signal to an existing Matplotlib axes."""
-        col = self.signal_registry_sensors.col_index(sensor_name, "")
-        label = label if label else sensor_name
-        ax.plot(self.time_vector/3600, self.data.sensors[:,col], label=label)
-        
     def plot_temperature_sensors(self, sensors: str | List[str] | None= None, labels: str | List[str] | None = None, ylabel: str | None= None, filename: str | None = None, comfort_temperature: float | None = None):
         """Plot temperature sensor signals with an optional comfort boundary.
 
@@ -213,7 +233,7 @@ class SimulationResults:
             ax2 = ax.twinx()
 
             col = self.signal_registry_sensors.col_index(SOC_sensor, "")
-            soc_values = self.data.sensors[:, col]
+            soc_values = self.data.get_signal("sensors", col)
 
             ax2.plot(
                 self.time_vector / 3600,
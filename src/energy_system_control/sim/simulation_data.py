@@ -1,20 +1,247 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
 import numpy as np
 import pandas as pd
 
+# Storage policies that can be assigned to each signal when it is registered.
+# - Dense policies store one value per time step, using the corresponding numpy dtype
+# - "rle" (run-length encoding) stores only the values at which the signal changes. Useful for mostly-constant signals
+# - "sparse" stores only the values different from zero. Useful for signals that are zero most of the time
+# The encoded policies decode to float32, or to the dtype given after a colon (e.g. "rle:float64", "sparse:int8").
+# The integer and boolean dtypes cannot represent missing values (NaN), so they are not allowed for the signals of the
+# nullable categories (ports and sensors, whose missing values are recorded as NaN)
+DENSE_POLICIES = {"float32": np.float32, "float64": np.float64, "int8": np.int8, "int16": np.int16, "int32": np.int32, "bool": np.bool_}
+ENCODED_POLICIES = {"rle", "sparse"}
+DEFAULT_POLICY = "float32"
+CATEGORIES = ("ports", "controllers", "sensors")
+NULLABLE_CATEGORIES = ("ports", "sensors")
+
+
+def parse_policy(policy: str) -> Tuple[str, np.dtype]:
+    """Returns the kind of storage ("dense", "rle" or "sparse") and the dtype of the values of a storage policy"""
+    encoding, _, dtype = policy.partition(":")
+    if encoding in DENSE_POLICIES and not dtype:
+        return "dense", np.dtype(DENSE_POLICIES[encoding])
+    if encoding in ENCODED_POLICIES and (dtype or DEFAULT_POLICY) in DENSE_POLICIES:
+        return encoding, np.dtype(DENSE_POLICIES[dtype or DEFAULT_POLICY])
+    raise ValueError(f'Unknown storage policy "{policy}". Valid options are {list(DENSE_POLICIES)}, and {sorted(ENCODED_POLICIES)} '
+                     f'optionally followed by ":<dtype>"')
+
+
+def _missing_value(dtype: np.dtype):
+    # Value of the time steps that are not recorded: NaN, or zero for the dtypes without NaN
+    return np.nan if dtype.kind == "f" else 0
+
+
+class RunLengthSignal:
+    """
+    Run-length encoded signal: a new value is stored only when it differs from the previous one
+
+    Parameters
+    ----------
+    length : int
+        Number of time steps of the signal
+    dtype : np.dtype, optional
+        Type of the decoded values. Defaults to float32
+    """
+    __slots__ = ("length", "dtype", "starts", "values")
+
+    def __init__(self, length: int, dtype: np.dtype = np.float32):
+        self.length = length
+        self.dtype = np.dtype(dtype)
+        self.starts: List[int] = []
+        self.values: List[float] = []
+
+    def record(self, time_id: int, value: float):
+        if self.values:
+            last = self.values[-1]
+            if value == last or (value != value and last != last):  # The second check handles NaN values
+                return
+        self.starts.append(time_id)
+        self.values.append(value)
+
+    def decode(self) -> np.ndarray:
+        output = np.full(self.length, _missing_value(self.dtype), dtype=self.dtype)
+        if self.starts:
+            bounds = np.append(self.starts, self.length)
+            output[self.starts[0]:] = np.repeat(np.asarray(self.values, dtype=self.dtype), np.diff(bounds))
+        return output
+
+    @property
+    def nbytes(self) -> int:
+        return (8 + self.dtype.itemsize) * len(self.starts)
+
+
+class SparseSignal:
+    """
+    Sparse signal: only the values different from zero are stored, together with their time step index
+
+    Parameters
+    ----------
+    length : int
+        Number of time steps of the signal
+    dtype : np.dtype, optional
+        Type of the decoded values. Defaults to float32
+    """
+    __slots__ = ("length", "dtype", "indices", "values")
+
+    def __init__(self, length: int, dtype: np.dtype = np.float32):
+        self.length = length
+        self.dtype = np.dtype(dtype)
+        self.indices: List[int] = []
+        self.values: List[float] = []
+
+    def record(self, time_id: int, value: float):
+        if value != 0.0:
+            self.indices.append(time_id)
+            self.values.append(value)
+
+    def decode(self) -> np.ndarray:
+        output = np.zeros(self.length, dtype=self.dtype)
+        if self.indices:
+            output[self.indices] = self.values
+        return output
+
+    @property
+    def nbytes(self) -> int:
+        return (8 + self.dtype.itemsize) * len(self.indices)
+
+
 @dataclass
 class SimulationData:
+    """
+    Container of the data recorded during a simulation.
+
+    Signals stored with the default policy ("float32") are kept in the dense ``ports``, ``controllers`` and ``sensors``
+    arrays. Signals with a different storage policy are kept separately, and ``layouts`` maps each column of the
+    registries to where its data is stored. Use ``get_signal`` to read a signal independently of its storage policy.
+    """
     ports: np.array = None
     sensors: np.array = None
     controllers: np.array = None
     rl: np.array = None
+    layouts: Dict[str, List[Tuple[str, int]]] = field(default_factory=dict)
+    typed_arrays: Dict[str, Dict[str, np.ndarray]] = field(default_factory=dict)
+    encoded_signals: Dict[str, Dict[int, RunLengthSignal | SparseSignal]] = field(default_factory=dict)
 
     def create_empty_datasets(self, time_vector, signal_registry_ports, signal_registry_controllers, signal_registry_sensors, signal_registry_rl = None):
-        self.ports = np.empty((len(time_vector), len(signal_registry_ports._col_to_key)), dtype=np.float32)
-        self.controllers = np.empty((len(time_vector), len(signal_registry_controllers._col_to_key)), dtype=np.float32)
-        self.sensors = np.empty((len(time_vector), len(signal_registry_sensors._col_to_key)), dtype=np.float32)
+        n_steps = len(time_vector)
+        for category, registry in zip(CATEGORIES, (signal_registry_ports, signal_registry_controllers, signal_registry_sensors)):
+            self._create_category(category, registry, n_steps)
         if signal_registry_rl:
-            self.rl = np.empty((len(time_vector), len(signal_registry_rl._col_to_key)), dtype=np.float32)
+            self.rl = np.empty((n_steps, len(signal_registry_rl._col_to_key)), dtype=np.float32)
+
+    def _create_category(self, category: str, registry, n_steps: int):
+        layout = []
+        columns_per_policy = {}
+        self.encoded_signals[category] = {}
+        for col in range(len(registry._col_to_key)):
+            policy = registry.storage(col)
+            try:
+                encoding, dtype = parse_policy(policy)
+            except ValueError as e:
+                raise ValueError(f'{e} (signal {registry._col_to_key[col]})') from None
+            if category in NULLABLE_CATEGORIES and dtype.kind != "f":
+                raise ValueError(f'The storage policy "{policy}" of signal {registry._col_to_key[col]} cannot represent missing values: '
+                                 f'use a floating point dtype for the {category}')
+            if encoding == "dense":
+                local_col = columns_per_policy.get(policy, 0)
+                columns_per_policy[policy] = local_col + 1
+                layout.append((policy, local_col))
+            else:
+                self.encoded_signals[category][col] = (RunLengthSignal if encoding == "rle" else SparseSignal)(n_steps, dtype)
+                layout.append((encoding, col))
+        # The default policy is always available, as the main array of each category. Rows that are never recorded
+        # hold the missing value of the dtype
+        columns_per_policy.setdefault(DEFAULT_POLICY, 0)
+        self.typed_arrays[category] = {policy: np.full((n_steps, n_cols), _missing_value(np.dtype(DENSE_POLICIES[policy])), dtype=DENSE_POLICIES[policy])
+                                       for policy, n_cols in columns_per_policy.items()}
+        setattr(self, category, self.typed_arrays[category][DEFAULT_POLICY])
+        self.layouts[category] = layout
+
+    def record(self, category: str, time_id: int, col: int, value):
+        policy, local_col = self.layouts[category][col]
+        if policy in ENCODED_POLICIES:
+            self.encoded_signals[category][col].record(time_id, value)
+        else:
+            self.typed_arrays[category][policy][time_id, local_col] = value
+
+    def record_rows(self, category: str, start_id: int, values: np.ndarray):
+        """
+        Records a block of consecutive time steps of all the signals of a category
+
+        Parameters
+        ----------
+        category : str
+            The signal category ("ports", "controllers" or "sensors")
+        start_id : int
+            The time step of the first row of the block
+        values : np.ndarray
+            The values to record, with shape (time steps x columns of the category)
+        """
+        stop_id = start_id + len(values)
+        for col, (policy, local_col) in enumerate(self.layouts[category]):
+            if policy in ENCODED_POLICIES:
+                signal = self.encoded_signals[category][col]
+                for time_id, value in enumerate(values[:, col].tolist(), start_id):
+                    signal.record(time_id, value)
+            else:
+                self.typed_arrays[category][policy][start_id:stop_id, local_col] = values[:, col]
+
+    def get_signal(self, category: str, col: int) -> np.ndarray:
+        """
+        Returns the data related to one column of a category as a dense numpy array
+
+        Parameters
+        ----------
+        category : str
+            The signal category ("ports", "controllers" or "sensors")
+        col : int
+            The column index of the signal in the related registry
+        """
+        layout = self.layouts.get(category)
+        if layout is None:  # Data assigned directly as dense arrays
+            return getattr(self, category)[:, col]
+        policy, local_col = layout[col]
+        if policy in ENCODED_POLICIES:
+            return self.encoded_signals[category][col].decode()
+        return self.typed_arrays[category][policy][:, local_col]
+
+    def get_signals(self, category: str, cols) -> np.ndarray:
+        """
+        Returns the data related to several columns of a category as a 2D numpy array (time steps x columns)
+
+        Parameters
+        ----------
+        category : str
+            The signal category ("ports", "controllers" or "sensors")
+        cols : array-like of int
+            The column indices of the signals, e.g. as returned by SignalRegistry.col_indices
+        """
+        cols = np.asarray(cols, dtype=np.intp)
+        layout = self.layouts.get(category)
+        if layout is None:
+            return getattr(self, category)[:, cols]
+        policies = {layout[col][0] for col in cols}
+        if policies == {DEFAULT_POLICY}:  # Single fancy-indexing operation on the main array
+            return getattr(self, category)[:, [layout[col][1] for col in cols]]
+        return np.column_stack([self.get_signal(category, col) for col in cols]) if len(cols) else np.empty((len(getattr(self, category)), 0))
+
+    @property
+    def nbytes(self) -> int:
+        """Total memory [bytes] used to store the recorded signals"""
+        if not self.layouts:
+            return sum(arr.nbytes for arr in (self.ports, self.controllers, self.sensors) if arr is not None)
+        output = sum(arr.nbytes for arrays in self.typed_arrays.values() for arr in arrays.values())
+        output += sum(signal.nbytes for signals in self.encoded_signals.values() for signal in signals.values())
+        return output
+
+    def _category_to_dataframe(self, category: str, columns: List[str], index) -> pd.DataFrame:
+        layout = self.layouts.get(category)
+        if layout is None or all(policy == DEFAULT_POLICY for policy, _ in layout):
+            return pd.DataFrame(getattr(self, category), columns = columns, index=index)
+        data = {column: self.get_signal(category, col) for col, column in enumerate(columns)}
+        return pd.DataFrame(data, columns = columns, index=index)
 
     def to_dataframe(self, time_vector, signal_registry_ports, signal_registry_controllers, signal_registry_sensors):
         if isinstance(time_vector, pd.DatetimeIndex):
@@ -22,9 +249,9 @@ class SimulationData:
         elif isinstance(time_vector, np.ndarray):
             index = pd.Index(time_vector / 3600, name='time')
         columns = [f'{key.main_key}:{key.secondary_key}' for key in signal_registry_ports._col_to_key]
-        df_ports = pd.DataFrame(self.ports, columns = columns, index=index)
+        df_ports = self._category_to_dataframe("ports", columns, index)
         columns = [f'{key.main_key}:{key.secondary_key}' for key in signal_registry_controllers._col_to_key]
-        df_controllers = pd.DataFrame(self.controllers, columns = columns, index=index)
+        df_controllers = self._category_to_dataframe("controllers", columns, index)
         columns = [f'{key.main_key}' for key in signal_registry_sensors._col_to_key]
-        df_sensors = pd.DataFrame(self.sensors, columns = columns, index=index)
-        return df_ports, df_controllers, df_sensors
\ No newline at end of file
+        df_sensors = self._category_to_dataframe("sensors", columns, index)
+        return df_ports, df_controllers, df_sensors
@@ -1,6 +1,7 @@
 # energy_system_control/sim/simulator.py
 from dataclasses import dataclass, fields
-from typing import Any
+import copy
+from typing import Any, Dict
 from numbers import Number
 import numpy as np
 import pandas as pd
@@ -9,7 +10,7 @@ from energy_system_control.core.base_environment import Environment  # or move E
 from energy_system_control.core.base_classes import InitContext, EnvironmentalData
 from .config import SimulationConfig
 from .state import SimulationState
-from energy_system_control.helpers import C2K, calculate_solar_angles
+from energy_system_control.helpers import C2K, calculate_solar_angles, PeriodicArray
 from energy_system_control.core.port import FluidPort, HeatPort
 from energy_system_control.sim.simulation_data import SimulationData  # wherever it lives
 from energy_system_control.sim.results import SimulationResults
@@ -21,6 +22,22 @@ class Simulator:
     cfg: SimulationConfig
 
     def run(self) -> SimulationData:
+        sim_data = self._prepare_run()
+        fast_forward = self.cfg.fast_forward_steps > 0 and self._initialize_fast_forward()
+
+        # Main loop
+        while self.state.time < (self.cfg.simulation_end_h * 3600.0 - 1e-9):
+            if fast_forward and self._fast_forward(sim_data):
+                continue
+            self._step(sim_data)
+            if fast_forward:
+                self._track_quiescence()
+            self.state.time += self.cfg.time_step_s
+            self.state.time_id += 1
+
+        return self._create_results(sim_data)
+
+    def _prepare_run(self) -> SimulationData:
         self.state = SimulationState()
         self.state.initialize(self.cfg)
         self.env.initialize(self.state, self.cfg)  # This allows the environment to initialize the provider if needed
@@ -37,14 +54,10 @@ class Simulator:
         self._read_timeseries_data()
         # Initialize units / reset components, controllers, sensors
         self._initialize_units()        
+        self._initialize_schedule()
+        return sim_data
 
-        # Main loop
-        while self.state.time < (self.cfg.simulation_end_h * 3600.0 - 1e-9):
-            self._step(sim_data)
-            self.state.time += self.cfg.time_step_s
-            self.state.time_id += 1
-
-        # Creating results object
+    def _create_results(self, sim_data: SimulationData) -> SimulationResults:
         if self.cfg.simulation_start_datetime is not None:
             results_index = pd.date_range(start = self.cfg.simulation_start_datetime,
                                           end = self.cfg.simulation_start_datetime + pd.Timedelta(hours = self.cfg.simulation_end_h),
@@ -63,7 +76,7 @@ class Simulator:
         return simulation_results
     
     def _initialize_units(self):
-        ctx = InitContext(environment=self.env, state=self.state)
+        ctx = InitContext(environment=self.env, state=self.state, rng=np.random.default_rng(self.cfg.seed), config={'seed': self.cfg.seed})
         for _, component in self.env.components.items():
             component.initialize(ctx)
         for _, port in self.env.ports.items():
@@ -76,6 +89,40 @@ class Simulator:
             controller.initialize(ctx)
         
 
+    def _initialize_schedule(self):
+        # Multi-rate execution: sensors, controllers and predictors declaring an execution_interval_h are only executed
+        # every execution_steps time steps, and their last measurement, action or forecast is held in between
+        for obj in [*self.env.sensors.values(), *self.env.controllers.values(), *self.env.predictors.values()]:
+            obj.execution_steps = self._execution_steps(obj)
+        for predictor in self.env.predictors.values():
+            predictor.clear_forecasts()
+
+    def _execution_steps(self, obj) -> int:
+        interval_h = getattr(obj, 'execution_interval_h', None)
+        if interval_h is None:
+            return 1
+        n_steps = round(interval_h / self.cfg.time_step_h)
+        if n_steps < 1 or abs(n_steps * self.cfg.time_step_h - interval_h) > 1e-9:
+            raise ValueError(f"The execution interval of {obj.name} ({interval_h} h) must be a multiple of the time step ({self.cfg.time_step_h} h)")
+        return n_steps
+
+    def _is_due(self, obj) -> bool:
+        return self.state.time_id % obj.execution_steps == 0
+
+    def _input_series(self) -> Dict[str, Any]:
+        """Returns the input series of the run (the time series of the components and the data of the environmental data provider), keyed by component or variable name"""
+        series = {}
+        for name, component in self.env.components.items():
+            data = getattr(component, 'data', None)
+            if data is None and getattr(component, 'ts', None) is not None:
+                data = component.ts.data
+            if data is not None and not isinstance(data, dict):
+                series[name] = data
+        provider_data = getattr(self.env.environmental_data_provider, 'data', None)
+        if isinstance(provider_data, dict):
+            series.update({variable: values for variable, values in provider_data.items() if values is not None})
+        return series
+
     def _read_timeseries_data(self):
         # Read timeseries data from components
         for _, component in self.env.components.items():
@@ -112,14 +159,20 @@ class Simulator:
             return np.nan
 
     def _step(self, sim_data: SimulationData) -> None:
+        self._simulate_step()
+        # Save results for this step
+        self._save_simulation_data(sim_data)
+
+    def _simulate_step(self) -> None:
         env = self.env  # just a shorthand
         
         # 1. Update environmental data (this is time-varying state)
         self.state.environmental_data = self._update_environmental_data()
 
-        # 2. Measure all sensors at time t
+        # 2. Measure all sensors at time t (sensors with an execution interval hold their last measurement in between)
         for _, sensor in env.sensors.items():
-            sensor.measure(environment=env, state=self.state)  # We measure all sensors at the beginning of the step to make sure that controllers have access to the most recent measurements when they calculate their actions. This also ensures that we have sensor data for the initial state of the simulation.
+            if sensor.execution_steps == 1 or self._is_due(sensor):
+                sensor.measure(environment=env, state=self.state)  # We measure all sensors at the beginning of the step to make sure that controllers have access to the most recent measurements when they calculate their actions. This also ensures that we have sensor data for the initial state of the simulation.
         
         # 3. Reset port data
         for _, port in env.ports.items():
@@ -141,9 +194,6 @@ class Simulator:
         # 8. Check balances on all nodes:
         self._check_connection_balance()  # This will raise an error if the balance is not correct
 
-        # Save results for this step
-        sim_data = self._save_simulation_data(sim_data)
-
     def _update_environmental_data(self):
         env_data = self.state.environmental_data
 
@@ -157,7 +207,7 @@ class Simulator:
 
         # Automatically compute solar angles if not available
         if env_data.solar_zenith is None or env_data.solar_azimuth is None:
-            if self.env.latitude and self.env.longitude:
+            if self.env.latitude is not None and self.env.longitude is not None:
                 dt = self.state.simulation_start_datetime + pd.to_timedelta(self.state.time, unit='s')
                 env_data.solar_zenith, env_data.solar_azimuth = calculate_solar_angles(self.env.latitude, self.env.longitude, dt)
 
@@ -170,10 +220,15 @@ class Simulator:
             for port_name, temperature in inherited_fluid_ports_info.items():
                 if port_name and env.ports[port_name].connected_port is not None:
                     env.ports[port_name].connected_port.T = temperature
+                    env.ports[port_name].connected_port.cp = env.ports[port_name].cp
+                    if env.ports[port_name].unit_T is not None:
+                        env.ports[port_name].connected_port.unit_T = env.ports[port_name].unit_T
             inherited_heat_ports_info = component.set_inherited_heat_port_values(self.state)
             for port_name, temperature in inherited_heat_ports_info.items():
                 if port_name and env.ports[port_name].connected_port is not None:
                     env.ports[port_name].connected_port.T = temperature
+                    if env.ports[port_name].unit_T is not None:
+                        env.ports[port_name].connected_port.unit_T = env.ports[port_name].unit_T
     
     def _simulate_all_components(self):
         self.components_to_simulate = list(self.env.components.keys())
@@ -184,13 +239,32 @@ class Simulator:
         self._simulate_components_of_type("Grid")
 
     def _simulate_components_of_type(self, type: str):
-        components = self.env.components_classified[type]
-        for component in components:
-            if component.name in self.components_to_simulate:
+        components = [component for component in self.env.components_classified[type] if component.name in self.components_to_simulate]
+        for batch in self._component_batches(components):
+            if len(batch) > 1:
+                batch[0].step_batch(batch, self.state)
+                for component in batch:
+                    self._update_connected_ports(component)
+            else:
+                component = batch[0]
                 action = self.state.control_actions.get(component.name)
-                self._take_component_step(component, action)           
+                self._take_component_step(component, action)
                 # self.components_to_simulate.remove(component.name)
 
+    @staticmethod
+    def _component_batches(components: list) -> list:
+        # Splits the components, in their order, into batches: consecutive components of the same class defining
+        # step_batch (and without sub-steps) are stepped together, the others one by one
+        batches, last_batchable = [], False
+        for component in components:
+            batchable = component.step_batch is not None and component.n_substeps == 1 and component.substep_tolerance is None
+            if batchable and last_batchable and type(batches[-1][0]) is type(component):
+                batches[-1].append(component)
+            else:
+                batches.append([component])
+            last_batchable = batchable
+        return batches
+
     def _solve_algebric_networks(self):
         components_to_simulate = self.env.components_classified['Bus'] + self.env.components_classified['ImplicitComponent']
         while len(components_to_simulate) > 0:
@@ -210,8 +284,11 @@ class Simulator:
         actions = {}
         for controller_name in self.env.ordered_controllers:
             controller = self.env.controllers[controller_name]
-            controller.get_obs(self.env, self.state)
-            ctrl_actions = controller.get_action(self.state)
+            if controller.execution_steps == 1 or self._is_due(controller):
+                controller.get_obs(self.env, self.state)
+                ctrl_actions = controller.get_action(self.state)
+            else:
+                ctrl_actions = controller.previous_action  # Zero-order hold between executions
             for comp, action in ctrl_actions.items():
                 if comp in actions:
                     raise ValueError(f"Component {comp} controlled by multiple controllers.")
@@ -219,7 +296,10 @@ class Simulator:
         self.state.control_actions = actions
 
     def _take_component_step(self, component, action):
-        component.step(self.state, action)
+        component.advance(self.state, action)
+        self._update_connected_ports(component)
+
+    def _update_connected_ports(self, component):
         # Update values of connected ports
         for _, port in component.ports.items():
             for layer, value in port.flows.items():
@@ -227,6 +307,11 @@ class Simulator:
                     port.connected_port.flows[layer] = -value
                     if isinstance(port.connected_port, FluidPort | HeatPort):
                         port.connected_port.T = self.env.ports[port.name].T
+            if port.unit_flows is not None and port.connected_port:
+                # Per-unit flows of fleet components
+                port.connected_port.unit_flows = {layer: -value for layer, value in port.unit_flows.items()}
+                if port.unit_T is not None:
+                    port.connected_port.unit_T = port.unit_T
     
     def _check_connection_balance(self):
         # Checks that all connections have the same flow on both sides
@@ -236,31 +321,231 @@ class Simulator:
                 if abs(value + env.ports[connection[1]].flows[layer]) > 1e-5:
                     raise ValueError(f"Connection {connection} has unbalanced flows: {env.ports[connection[0]].flows[layer]:.2f} != {env.ports[connection[1]].flows[layer]:.2f}")
 
-    def _save_simulation_data(self, sim_data):
+    def _save_simulation_data(self, sim_data, time_id: int | None = None):
+        # Columns are addressed with the handles assigned to each object by Environment.create_data_registry
         # Ports
-        time_id = self.state.time_id
+        time_id = self.state.time_id if time_id is None else time_id
         for port_name, port in self.env.ports.items():
+            handles = port.signal_handles
             for layer, flow in port.flows.items():
-                col = self.env.signal_registry_ports.col_index(port_name, layer)
                 try:
-                    sim_data.ports[time_id, col] = flow if flow is not None else np.nan
+                    sim_data.record("ports", time_id, handles[layer], flow if flow is not None else np.nan)
                 except ValueError as e:
                     print(f"Error saving flow for port {port_name} and layer {layer}: {e}")
             if isinstance(port, FluidPort):
-                col = self.env.signal_registry_ports.col_index(port_name, 'temperature')
-                sim_data.ports[time_id, col] = port.T
+                sim_data.record("ports", time_id, handles['temperature'], port.T)
         # Controllers
-        for controller_name, controller in self.env.controllers.items():
+        for controller in self.env.controllers.values():
+            handles = controller.signal_handles
             for controlled_component_name, action_value in controller.previous_action.items():
-                col = self.env.signal_registry_controllers.col_index(controller_name, controlled_component_name)
-                sim_data.controllers[time_id, col] = action_value
-                if isinstance(controller, RLController):
-                    col_reward = self.env.signal_registry_controllers.col_index(controller_name, 'reward')
-                    col_td_error = self.env.signal_registry_controllers.col_index(controller_name, 'td_error')
-                    sim_data.controllers[time_id, col_reward] = controller.agent.last_reward
-                    sim_data.controllers[time_id, col_td_error] = controller.agent.last_td_error
-        # We also create a registry for each sensor
-        for sensor_name, sensor in self.env.sensors.items():
-            col = self.env.signal_registry_sensors.col_index(sensor_name, "")
-            sim_data.sensors[time_id, col] = self._normalize_measurement(sensor.current_measurement)
-        return sim_data
\ No newline at end of file
+                if isinstance(action_value, np.ndarray):
+                    action_value = action_value.mean()  # Per-unit actions of fleet components
+                sim_data.record("controllers", time_id, handles[controlled_component_name], action_value)
+            if isinstance(controller, RLController):
+                sim_data.record("controllers", time_id, handles['reward'], controller.agent.last_reward)
+                sim_data.record("controllers", time_id, handles['td_error'], controller.agent.last_td_error)
+        # Sensors
+        for sensor in self.env.sensors.values():
+            sim_data.record("sensors", time_id, sensor.signal_handle, self._normalize_measurement(sensor.current_measurement))
+        return sim_data
+
+    # Fast-forward over quiescent periods
+    # -----------------------------------
+    # When the port flows and the control actions of the last two steps are the same, and the input series stay the same
+    # over the next steps, the storage units evolve with the affine map given by Component.quiescent_dynamics, which is
+    # integrated analytically over a window of steps. The recorded signals are evaluated on a few steps of the window, and
+    # fitted as affine functions of the trajectories. The window is then verified by simulating the step that follows it:
+    # if its flows and actions are still the same, and the fit matches the evaluated steps (both within
+    # cfg.fast_forward_tolerance), the recorded rows of the window are filled in bulk. Otherwise the window is discarded
+    # and the simulation goes on step by step with a shorter window.
+    # Since the storage states evolve monotonically within a window, controllers with threshold-based actions that are
+    # the same at both ends of the window are assumed not to change within it.
+
+    def _initialize_fast_forward(self) -> bool:
+        provider = self.env.environmental_data_provider
+        if provider is not None and not isinstance(getattr(provider, 'data', None), dict):
+            return False  # The environmental data of the next steps are not known in advance
+        if not all(controller.supports_fast_forward for controller in self.env.controllers.values()):
+            return False
+        if not all(sensor.supports_fast_forward for sensor in self.env.sensors.values()):
+            return False
+        if any(obj.execution_steps > 1 for obj in [*self.env.sensors.values(), *self.env.controllers.values()]):
+            return False  # The held measurements and actions are not handled by the affine integration of the windows
+        self._fast_forward_inputs = [values if isinstance(values, PeriodicArray) else np.asarray(values) for values in self._input_series().values()]
+        self._fast_forward_window = self.cfg.fast_forward_steps
+        self._fast_forward_active = True
+        self._quiescent = False
+        self._last_flows = self._last_actions = None
+        return True
+
+    def _port_flows(self) -> np.ndarray:
+        return np.array([np.nan if value is None else value for port in self.env.ports.values() for value in port.flows.values()], dtype=float)
+
+    def _is_same_step(self, flows: np.ndarray, actions: Dict[str, Any]) -> bool:
+        # Compares the flows and the actions of a step with the ones of the last step
+        mismatch = ~(np.abs(flows - self._last_flows) <= self.cfg.fast_forward_tolerance)
+        if mismatch.any() and (mismatch & ~(np.isnan(flows) & np.isnan(self._last_flows))).any():
+            return False
+        return actions.keys() == self._last_actions.keys() and all(np.array_equal(value, self._last_actions[key]) for key, value in actions.items())
+
+    def _track_quiescence(self):
+        flows = self._port_flows()
+        self._quiescent = self._last_flows is not None and self._is_same_step(flows, self.state.control_actions)
+        self._last_flows, self._last_actions = flows, dict(self.state.control_actions)
+
+    def _constant_input_steps(self, limit: int) -> int:
+        # Number of steps, starting from the current one (and up to limit), with the same inputs as the previous step
+        time_id = self.state.time_id
+        n_steps = limit
+        for values in self._fast_forward_inputs:
+            segment = np.asarray(values[time_id - 1:time_id + n_steps])
+            n_steps = min(n_steps, len(segment) - 1)
+            if n_steps < 1:
+                return 0
+            changed = np.flatnonzero((segment[1:] != segment[:1]).reshape(len(segment) - 1, -1).any(axis=1))
+            if len(changed):
+                n_steps = min(n_steps, changed[0])
+        return n_steps
+
+    def _fast_forward(self, sim_data: SimulationData) -> bool:
+        """
+        Tries to skip a window of quiescent steps, returning True if the steps were skipped (the state of the
+        simulation is then at the step that follows the window) and False if the next step must be simulated normally.
+        """
+        if not (self._quiescent and self._fast_forward_active):
+            return False
+        state = self.state
+        start_id, start_time = state.time_id, state.time
+        n_remaining = len(state.time_vector) - start_id
+        window = self._constant_input_steps(min(self._fast_forward_window + 1, n_remaining)) - 1
+        if window < 1:
+            return False
+
+        # Analytical trajectories of the storage units, for the steps from start_id - 1 to start_id + window
+        trajectories, rates = {}, []
+        for storage in self.env.components_classified['StorageUnit']:
+            coefficients = storage.quiescent_dynamics(state)
+            if coefficients is None or np.any(coefficients[0] <= 0):
+                self._fast_forward_active = False
+                return False
+            trajectories[storage] = _affine_trajectory(storage.get_internal_state(), *coefficients, window)
+            rates.append(coefficients[0])
+        rates = np.unique(np.concatenate(rates)) if rates else np.array([])
+        snapshot = self._take_snapshot()
+
+        # The recorded rows are evaluated on twice as many steps of the window as there are basis functions, so that the
+        # residuals of the fit reveal the signals that are not affine in the trajectories (e.g. a clipped or squared value)
+        basis = _trajectory_basis(rates, window)
+        rows = np.round(np.linspace(0, window - 1, min(window, 2 * basis.shape[1]))).astype(int)
+        registries = {"ports": self.env.signal_registry_ports, "controllers": self.env.signal_registry_controllers, "sensors": self.env.signal_registry_sensors}
+        samples = SimulationData()
+        samples.create_empty_datasets(np.empty(len(rows) + 1), *registries.values())
+        for sample_id, k in enumerate(rows):
+            self._set_quiescent_state(trajectories, start_id, start_time, k)
+            for sensor in self.env.sensors.values():
+                sensor.measure(environment=self.env, state=state)
+            self._propagate_port_values()
+            self._save_simulation_data(samples, sample_id)
+
+        # Verification step, after the window
+        self._set_quiescent_state(trajectories, start_id, start_time, window)
+        for controller in self.env.controllers.values():
+            if controller.on_off_time_limitations:
+                for component_name in controller.time_elapsed_since_last_state_change:
+                    controller.time_elapsed_since_last_state_change[component_name] += window * state.time_step
+        self._simulate_step()
+        self._save_simulation_data(samples, len(rows))
+        flows = self._port_flows()
+        blocks = {category: _fill_rows(samples.get_signals(category, np.arange(len(registry._col_to_key))), rows, basis, self.cfg.fast_forward_tolerance)
+                  for category, registry in registries.items()}
+        if not self._is_same_step(flows, state.control_actions) or any(block is None for block in blocks.values()):
+            self._restore_snapshot(snapshot)
+            state.time_id, state.time = start_id, start_time
+            self._fast_forward_window = max(1, window // 2)
+            return False
+
+        for category, block in blocks.items():
+            sim_data.record_rows(category, start_id, block)
+        self._last_flows, self._last_actions = flows, dict(state.control_actions)
+        self._fast_forward_window = min(self.cfg.fast_forward_steps, 2 * self._fast_forward_window)
+        state.time_id = start_id + window + 1
+        state.time = start_time + (window + 1) * self.cfg.time_step_s
+        return True
+
+    def _set_quiescent_state(self, trajectories, start_id: int, start_time: float, k: int):
+        # Sets the storage units to their state at step start_id + k. The port temperatures are first propagated from
+        # the previous step, as the sensors of the step read them before they are updated
+        for storage, trajectory in trajectories.items():
+            storage.set_internal_state(trajectory[k])
+        self._propagate_port_values()
+        for storage, trajectory in trajectories.items():
+            storage.set_internal_state(trajectory[k + 1])
+        self.state.time_id = start_id + k
+        self.state.time = start_time + k * self.cfg.time_step_s
+
+    def _take_snapshot(self) -> Dict[str, Any]:
+        env = self.env
+        return {
+            'storages': {storage: storage.get_internal_state() for storage in env.components_classified['StorageUnit']},
+            'ports': {port: (dict(port.flows), getattr(port, 'T', None), port.unit_flows, port.unit_T) for port in env.ports.values()},
+            'controllers': {controller: (dict(controller.previous_action), dict(controller.time_elapsed_since_last_state_change)) for controller in env.controllers.values()},
+            'sensors': {sensor: sensor.current_measurement for sensor in env.sensors.values()},
+            'control_actions': self.state.control_actions,
+            'environmental_data': copy.copy(self.state.environmental_data),
+        }
+
+    def _restore_snapshot(self, snapshot: Dict[str, Any]):
+        for storage, internal_state in snapshot['storages'].items():
+            storage.set_internal_state(internal_state)
+        for port, (flows, T, unit_flows, unit_T) in snapshot['ports'].items():
+            port.flows, port.unit_flows, port.unit_T = flows, unit_flows, unit_T
+            if hasattr(port, 'T'):
+                port.T = T
+        for controller, (previous_action, time_elapsed) in snapshot['controllers'].items():
+            controller.previous_action, controller.time_elapsed_since_last_state_change = previous_action, time_elapsed
+        for sensor, measurement in snapshot['sensors'].items():
+            sensor.current_measurement = measurement
+        self.state.control_actions = snapshot['control_actions']
+        self.state.environmental_data = snapshot['environmental_data']
+
+
+def _affine_trajectory(x0: np.ndarray, a: np.ndarray, b: np.ndarray, n_steps: int) -> np.ndarray:
+    # States x_k of the map x -> a * x + b, for k from -1 to n_steps (rows). The geometric sum is computed with expm1,
+    # which stays accurate when a is close to 1
+    k = np.arange(-1, n_steps + 1)[:, None]
+    log_a = np.log(a)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        geometric_sum = np.where(a == 1, k, np.expm1(k * log_a) / np.expm1(log_a))
+    return x0 * a**k + b * geometric_sum
+
+
+def _trajectory_basis(rates: np.ndarray, n_steps: int) -> np.ndarray:
+    # Basis of the functions of the step k (from 0 to n_steps - 1) that are affine in the trajectories: a constant, and
+    # a^k for each rate a, normalized between 0 and 1 over the window
+    k = np.arange(n_steps)[:, None]
+    log_a = np.log(rates)[None, :]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        span = np.expm1(n_steps * log_a)
+        functions = np.where(np.abs(span) > 1e-12, np.expm1(k * log_a) / span, k / n_steps)
+    return np.hstack([np.ones((n_steps, 1)), functions])
+
+
+def _fill_rows(samples: np.ndarray, rows: np.ndarray, basis: np.ndarray, tolerance: float) -> np.ndarray | None:
+    # Rows of the window (and of the verification step, last sample), from the samples recorded on the given rows.
+    # Constant signals are copied, the others are fitted on the basis by least squares. Returns None if a varying signal
+    # contains NaN, or if the fit misses a sample by more than the tolerance (plus the float32 resolution of the records)
+    samples = samples.astype(float)
+    values, verification = samples[:-1], samples[-1:]
+    if len(rows) == len(basis):
+        return np.vstack([values, verification])
+    constant = np.all((values == values[0]) | (np.isnan(values) & np.isnan(values[0])), axis=0)
+    if np.isnan(values[:, ~constant]).any():
+        return None
+    coefficients = np.linalg.lstsq(basis[rows], values[:, ~constant], rcond=None)[0]
+    residuals = np.abs(basis[rows] @ coefficients - values[:, ~constant])
+    if np.any(residuals > tolerance + 4 * np.spacing(np.abs(values[:, ~constant]).astype(np.float32))):
+        return None
+    block = np.empty((len(basis), samples.shape[1]))
+    block[:, constant] = values[0, constant]
+    block[:, ~constant] = basis @ coefficients
+    return np.vstack([block, verification])
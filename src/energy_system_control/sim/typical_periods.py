@@ -0,0 +1,328 @@
+"""
+Typical-period simulations
+
+This module provides a reduced-order alternative to the simulation of a whole
+year. The input series of the system (the demands, the environmental data and
+the output of the PV panels) are split into periods of equal length (e.g. days
+or weeks), which are clustered with k-medoids. Only the medoid of each cluster
+(the typical period) is simulated, and each typical period is weighted by the
+number of periods it represents. The periods containing the extreme values of
+selected series (e.g. the coldest day) can be kept as clusters of their own, so
+that the sizing conditions are not averaged away.
+
+The typical periods are simulated in chronological order within a single run:
+the state of the storage units at the end of a typical period is the initial
+state of the next one. The results are reconstructed over the whole horizon,
+by repeating each typical period in place of the periods it represents, so that
+the annual KPIs are computed with the usual methods of ``SimulationResults``.
+
+Classes
+-------
+TypicalPeriods
+    Outcome of the clustering of the input series.
+TypicalPeriodSimulator
+    Simulator that only simulates the typical periods of the horizon.
+
+Functions
+---------
+k_medoids
+    k-medoids clustering of a set of feature vectors.
+cluster_periods
+    Selection of the typical periods of a set of series.
+error_report
+    Comparison of KPIs between a typical-period run and a reference run.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Callable, Dict, Literal
+import numpy as np
+import pandas as pd
+from energy_system_control.sim.results import SimulationResults
+from energy_system_control.sim.simulation_data import SimulationData
+from energy_system_control.sim.simulator import Simulator
+
+
+@dataclass
+class TypicalPeriods:
+    """
+    Outcome of the clustering of the input series.
+
+    Attributes
+    ----------
+    steps_per_period : int
+        Number of time steps of each period.
+    medoids : np.ndarray
+        Index of the typical periods, in chronological order.
+    labels : np.ndarray
+        For each period of the horizon, the position in ``medoids`` of the typical period representing it.
+    weights : np.ndarray
+        Number of periods represented by each typical period.
+    """
+    steps_per_period: int
+    medoids: np.ndarray
+    labels: np.ndarray
+    weights: np.ndarray
+
+    @property
+    def simulated_steps(self) -> np.ndarray:
+        """Time steps of the typical periods, in chronological order"""
+        return (self.medoids[:, None] * self.steps_per_period + np.arange(self.steps_per_period)).ravel()
+
+    @property
+    def source_steps(self) -> np.ndarray:
+        """For each time step of the horizon, the simulated time step that represents it"""
+        offsets = np.arange(self.steps_per_period)
+        return (self.medoids[self.labels][:, None] * self.steps_per_period + offsets).ravel()
+
+
+def k_medoids(X: np.ndarray, k: int, rng: np.random.Generator | None = None, n_init: int = 10, max_iter: int = 100):
+    """
+    k-medoids clustering with the alternating algorithm and a k-medoids++ initialization.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        Feature vectors, with shape (number of samples, number of features).
+    k : int
+        Number of clusters.
+    rng : np.random.Generator, optional
+        Random number generator used for the initialization.
+    n_init : int, optional
+        Number of initializations. The clustering with the lowest cost is returned. Defaults to 10.
+    max_iter : int, optional
+        Maximum number of iterations of each initialization. Defaults to 100.
+
+    Returns
+    -------
+    medoids : np.ndarray
+        Index of the sample chosen as medoid of each cluster.
+    labels : np.ndarray
+        Cluster of each sample.
+    """
+    X = np.asarray(X, dtype=float)
+    n = len(X)
+    if not 0 < k <= n:
+        raise ValueError(f"The number of clusters must be between 1 and the number of samples ({n}), got {k}")
+    rng = np.random.default_rng() if rng is None else rng
+    squared_norms = (X**2).sum(axis=1)
+    distances = np.maximum(squared_norms[:, None] + squared_norms[None, :] - 2 * X @ X.T, 0.0)
+    best_cost, best_medoids = np.inf, None
+    for _ in range(n_init):
+        # k-medoids++: each new medoid is drawn with a probability proportional to its distance from the closest one
+        medoids = [rng.integers(n)]
+        for _ in range(1, k):
+            closest = distances[:, medoids].min(axis=1)
+            if closest.sum() == 0:  # Fewer distinct samples than clusters
+                medoids.append(rng.choice(np.setdiff1d(np.arange(n), medoids)))
+            else:
+                medoids.append(rng.choice(n, p=closest / closest.sum()))
+        medoids = np.array(medoids)
+        for _ in range(max_iter):
+            labels = distances[:, medoids].argmin(axis=1)
+            labels[medoids] = np.arange(k)
+            new_medoids = medoids.copy()
+            for cluster in range(k):
+                members = np.flatnonzero(labels == cluster)
+                new_medoids[cluster] = members[distances[np.ix_(members, members)].sum(axis=1).argmin()]
+            if np.array_equal(new_medoids, medoids):
+                break
+            medoids = new_medoids
+        cost = distances[np.arange(n), medoids[labels]].sum()
+        if cost < best_cost:
+            best_cost, best_medoids = cost, medoids
+    labels = distances[:, best_medoids].argmin(axis=1)
+    labels[best_medoids] = np.arange(k)
+    return best_medoids, labels
+
+
+def cluster_periods(series: Dict[str, np.ndarray],
+                    steps_per_period: int,
+                    n_periods: int,
+                    extreme_periods: Dict[str, Literal["max", "min"]] | None = None,
+                    rng: np.random.Generator | None = None) -> TypicalPeriods:
+    """
+    Selects the typical periods of a set of series.
+
+    Each series is normalized between 0 and 1 and split into periods; the periods are then clustered with k-medoids,
+    using the concatenated profiles of all the series as features.
+
+    Parameters
+    ----------
+    series : dict
+        The series to cluster, with the same length, which must be a multiple of ``steps_per_period``.
+    steps_per_period : int
+        Number of time steps of each period.
+    n_periods : int
+        Total number of typical periods, including the extreme periods.
+    extreme_periods : dict, optional
+        Series whose extreme period is kept as a typical period of its own (with weight 1), mapped to the extreme to
+        preserve: "max" keeps the period containing the highest value of the series, "min" the one containing the lowest.
+    rng : np.random.Generator, optional
+        Random number generator used for the initialization of k-medoids.
+
+    Returns
+    -------
+    TypicalPeriods
+    """
+    extreme_periods = extreme_periods or {}
+    lengths = {len(values) for values in series.values()}
+    if len(lengths) != 1:
+        raise ValueError("All the series must have the same length")
+    n_steps = lengths.pop()
+    if n_steps % steps_per_period:
+        raise ValueError(f"The length of the series ({n_steps}) is not a multiple of the length of the periods ({steps_per_period})")
+    total_periods = n_steps // steps_per_period
+    if not 0 < n_periods <= total_periods:
+        raise ValueError(f"The number of typical periods must be between 1 and {total_periods}, got {n_periods}")
+
+    features = []
+    for values in series.values():
+        values = np.asarray(values, dtype=float)
+        span = values.max() - values.min()
+        features.append(((values - values.min()) / span if span > 0 else np.zeros_like(values)).reshape(total_periods, steps_per_period))
+    features = np.hstack(features)
+
+    extremes = []
+    for name, extreme in extreme_periods.items():
+        if name not in series:
+            raise KeyError(f'Series "{name}" not found among the clustered series {list(series)}')
+        if extreme not in ("max", "min"):
+            raise ValueError(f'Invalid extreme "{extreme}" for series "{name}". Valid options are "max" and "min"')
+        values = np.asarray(series[name], dtype=float)
+        period = int((values.argmax() if extreme == "max" else values.argmin()) // steps_per_period)
+        if period not in extremes:
+            extremes.append(period)
+    if len(extremes) > n_periods:
+        raise ValueError(f"The number of typical periods ({n_periods}) is lower than the number of extreme periods ({len(extremes)})")
+
+    # Extreme periods form clusters of their own, the other periods are clustered with k-medoids
+    others = np.setdiff1d(np.arange(total_periods), extremes)
+    labels = np.empty(total_periods, dtype=int)
+    medoids = list(extremes)
+    labels[extremes] = np.arange(len(extremes))
+    if len(others):
+        k = n_periods - len(extremes)
+        if k == 0:
+            raise ValueError("At least one typical period is needed besides the extreme periods")
+        cluster_medoids, cluster_labels = k_medoids(features[others], k, rng=rng)
+        medoids += list(others[cluster_medoids])
+        labels[others] = len(extremes) + cluster_labels
+
+    # Typical periods in chronological order
+    medoids = np.array(medoids)
+    order = np.argsort(medoids)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    labels = rank[labels]
+    return TypicalPeriods(steps_per_period=steps_per_period, medoids=medoids[order], labels=labels,
+                          weights=np.bincount(labels, minlength=len(medoids)))
+
+
+class TypicalPeriodSimulator(Simulator):
+    """
+    Simulator that only simulates the typical periods of the horizon.
+
+    The input series are collected after the initialization of the units: the ``data`` (or ``ts.data``) of the
+    components, e.g. the demands and the PV panels, and the data of the environmental data provider. The series of
+    fleet components are clustered on their total. ``run`` returns the results reconstructed over the whole horizon,
+    while the clustering is available as the ``typical_periods`` attribute.
+
+    Parameters
+    ----------
+    env : Environment
+        The system to simulate.
+    cfg : SimulationConfig
+        The configuration of the simulation. The horizon must be a multiple of ``period_h``.
+    n_periods : int, optional
+        Number of typical periods, including the extreme periods. Defaults to 12.
+    period_h : float, optional
+        Length of the periods [h]. Defaults to 24 (typical days); use 168 for typical weeks.
+    extreme_periods : dict, optional
+        Series whose extreme period is preserved, mapped to "max" or "min" (see ``cluster_periods``). The series are
+        named after the component (e.g. "dhw") or the environmental variable (e.g. "temperature_ambient").
+    seed : int, optional
+        Seed of the initialization of k-medoids. Defaults to 0.
+
+    Examples
+    --------
+    >>> simulator = TypicalPeriodSimulator(env, cfg, n_periods=12, extreme_periods={"temperature_ambient": "min", "dhw": "max"})
+    >>> results = simulator.run()
+    >>> results.get_cumulated_electricity("hp_electricity_input_port")  # Annual consumption, reconstructed
+    """
+
+    def __init__(self, env, cfg, n_periods: int = 12, period_h: float = 24.0,
+                 extreme_periods: Dict[str, Literal["max", "min"]] | None = None, seed: int = 0):
+        super().__init__(env, cfg)
+        self.n_periods = n_periods
+        self.period_h = period_h
+        self.extreme_periods = extreme_periods or {}
+        self.seed = seed
+        self.typical_periods: TypicalPeriods | None = None
+
+    def run(self) -> SimulationResults:
+        steps_per_period = self.period_h / self.cfg.time_step_h
+        n_steps = self.cfg.simulation_end_h / self.cfg.time_step_h
+        if not float(steps_per_period).is_integer() or not float(n_steps / steps_per_period).is_integer():
+            raise ValueError(f"The simulation horizon ({self.cfg.simulation_end_h} h) must be a multiple of the length of the periods ({self.period_h} h), "
+                             f"itself a multiple of the time step ({self.cfg.time_step_h} h)")
+        sim_data = self._prepare_run()
+        self.typical_periods = cluster_periods(self.input_series(), int(steps_per_period), self.n_periods,
+                                               self.extreme_periods, rng=np.random.default_rng(self.seed))
+        # The typical periods are chained: the state of the units is carried over from one period to the next
+        for time_id in self.typical_periods.simulated_steps:
+            self.state.time_id = int(time_id)
+            self.state.time = self.state.time_vector[time_id]
+            self._step(sim_data)
+        return self._create_results(self._reconstruct(sim_data))
+
+    def input_series(self) -> Dict[str, np.ndarray]:
+        """Returns the input series of the system over the simulation horizon, keyed by component or variable name"""
+        n_steps = len(self.state.time_vector)
+        series = {}
+        for name, data in self._input_series().items():
+            if len(data) < n_steps or np.asarray(data[:1]).dtype.kind not in "fiu":
+                continue
+            values = np.asarray(data[:n_steps], dtype=float)
+            series[name] = values.reshape(n_steps, -1).sum(axis=1) if values.ndim > 1 else values
+        if not series:
+            raise ValueError("No input series found to select the typical periods")
+        return series
+
+    def _reconstruct(self, sim_data: SimulationData) -> SimulationData:
+        # Each period of the horizon is filled with the typical period representing it. The reconstructed data are
+        # created from the registries of the environment, so that each signal keeps its storage policy
+        source_steps = self.typical_periods.source_steps
+        registries = {"ports": self.env.signal_registry_ports, "controllers": self.env.signal_registry_controllers, "sensors": self.env.signal_registry_sensors}
+        reconstructed = SimulationData()
+        reconstructed.create_empty_datasets(self.state.time_vector, *registries.values())
+        for category, registry in registries.items():
+            reconstructed.record_rows(category, 0, sim_data.get_signals(category, np.arange(len(registry._col_to_key)))[source_steps])
+        return reconstructed
+
+
+def error_report(reference: SimulationResults, typical: SimulationResults, kpis: Dict[str, Callable[[SimulationResults], float]]) -> pd.DataFrame:
+    """
+    Compares the KPIs of a typical-period run with the ones of a reference run (e.g. a full-year simulation).
+
+    Parameters
+    ----------
+    reference : SimulationResults
+        Results of the reference run.
+    typical : SimulationResults
+        Results of the typical-period run, as returned by ``TypicalPeriodSimulator.run``.
+    kpis : dict
+        KPIs to compare: callables that take ``SimulationResults`` and return a scalar.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per KPI, with the columns "reference", "typical", "error" (typical - reference) and "relative_error".
+    """
+    rows = {}
+    for name, kpi in kpis.items():
+        reference_value, typical_value = float(kpi(reference)), float(kpi(typical))
+        error = typical_value - reference_value
+        rows[name] = {"reference": reference_value, "typical": typical_value, "error": error,
+                      "relative_error": error / abs(reference_value) if reference_value != 0 else np.nan}
+    return pd.DataFrame.from_dict(rows, orient="index", columns=["reference", "typical", "error", "relative_error"])
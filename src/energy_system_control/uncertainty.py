@@ -11,11 +11,48 @@ class UncertaintyModel(ABC):
     def apply(self, value: float, *, rng: np.random.Generator) -> float:
         raise NotImplementedError
 
+    def sample(self, shape: int | tuple, *, rng: np.random.Generator) -> np.ndarray:
+        """
+        Generates a full trajectory of the noise in one call, e.g. for all the time steps of a run (first axis of
+        ``shape``) and, optionally, for several independent series (other axes). The values drawn are the same as
+        those of repeated calls to ``apply`` with the same generator.
+
+        Optional: the built-in models implement it to vectorize ``apply_array``. Models that only implement ``apply``
+        are applied value by value.
+        """
+        raise NotImplementedError
+
+    def reset(self):
+        """Resets the internal state of the model (if any) at the beginning of a run"""
+        pass
+
+    def apply_array(self, values: np.ndarray, *, rng: np.random.Generator) -> np.ndarray:
+        """
+        Applies the noise to an array of values (time along the first axis), with the same draws as repeated calls to
+        ``apply``: the noise trajectory is generated with ``sample`` if the model implements it, otherwise ``apply`` is
+        called on each value in turn
+        """
+        values = np.asarray(values, dtype=float)
+        if type(self).sample is UncertaintyModel.sample:
+            return np.array([self.apply(value, rng=rng) for value in values.ravel().tolist()], dtype=float).reshape(values.shape)
+        eps = self.sample(values.shape, rng=rng)
+        out = values + eps if getattr(self, "mode", "additive") == "additive" else values * (1.0 + eps)
+        clip_min, clip_max = getattr(self, "clip_min", None), getattr(self, "clip_max", None)
+        if clip_min is not None or clip_max is not None:
+            np.clip(out, clip_min, clip_max, out=out)
+        return out
+
 @dataclass(frozen=True, slots=True)
 class NoUncertainty(UncertaintyModel):
     def apply(self, value: float, *, rng: np.random.Generator) -> float:
         return value
 
+    def sample(self, shape: int | tuple, *, rng: np.random.Generator) -> np.ndarray:
+        return np.zeros(shape)
+
+    def apply_array(self, values: np.ndarray, *, rng: np.random.Generator) -> np.ndarray:
+        return values
+
 
 @dataclass(frozen=True, slots=True)
 class GaussianUncertainty(UncertaintyModel):
@@ -26,7 +63,7 @@ class GaussianUncertainty(UncertaintyModel):
 
     def apply(self, value: float, *, rng: np.random.Generator) -> float:
         eps = rng.normal(0.0, self.sigma)
-        out = value * (1.0 + eps)
+        out = value + eps if self.mode == "additive" else value * (1.0 + eps)
 
         if self.clip_min is not None:
             out = max(self.clip_min, out)
@@ -34,6 +71,9 @@ class GaussianUncertainty(UncertaintyModel):
             out = min(self.clip_max, out)
         return out
 
+    def sample(self, shape: int | tuple, *, rng: np.random.Generator) -> np.ndarray:
+        return rng.normal(0.0, self.sigma, shape)
+
 
 @dataclass(frozen=True, slots=True)
 class UniformUncertainty(UncertaintyModel):
@@ -50,6 +90,9 @@ class UniformUncertainty(UncertaintyModel):
         if self.clip_max is not None:
             out = min(self.clip_max, out)
         return out
+
+    def sample(self, shape: int | tuple, *, rng: np.random.Generator) -> np.ndarray:
+        return rng.uniform(-self.half_width, self.half_width, shape)
     
 @dataclass(slots=True)
 class AR1GaussianUncertainty(UncertaintyModel):
@@ -70,4 +113,19 @@ class AR1GaussianUncertainty(UncertaintyModel):
         out = value + eps if self.mode == "additive" else value * (1.0 + eps)
         if self.clip_min is not None: out = max(self.clip_min, out)
         if self.clip_max is not None: out = min(self.clip_max, out)
-        return out
\ No newline at end of file
+        return out
+
+    def reset(self):
+        self._eps_prev = 0.0
+
+    def sample(self, shape: int | tuple, *, rng: np.random.Generator) -> np.ndarray:
+        # The recursion eps[t] = rho * eps[t-1] + w[t] is a first-order IIR filter of the white noise w, so the whole
+        # trajectory is obtained with a single call to lfilter, starting from the last value of the previous trajectory
+        from scipy.signal import lfilter  # scipy.signal is slow to import, and only needed here
+        w = rng.normal(0.0, self.sigma, shape)
+        if w.ndim == 0 or w.shape[0] == 0:
+            return w
+        zi = np.full((1,) + w.shape[1:], self.rho * np.asarray(self._eps_prev))
+        eps, _ = lfilter([1.0], [1.0, -self.rho], w, axis=0, zi=zi)
+        self._eps_prev = eps[-1] if eps.ndim == 1 else eps[-1].copy()
+        return eps
@@ -0,0 +1,87 @@
+"""
+Tests for CustomEnvironmentalProvider and the bulk resampling of weather data.
+"""
+import pytest
+import pandas as pd
+import numpy as np
+
+from energy_system_control.helpers import resample_with_interpolation, resample_columns
+from energy_system_control.io.data_provider import CustomEnvironmentalProvider, read_environmental_data
+from energy_system_control.io.resample_cache import ResampleCache, cached_resample_columns
+from energy_system_control.sim.config import SimulationConfig
+
+
+@pytest.fixture
+def weather():
+    index = pd.date_range("2025-01-01", periods=72, freq="h", name="datetime")
+    hours = np.arange(72)
+    return pd.DataFrame({
+        "temperature_ambient": 10 + 5 * np.sin(hours * 2 * np.pi / 24),
+        "direct_irradiation": np.maximum(0, 600 * np.sin((hours - 6) * 2 * np.pi / 24)),
+        "diffuse_irradiation": np.maximum(0, 150 * np.sin((hours - 6) * 2 * np.pi / 24)),
+    }, index=index)
+
+
+@pytest.fixture
+def csv_file(weather, tmp_path):
+    path = tmp_path / "weather.csv"
+    weather.to_csv(path)
+    return path
+
+
+VAR_TYPES = {"direct_irradiation": "extensive", "diffuse_irradiation": "extensive"}
+
+
+@pytest.mark.parametrize("simulation_end_h", [24, 30, 24 * 7])
+@pytest.mark.parametrize("target_freq", ["900s", "7200s"])
+def test_resample_columns_matches_single_columns(weather, simulation_end_h, target_freq):
+    kwargs = dict(target_freq=target_freq, simulation_end_s=simulation_end_h * 3600.0,
+                  simulation_start_datetime=pd.Timestamp("2025-01-02 03:00"))
+    output = resample_columns(weather, var_types=VAR_TYPES, **kwargs)
+    assert list(output) == list(weather.columns)
+    for column in weather.columns:
+        expected = resample_with_interpolation(weather[[column]], var_type=VAR_TYPES.get(column, "intensive"), **kwargs)
+        assert np.allclose(output[column], expected)
+
+
+def test_resample_columns_periodic(weather):
+    output = resample_columns(weather, "900s", simulation_end_s=24 * 30 * 3600.0, var_types=VAR_TYPES, periodic=True)
+    dense = resample_columns(weather, "900s", simulation_end_s=24 * 30 * 3600.0, var_types=VAR_TYPES)
+    for column in weather.columns:
+        assert len(output[column].period) == 72 * 4
+        assert np.allclose(np.asarray(output[column]), dense[column])
+
+
+def test_cached_resample_columns(weather):
+    cache = ResampleCache()
+    first = cached_resample_columns(weather, cache=cache, target_freq="900s", simulation_end_s=48 * 3600.0, var_types=VAR_TYPES)
+    second = cached_resample_columns(weather, cache=cache, target_freq="900s", simulation_end_s=48 * 3600.0, var_types=VAR_TYPES)
+    assert cache.hits == 3
+    assert all(second[column] is first[column] for column in weather.columns)
+
+
+def test_read_environmental_data(csv_file, weather):
+    df = read_environmental_data(str(csv_file), engine="pandas")
+    assert isinstance(df.index, pd.DatetimeIndex)
+    pd.testing.assert_frame_equal(df, weather, check_freq=False)
+
+
+def test_read_parquet(weather, tmp_path):
+    pytest.importorskip("pyarrow")
+    weather.to_parquet(tmp_path / "weather.parquet")
+    df = read_environmental_data(str(tmp_path / "weather.parquet"))
+    pd.testing.assert_frame_equal(df, weather, check_freq=False)
+
+
+def test_provider_initialization(csv_file, weather):
+    provider = CustomEnvironmentalProvider(data_path=str(csv_file.parent), filename=csv_file.name,
+                                           column_names={"T_amb": "temperature_ambient"}, var_types=VAR_TYPES)
+    cfg = SimulationConfig(simulation_end_h=48, time_step_h=0.25, simulation_start_datetime=pd.Timestamp("2025-01-01"))
+    provider.initialize(cfg=cfg)
+    assert set(provider.data) == {"T_amb", "direct_irradiation", "diffuse_irradiation"}
+    # Extensive variables are split between the time steps when upsampling
+    expected = resample_with_interpolation(weather[["direct_irradiation"]], "900s", 48 * 3600.0, "extensive")
+    assert np.allclose(provider.data["direct_irradiation"], expected)
+    data = provider.get_environmental_data(4, pd.Timestamp("2025-01-01 01:00"))
+    assert data.temperature_cold_water is None
+    assert data.diffuse_irradiation == pytest.approx(provider.data["diffuse_irradiation"][4])
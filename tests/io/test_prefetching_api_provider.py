@@ -0,0 +1,110 @@
+"""
+Tests for the prefetching weather API provider, the pooled session and the response cache, against a local stub of
+the Open-Meteo API.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import pandas as pd
+import pytest
+
+from energy_system_control.io.data_provider import PrefetchingAPIEnvironmentalProvider
+from energy_system_control.io.weather_api import OpenMeteoAPI, ResponseCache, make_session
+from energy_system_control.sim.config import SimulationConfig
+
+
+class StubOpenMeteoHandler(BaseHTTPRequestHandler):
+    """Returns hourly data whose temperature [°C] is the hour of the day"""
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        self.server.requests.append(query)
+        if "start_hour" in query:
+            times = pd.date_range(query["start_hour"][0], query["end_hour"][0], freq="h")
+        else:
+            times = pd.date_range("2025-06-01", periods=int(query["forecast_hours"][0]), freq="h")
+        body = {"hourly": {
+            "time": [f"{t:%Y-%m-%dT%H:%M}" for t in times],
+            "temperature_2m": [float(t.hour) for t in times],
+            "direct_radiation": [100.0 * t.day for t in times],
+            "diffuse_radiation": [10.0] * len(times),
+            "global_tilted_irradiance": [110.0] * len(times),
+        }}
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOpenMeteoHandler)
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def api(stub_server):
+    api = OpenMeteoAPI(latitude=45.5, longitude=9.2, session=make_session(), timeout=5)
+    api.base_url = f"http://127.0.0.1:{stub_server.server_address[1]}/v1/"
+    return api
+
+
+def test_weather_window(api, stub_server):
+    window = api.get_weather_window(pd.Timestamp("2025-06-01 10:30"), pd.Timestamp("2025-06-01 20:00"))
+    assert window.index[0] == pd.Timestamp("2025-06-01 10:00")
+    assert len(window) == 11
+    assert window["temperature"].iloc[2] == pytest.approx(12 + 273.15)
+    assert stub_server.requests[0]["start_hour"] == ["2025-06-01T10:00"]
+
+
+def test_response_cache_ttl(api, stub_server, tmp_path):
+    api.cache = ResponseCache(ttl_s=60, cache_dir=str(tmp_path))
+    first = api.get_weather_forecast(forecast_h=24)
+    assert api.get_weather_forecast(forecast_h=24) == first
+    assert len(stub_server.requests) == 1
+    # Another client finds the response on disk
+    other = OpenMeteoAPI(latitude=45.5, longitude=9.2, cache=ResponseCache(ttl_s=60, cache_dir=str(tmp_path)))
+    other.base_url = api.base_url
+    assert other.get_weather_forecast(forecast_h=24) == first
+    assert len(stub_server.requests) == 1
+    # Expired entries are requested again
+    api.cache.ttl_s = 0.0
+    api.get_weather_forecast(forecast_h=24)
+    assert len(stub_server.requests) == 2
+
+
+def test_prefetching_provider(api, stub_server):
+    cfg = SimulationConfig(simulation_end_h=72, time_step_h=0.25, simulation_start_datetime=pd.Timestamp("2025-06-01 06:00"),
+                           prediction_horizon_margin_h=6)
+    provider = PrefetchingAPIEnvironmentalProvider(api, window_h=12)
+    provider.initialize(cfg=cfg)
+    try:
+        for time_id in range(int(72 / 0.25)):
+            current_time = cfg.simulation_start_datetime + pd.Timedelta(hours=time_id * 0.25)
+            data = provider.get_environmental_data(time_id, current_time)
+            assert data.temperature_ambient == pytest.approx(current_time.hour + 273.15)
+            assert data.direct_irradiation == pytest.approx(100.0 * current_time.day)
+            assert len(provider.data) <= 12 + 6 + 1
+            if provider._pending is not None:
+                provider._pending.result()  # A simulation step slower than the request: the prefetch keeps up
+    finally:
+        provider.close()
+    # One request per window of 12 hours, plus the prefetch of the window after the end of the simulation
+    assert len(stub_server.requests) in (6, 7)
+    assert provider.n_blocking_fetches == 0
+
+
+def test_prefetch_horizon_longer_than_window(api):
+    with pytest.raises(ValueError):
+        PrefetchingAPIEnvironmentalProvider(api, window_h=12).initialize(cfg=SimulationConfig())
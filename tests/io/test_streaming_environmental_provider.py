@@ -0,0 +1,82 @@
+"""
+Tests for StreamingEnvironmentalProvider: the data resampled in blocks must match the one resampled at once.
+"""
+import pytest
+import pandas as pd
+import numpy as np
+
+from energy_system_control.helpers import resample_columns
+from energy_system_control.io.data_provider import StreamingEnvironmentalProvider
+from energy_system_control.sim.config import SimulationConfig
+
+
+VAR_TYPES = {"direct_irradiation": "extensive", "diffuse_irradiation": "extensive"}
+
+
+@pytest.fixture
+def weather():
+    index = pd.date_range("2025-01-01", periods=24 * 20, freq="h", name="datetime")
+    hours = np.arange(len(index))
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "temperature_ambient": 10 + 5 * np.sin(hours * 2 * np.pi / 24) + rng.normal(size=len(index)),
+        "direct_irradiation": np.maximum(0, 600 * np.sin((hours - 6) * 2 * np.pi / 24)),
+        "diffuse_irradiation": np.maximum(0, 150 * np.sin((hours - 6) * 2 * np.pi / 24)),
+    }, index=index)
+
+
+@pytest.mark.parametrize("time_step_h", [0.25, 2.0])
+def test_blocks_match_dense_resampling(weather, time_step_h):
+    cfg = SimulationConfig(simulation_end_h=24 * 15, time_step_h=time_step_h, simulation_start_datetime=pd.Timestamp("2025-01-02"),
+                           prediction_horizon_margin_h=12)
+    provider = StreamingEnvironmentalProvider(df=weather, var_types=VAR_TYPES, block_h=24, chunk_rows=13)
+    provider.initialize(cfg=cfg)
+    expected = resample_columns(weather, f"{int(time_step_h * 3600)}s", simulation_end_s=24 * 15 * 3600.0, var_types=VAR_TYPES,
+                                simulation_start_datetime=cfg.simulation_start_datetime)
+    n_steps = int(24 * 15 / time_step_h)
+    values = np.array([provider.get_environmental_data(i, None).diffuse_irradiation for i in range(n_steps)])
+    assert np.allclose(values, expected["diffuse_irradiation"][:n_steps])
+    assert np.allclose(provider.get_values("temperature_ambient", n_steps - 5, 5), expected["temperature_ambient"][n_steps - 5:n_steps])
+
+
+def test_memory_is_bounded(weather):
+    cfg = SimulationConfig(simulation_end_h=24 * 19, time_step_h=0.25, simulation_start_datetime=pd.Timestamp("2025-01-01"),
+                           prediction_horizon_margin_h=30)
+    provider = StreamingEnvironmentalProvider(df=weather, var_types=VAR_TYPES, block_h=24, chunk_rows=24)
+    provider.initialize(cfg=cfg)
+    for time_id in range(0, 24 * 19 * 4, 7):
+        provider.get_environmental_data(time_id, None)
+        # The current block and the ones covering the prefetch window
+        assert len(provider._blocks) <= 3
+        assert len(provider._buffer) <= 2 * 24
+    with pytest.raises(IndexError):
+        provider.get_environmental_data(0, None)
+
+
+def test_csv_source_and_prefetch_window(weather, tmp_path):
+    weather.rename(columns={"temperature_ambient": "T_amb"}).to_csv(tmp_path / "weather.csv")
+    cfg = SimulationConfig(simulation_end_h=48, time_step_h=0.5, simulation_start_datetime=pd.Timestamp("2025-01-03 06:00"))
+    provider = StreamingEnvironmentalProvider(data_path=str(tmp_path), filename="weather.csv", column_names={"temperature_ambient": "T_amb"},
+                                              var_types=VAR_TYPES, block_h=6, chunk_rows=50)
+    provider.initialize(cfg=cfg)
+    assert provider.prefetch_steps == 50  # 25 hours of prediction horizon margin
+    data = provider.get_environmental_data(0, None)
+    assert data.temperature_ambient == pytest.approx(weather["temperature_ambient"].iloc[54] + 273.15, rel=1e-6)
+    forecast = provider.get_values("temperature_ambient", 0, provider.prefetch_steps)
+    assert len(forecast) == 50
+    assert forecast[2] == pytest.approx(weather["temperature_ambient"].iloc[55])
+
+
+def test_end_of_data(weather):
+    cfg = SimulationConfig(simulation_end_h=24 * 30, time_step_h=1.0, simulation_start_datetime=pd.Timestamp("2025-01-19"))
+    provider = StreamingEnvironmentalProvider(df=weather, block_h=24)
+    provider.initialize(cfg=cfg)
+    assert provider.get_environmental_data(47, None).temperature_ambient is not None
+    with pytest.raises(IndexError):
+        provider.get_environmental_data(49, None)
+
+
+def test_simulation_start_not_covered(weather):
+    cfg = SimulationConfig(simulation_start_datetime=pd.Timestamp("2026-01-01"))
+    with pytest.raises(ValueError):
+        StreamingEnvironmentalProvider(df=weather).initialize(cfg=cfg)
@@ -0,0 +1,71 @@
+import pytest
+import numpy as np
+import pandas as pd
+import energy_system_control as esc
+
+VOLUMES = [150, 200, 300]
+HEAT_PUMP_SIZES = [0.8, 1.0, 1.5]
+
+
+@pytest.fixture
+def demand_profiles():
+    index = pd.date_range("2023-01-01", periods=24, freq="h")
+    hours = np.arange(24)
+    return pd.DataFrame({f"unit_{i}": (0.2 + 0.1 * i) * (1 + np.sin((hours - 7 + i) * 2 * np.pi / 24)) for i in range(len(VOLUMES))}, index=index)
+
+
+def _connections(tank, heat_pump, demand):
+    return [(f'{demand}_fluid_port', f'{tank}_hot_water_output_port'), (f'{heat_pump}_heat_output_port', f'{tank}_main_heat_input_port'),
+            (f'{heat_pump}_electricity_input_port', 'grid_electricity_port'), (f'{tank}_cold_water_input_port', 'water_fluid_port')]
+
+
+def _run(env):
+    results = esc.Simulator(env, esc.SimulationConfig(simulation_end_h=48, time_step_h=0.25)).run()
+    return results.get_cumulated_electricity('hp_electricity_input_port')
+
+
+def test_fleet_matches_single_units(demand_profiles):
+    model = esc.HeatPumpLorentzEfficiency(name='model', Qdot_design=1.5, COP_design=3.2)
+    n_units = len(VOLUMES)
+    fleet = esc.Environment(
+        components=[esc.HotWaterDemandFleet.from_dataframe('dhw', demand_profiles, time_alignment='daily'),
+                    esc.HotWaterStorageFleet('tank', n_units=n_units, tank_volume=VOLUMES, T_0=50),
+                    esc.HeatPumpFleet('hp', model, n_units=n_units, size_factors=HEAT_PUMP_SIZES),
+                    esc.ElectricityGrid('grid'), esc.ColdWaterGrid('water', 'fluid')],
+        sensors=[esc.TankTemperatureSensor('T', 'tank')],
+        controllers=[esc.HeaterFleetControllerWithBandwidth('c', 'hp', 'T', 45, 5)],
+        connections=_connections('tank', 'hp', 'dhw'))
+    fleet_consumption = _run(fleet)
+    temperatures = fleet.components['tank'].temperature
+    assert temperatures.shape == (n_units,)
+    assert fleet.sensors['T'].get_measurement().shape == (n_units,)  # Per-unit measurements
+    # Same system, simulated unit by unit
+    single_consumption = 0.0
+    for i in range(n_units):
+        single = esc.Environment(
+            components=[esc.HotWaterDemand.from_dataframe('dhw', demand_profiles, time_alignment='daily', column_name=f'unit_{i}'),
+                        esc.HotWaterStorage('tank', tank_volume=VOLUMES[i], T_0=50),
+                        esc.HeatPumpLorentzEfficiency(name='hp', Qdot_design=1.5 * HEAT_PUMP_SIZES[i], COP_design=3.2),
+                        esc.ElectricityGrid('grid'), esc.ColdWaterGrid('water', 'fluid')],
+            sensors=[esc.TankTemperatureSensor('T', 'tank')],
+            controllers=[esc.HeaterControllerWithBandwidth('c', 'hp', 'T', 45, 5)],
+            connections=_connections('tank', 'hp', 'dhw'))
+        single_consumption += _run(single)
+        assert np.isclose(single.components['tank'].temperature, temperatures[i])
+    assert np.isclose(fleet_consumption, single_consumption)
+
+
+def test_battery_pack_fleet():
+    from energy_system_control.sim.state import SimulationState
+    fleet = esc.BatteryPackFleet('batteries', n_units=4, capacity=[5, 5, 10, 10], SOC_0=[0.2, 0.4, 0.6, 0.8])
+    fleet.create_ports()
+    state = SimulationState(time=0.0, time_step=3600)
+    fleet.initialize(None)
+    # Connected to a single component: the total power is split evenly among the packs
+    fleet.ports[fleet.port_name].flows['electricity'] = 4.0
+    fleet.step(state, None)
+    assert np.allclose(fleet.SOC, [0.4, 0.6, 0.7, 0.9])
+    fleet.ports[fleet.port_name].flows['electricity'] = 8.0
+    with pytest.raises(ValueError):
+        fleet.step(state, None)
+        fleet.step(state, None)
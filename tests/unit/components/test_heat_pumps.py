@@ -72,6 +72,47 @@ def test_system_with_lorentz_heat_pump_from_COP(base_environment_info):
     assert math.isclose(results.get_cumulated_electricity('heat_pump_electricity_input_port'), 12.2, abs_tol = 0.1)
 
 
+def test_performance_map_heat_pump():
+    import numpy as np
+    model = esc.HeatPumpLorentzEfficiency(name = 'model', Qdot_design = 1.5, COP_design = 3.2, heat_capacity_loss = 0.01)
+    hp = esc.HeatPumpPerformanceMap.from_model('heat_pump', model)
+    assert math.isclose(hp.COP_design, model.COP_design, rel_tol = 1e-9)
+    # Exact on the grid, close to the model between the points of the grid
+    assert math.isclose(hp.interpolate(C2K(2), C2K(46))[1], model._get_efficiency(C2K(2), C2K(46)), rel_tol = 1e-9)
+    assert math.isclose(hp.interpolate(C2K(2.5), C2K(46.3))[1], model._get_efficiency(C2K(2.5), C2K(46.3)), rel_tol = 1e-3)
+    assert math.isclose(hp.interpolate(C2K(2.5), C2K(46.3))[0], model._get_heat_output(C2K(2.5), C2K(46.3)), rel_tol = 1e-9)
+    # Batched queries give the same values as the scalar ones
+    T_air, T_water = C2K(np.linspace(-25, 45, 50)), C2K(np.linspace(5, 85, 50))
+    heat_output, COP = hp.get_performance(T_air, T_water)
+    assert np.allclose(np.array([hp.interpolate(a, w) for a, w in zip(T_air, T_water)]).T, [heat_output, COP])
+    # Outside of the grid, the values at the boundary are used
+    assert math.isclose(hp.interpolate(C2K(-30), C2K(90))[1], hp.interpolate(C2K(-20), C2K(80))[1])
+
+
+def test_performance_map_heat_pump_from_manufacturer_data():
+    hp = esc.HeatPumpPerformanceMap('heat_pump', T_air = [-7, 2, 7], T_water = [35, 55], COP = [[2.5, 1.8], [3.4, 2.4], [4.2, 2.9]], Qdot = 1.3, T_air_design = 7, T_water_design = 45)
+    assert math.isclose(hp.COP_design, (4.2 + 2.9) / 2)
+    assert hp.Qdot_design == 1.3
+    with pytest.raises(ValueError):
+        esc.HeatPumpPerformanceMap('heat_pump', T_air = [-7, 2, 7], T_water = [35, 55], COP = [[2.5, 1.8], [3.4, 2.4]], Qdot = 1.3)
+
+
+def test_system_with_performance_map_heat_pump(base_environment_info):
+    model = esc.HeatPumpLorentzEfficiency(name = 'heat_pump', Qdot_design = 1.5, COP_design = 3.2)
+    base_environment_info['components'].append(esc.HeatPumpPerformanceMap.from_model('heat_pump', model))
+    base_environment_info['connections'] +=[
+        ('hot_water_storage_main_heat_input_port', 'heat_pump_heat_output_port'),
+        ('heat_pump_electricity_input_port', 'electric_grid_electricity_port')]
+    env = esc.Environment(
+        components = base_environment_info["components"], 
+        controllers = base_environment_info["controllers"], 
+        sensors = base_environment_info["sensors"], 
+        connections = base_environment_info["connections"])
+    sim_config = esc.SimulationConfig(time_start_h = 0.0, simulation_end_h = 24.0*7, time_step_h = 0.1)
+    results = esc.Simulator(env, sim_config).run()
+    # Same result as the Lorentz model the map was built from
+    assert math.isclose(results.get_cumulated_electricity('heat_pump_electricity_input_port'), 12.2, abs_tol = 0.1)
+
 
 @pytest.fixture
 def base_environment_info():
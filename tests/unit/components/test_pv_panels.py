@@ -98,4 +98,48 @@ def test_pv_panel_load_data_from_csv_pvgis_file():
     time_step = 900
     # Resampling the data to the required time step
     test_pv.resample_data(time_step_h = time_step/3600, sim_end_h = 24)
-    test_pv.create_ports()
\ No newline at end of file
+    test_pv.create_ports()
+
+def test_pv_panel_from_irradiation_precomputed_output():
+    from types import SimpleNamespace
+    from energy_system_control.components.explicit_components.pv_panels import PVpanelFromIrradiation
+    from energy_system_control.controllers.predictors import PerfectTimeSeriesPredictor
+    from energy_system_control.core.base_classes import EnvironmentalData, InitContext
+    from energy_system_control.helpers import calculate_solar_angles
+    from energy_system_control.sim.config import SimulationConfig
+    cfg = SimulationConfig(simulation_end_h=24, time_step_h=0.5, simulation_start_datetime=pd.Timestamp('2025-06-01'), prediction_horizon_margin_h=6)
+    state = SimulationState()
+    state.initialize(cfg)
+    hours = np.arange(len(state.time_vector_for_prediction)) * 0.5
+    provider = SimpleNamespace(data={'direct_irradiation': np.maximum(0, 700 * np.sin((hours - 6) * np.pi / 12)),
+                                     'diffuse_irradiation': np.maximum(0, 120 * np.sin((hours - 6) * np.pi / 12))})
+    environment = SimpleNamespace(environmental_data_provider=provider, latitude=45.5, longitude=9.2, components={})
+    pv = PVpanelFromIrradiation(name='pv', tilt=30, azimuth=10, installed_power=3.0)
+    pv.create_ports()
+    pv.initialize(InitContext(environment=environment, state=state))
+    assert len(pv.ts.data) == len(state.time_vector_for_prediction)
+
+    # The precomputed output matches the step-by-step calculation
+    for time_id in [10, 25, 30]:
+        state.time_id = time_id
+        zenith, azimuth = calculate_solar_angles(45.5, 9.2, cfg.simulation_start_datetime + pd.to_timedelta(time_id * 1800, unit='s'))
+        state.environmental_data = EnvironmentalData(direct_irradiation=provider.data['direct_irradiation'][time_id],
+                                                     diffuse_irradiation=provider.data['diffuse_irradiation'][time_id],
+                                                     solar_zenith=zenith.iloc[0], solar_azimuth=azimuth.iloc[0])
+        pv.step(state)
+        precomputed = pv.ports[pv.port_name].flows['electricity']
+        pv.ts = None
+        pv.step(state)
+        assert isclose(precomputed, pv.ports[pv.port_name].flows['electricity'], rel_tol=1e-9)
+        pv.initialize(InitContext(environment=environment, state=state))
+
+    # The output is available to the predictors
+    environment.components['pv'] = pv
+    predictor = PerfectTimeSeriesPredictor(name='pv_forecast', read_component='pv')
+    predictor.initialize(InitContext(environment=environment, state=state))
+    state.time_id, state.time = 20, 20 * 1800.0
+    assert np.allclose(predictor.predict(horizon=2, state=state), pv.ts.data[20:24])
+
+    # Locations on the equator or on the prime meridian have the output precomputed as well
+    pv.initialize(InitContext(environment=SimpleNamespace(environmental_data_provider=provider, latitude=0.0, longitude=0.0, components={}), state=state))
+    assert pv.ts is not None
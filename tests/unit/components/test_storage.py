@@ -63,6 +63,227 @@ def test_multinode_water_tank_base_system(base_test_env_TES):
     assert True
     
 
+def _initialized_tank(**kwargs):
+    from energy_system_control import MultiNodeHotWaterTank
+    from energy_system_control.sim.state import SimulationState
+    tank = MultiNodeHotWaterTank(name = 'test_tank', tank_volume = 200, tank_height = 1.2, height_main_heat_input = 0.2, **kwargs)
+    tank.create_ports()
+    tank.initialize(InitContext(environment = None, state = SimulationState(time = 0.0, time_step = 900)))
+    tank.ports[tank.cold_water_input_port_name].T = 288.15
+    tank.ports[tank.aux_heat_input_port_name].flows['heat'] = 0.0
+    return tank
+
+
+def _set_tank_inputs(tank, water_demand, heat_input):
+    tank.ports[tank.hot_water_output_port_name].flows['mass'] = -water_demand
+    tank.ports[tank.main_heat_input_port_name].flows['heat'] = heat_input
+
+
+def test_solve_tridiagonal():
+    from scipy.linalg import solve_banded
+    from energy_system_control.helpers import solve_tridiagonal
+    rng = np.random.default_rng(0)
+    ab = rng.normal(size = (20, 3, 8))
+    ab[:, 1, :] += 6.0  # Diagonally dominant, as the matrices of the tanks
+    d = rng.normal(size = (20, 8))
+    expected = np.array([solve_banded((1, 1), ab[i], d[i]) for i in range(20)])
+    assert np.allclose(solve_tridiagonal(ab[3], d[3]), expected[3])
+    assert np.allclose(solve_tridiagonal(ab, d), expected)
+    solve_tridiagonal(ab, d, out = d, work = np.empty_like(d))  # In place
+    assert np.allclose(d, expected)
+
+
+def test_multinode_water_tank_step_matches_banded_solver():
+    from scipy.linalg import solve_banded
+    from energy_system_control.sim.state import SimulationState
+    tank = _initialized_tank()
+    state = SimulationState(time = 0.0, time_step = 900)
+    for water_demand, heat_input in [(0.0, 2.0), (0.01, 2.0), (0.01, 0.0), (0.0, 0.0)]:
+        _set_tank_inputs(tank, water_demand, heat_input)
+        T_old = tank.T_layer.copy()
+        tank.step(state, None)
+        C = tank._create_C_vector(state, tank._inlet_water_flow)
+        assert np.allclose(tank.T_layer, solve_banded((1, 1), tank.matrix_A, -(tank.matrix_B * T_old + C)))
+
+
+def test_multinode_water_tank_step_batch():
+    from energy_system_control import MultiNodeHotWaterTank
+    from energy_system_control.sim.state import SimulationState
+    state = SimulationState(time = 0.0, time_step = 900)
+    tanks = [_initialized_tank(T_0 = 40 + 5 * i) for i in range(4)] + [_initialized_tank(number_of_layers = 8)]
+    references = [_initialized_tank(T_0 = 40 + 5 * i) for i in range(4)] + [_initialized_tank(number_of_layers = 8)]
+    for time_id in range(10):
+        for i, (tank, reference) in enumerate(zip(tanks, references)):
+            for t in (tank, reference):
+                _set_tank_inputs(t, 0.005 * (time_id % 3 == i % 3), 1.5 * (time_id % 2))
+            reference.step(state, None)
+        MultiNodeHotWaterTank.step_batch(tanks, state)
+        for tank, reference in zip(tanks, references):
+            assert np.allclose(tank.T_layer, reference.T_layer)
+            assert tank.ports[tank.cold_water_input_port_name].flows['mass'] == reference.ports[reference.cold_water_input_port_name].flows['mass']
+
+
+def test_simulator_batches_consecutive_components_with_step_batch():
+    from energy_system_control import HotWaterStorage
+    from energy_system_control.sim.simulator import Simulator
+    tanks = [_initialized_tank() for _ in range(4)]
+    single_node = HotWaterStorage('single_node', tank_volume = 200, T_0 = 50)
+    substepped = _initialized_tank(n_substeps = 2)
+    components = [tanks[0], tanks[1], single_node, tanks[2], tanks[3], substepped]
+    # The order of the components is kept: only consecutive tanks without sub-steps are batched
+    assert Simulator._component_batches(components) == [tanks[:2], [single_node], tanks[2:], [substepped]]
+
+
+def test_multinode_water_tank_matrix_cache():
+    from energy_system_control.sim.state import SimulationState
+    state = SimulationState(time = 0.0, time_step = 900)
+    tank = _initialized_tank(T_0 = 60, matrix_cache_size = 2)
+    reference = _initialized_tank(T_0 = 60, matrix_cache_size = 0)
+    # The draw-off flow switches between a few regimes
+    for water_demand in [0.0, 0.01, 0.0, 0.01, 0.02, 0.0, 0.02, 0.01]:
+        for t in (tank, reference):
+            _set_tank_inputs(t, water_demand, 0.0)
+            t.step(state, None)
+        assert np.allclose(tank.T_layer, reference.T_layer)
+        assert np.array_equal(tank.matrix_A, reference.matrix_A)
+    assert len(tank._matrix_cache) == 2
+    assert tank.matrix_cache_hits == 3  # 0.0, 0.01 and then 0.02 are found in the cache; the last 0.01 was evicted
+    assert tank.matrix_cache_hits + tank.matrix_cache_misses == reference.matrix_cache_misses
+
+
+def _run_single_node_tank(integration, time_step, duration, heat_input):
+    from energy_system_control import HotWaterStorage
+    from energy_system_control.sim.state import SimulationState
+    tank = HotWaterStorage(name = 'test_tank', tank_volume = 100, T_0 = 60, convection_coefficient_losses = 5.0, integration = integration)
+    tank.create_ports()
+    state = SimulationState(time = 0.0, time_step = time_step)
+    tank.initialize(state)
+    for port_name in tank.fluid_port_names:
+        tank.ports[port_name].T = tank.temperature
+    tank.ports[tank.hot_water_output_port_name].flows.update({'mass': 0.0, 'heat': 0.0})
+    for port_name in tank.heat_input_port_names:
+        tank.ports[port_name].flows['heat'] = heat_input / 2
+    for _ in range(int(duration / time_step)):
+        tank.step(state, None)
+    return tank
+
+
+def test_hot_water_storage_exponential_integration():
+    duration = 48 * 3600
+    tank = _run_single_node_tank('exponential', time_step = 3600, duration = duration, heat_input = 0.0)
+    # Free cooling: the exact solution is an exponential decay towards the ambient temperature
+    from energy_system_control.constants import WATER
+    time_constant = WATER.cp * WATER.rho * tank.volume / (tank.convection_coefficient_losses * tank.surface * 1e-3)
+    expected = tank.T_amb + (tank.T_0 - tank.T_amb) * math.exp(-duration / time_constant)
+    assert math.isclose(tank.temperature, expected, rel_tol = 1e-9)
+    # With a heat input, a coarse exponential step is closer to a fine reference than a coarse Euler step
+    reference = _run_single_node_tank('euler', time_step = 10, duration = duration, heat_input = 0.2).temperature
+    exponential = _run_single_node_tank('exponential', time_step = 6 * 3600, duration = duration, heat_input = 0.2).temperature
+    euler = _run_single_node_tank('euler', time_step = 6 * 3600, duration = duration, heat_input = 0.2).temperature
+    assert abs(exponential - reference) < 0.01
+    assert abs(exponential - reference) < abs(euler - reference) / 10
+    with pytest.raises(ValueError):
+        _run_single_node_tank('implicit', time_step = 3600, duration = 3600, heat_input = 0.0)
+
+
+def test_multinode_water_tank_substeps():
+    from energy_system_control.sim.state import SimulationState
+    reference = _initialized_tank()
+    tank = _initialized_tank(n_substeps = 4)
+    fine_state = SimulationState(time = 0.0, time_step = 900)
+    coarse_state = SimulationState(time = 0.0, time_step = 3600)
+    for water_demand, heat_input in [(0.0, 3.0), (0.02, 3.0), (0.02, 0.0)]:
+        for t in [reference, tank]:
+            _set_tank_inputs(t, water_demand, heat_input)
+        for _ in range(4):
+            reference.step(fine_state, None)
+        tank.advance(coarse_state, None)
+        # Holding the inputs over the sub-steps is the same as four steps of the global simulation
+        assert np.allclose(tank.T_layer, reference.T_layer)
+    assert coarse_state.time_step == 3600
+
+
+def test_multinode_water_tank_adaptive_substeps():
+    from energy_system_control.sim.state import SimulationState
+    state = SimulationState(time = 0.0, time_step = 3600)
+    tanks = {}
+    for name, kwargs in [('reference', dict(n_substeps = 64)), ('coarse', {}), ('adaptive', dict(substep_tolerance = 0.05))]:
+        tanks[name] = _initialized_tank(**kwargs)
+        _set_tank_inputs(tanks[name], 0.02, 3.0)
+        for _ in range(3):
+            tanks[name].advance(state, None)
+    assert 1 < tanks['adaptive']._last_n_substeps <= tanks['adaptive'].max_substeps
+    error_adaptive = np.max(np.abs(tanks['adaptive'].T_layer - tanks['reference'].T_layer))
+    error_coarse = np.max(np.abs(tanks['coarse'].T_layer - tanks['reference'].T_layer))
+    assert error_adaptive < error_coarse / 2
+
+
+def test_water_property_table():
+    from energy_system_control.constants import water_property_table, FluidPropertyTable
+    table = water_property_table()
+    assert water_property_table() is table  # Shared between components
+    assert math.isclose(table.cp(293.15), 4.1844) and math.isclose(table.rho(333.15), 983.20)
+    T = np.random.default_rng(0).uniform(270.0, 380.0, 1000)
+    large = table.k(T)
+    assert np.allclose(large, table.k(T[:10].tolist() + T[10:].tolist()))
+    assert np.allclose(large[:10], table.k(T[:10]))  # Small arrays take another path
+    assert np.allclose(large[:10], [table.k(T_i) for T_i in T[:10]])  # And scalars another one
+    assert table.k(400.0) == table.k(373.15)  # Clamped to the range of the table
+    linear = FluidPropertyTable(300.0, 310.0, {'cp': [4.0, 5.0]})
+    assert math.isclose(linear.cp(302.5), 4.25) and np.allclose(linear.cp(np.array([300.0, 305.0])), [4.0, 4.5])
+    with pytest.raises(ValueError):
+        water_property_table(T_max = 400.0)
+    with pytest.raises(ValueError):
+        water_property_table(source = 'steam_tables')
+
+
+def test_multinode_water_tank_fluid_properties():
+    from energy_system_control.constants import water_property_table, FluidPropertyTable, WATER
+    from energy_system_control.sim.state import SimulationState
+    state = SimulationState(time = 0.0, time_step = 900)
+    table = water_property_table()
+    constant_table = FluidPropertyTable(table.T_min, table.T_max, {p: np.full(2, getattr(WATER, p)) for p in ('rho', 'cp', 'k')})
+    # With constant values in the table (and no property updates), the tank is the same as with the constants
+    reference = _initialized_tank(T_0 = 60)
+    tank = _initialized_tank(T_0 = 60, fluid_properties = constant_table, property_update_tolerance = np.inf)
+    for water_demand, heat_input in [(0.0, 2.0), (0.01, 2.0), (0.01, 0.0), (0.0, 0.0)]:
+        for t in (tank, reference):
+            _set_tank_inputs(t, water_demand, heat_input)
+            t.step(state, None)
+        assert np.allclose(tank.T_layer, reference.T_layer)
+    # Free cooling: with the properties of water at 60°C, the heat capacity is lower and the tank cools down faster
+    reference = _initialized_tank(T_0 = 60)
+    tank = _initialized_tank(T_0 = 60, fluid_properties = table)
+    for t in (tank, reference):
+        _set_tank_inputs(t, 0.0, 0.0)
+        t.step(state, None)
+    T_0 = 333.15 - 0.01 * np.arange(tank.number_of_layers)
+    ratio = (T_0 - tank.T_layer) / (T_0 - reference.T_layer)
+    expected = WATER.rho * WATER.cp / (table.rho(T_0) * table.cp(T_0))
+    assert np.allclose(ratio, expected, rtol = 1e-3)
+
+
+def test_hot_water_demand_uses_the_tank_specific_heat():
+    import pandas as pd
+    import energy_system_control as esc
+    from energy_system_control.constants import water_property_table, WATER
+    index = pd.date_range("2023-01-01", periods=24, freq="h")
+    env = esc.Environment(
+        components=[esc.HotWaterDemand.from_dataframe('dhw', pd.DataFrame({'demand': np.full(24, 0.5)}, index=index), time_alignment='daily', column_name='demand'),
+                    esc.MultiNodeHotWaterTank(name='tank', tank_volume=200, tank_height=1.2, height_main_heat_input=0.2, T_0=55, fluid_properties=water_property_table()),
+                    esc.HeatPumpLorentzEfficiency(name='hp', Qdot_design=2.0, COP_design=3.0),
+                    esc.ElectricityGrid('grid'), esc.ColdWaterGrid('water', 'fluid')],
+        sensors=[esc.TankTemperatureSensor('T', 'tank'), esc.HotWaterDemandSensor('Q', 'dhw')],
+        controllers=[esc.HeaterControllerWithBandwidth('c', 'hp', 'T', 45, 10)],
+        connections=[('dhw_fluid_port', 'tank_hot_water_output_port'), ('hp_heat_output_port', 'tank_main_heat_input_port'),
+                     ('hp_electricity_input_port', 'grid_electricity_port'), ('tank_cold_water_input_port', 'water_fluid_port')])
+    esc.Simulator(env, esc.SimulationConfig(simulation_end_h=2, time_step_h=0.25)).run()
+    # The demand computes the outlet enthalpy with the specific heat with which the tank removes it
+    port = env.ports['dhw_fluid_port']
+    assert port.cp == env.components['tank']._cp_flow != WATER.cp
+    assert np.isclose(port.flows['heat'], port.flows['mass'] * port.cp * port.T)
+
+
 @pytest.fixture
 def base_test_env():
     from energy_system_control import LithiumIonBattery, Environment, ConstantPowerProducer, SOCSensor, Inverter, ElectricityGrid, ChargeController, ElectricPowerSensor
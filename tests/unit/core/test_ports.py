@@ -0,0 +1,47 @@
+import pytest
+import energy_system_control as esc
+from energy_system_control.core.port import Port, HeatPort, FluidPort
+
+
+@pytest.mark.parametrize("port_type, layers", [("heat", ("heat",)), ("fluid", ("mass", "heat")), ("electricity", ("electricity",))])
+def test_built_in_ports_are_slotted(port_type, layers):
+    port = Port.create_port_of_type("p", port_type)
+    assert not hasattr(port, "__dict__")
+    assert port.layers == layers
+    assert port.flows == dict.fromkeys(layers)
+    assert port.unit_flows is None and port.unit_T is None
+    with pytest.raises(AttributeError):
+        port.label = "not a port attribute"
+
+
+def test_reset_flow_data():
+    port = FluidPort("p")
+    port.flows["mass"] = 1.0
+    port.unit_flows = {"mass": None}
+    port.reset_flow_data()
+    assert port.flows == {"mass": None, "heat": None}
+    assert port.unit_flows is None
+
+
+def test_subclasses_without_slots_keep_an_instance_dict():
+    class LabelledHeatPort(HeatPort):
+        def __init__(self, name, label):
+            super().__init__(name)
+            self.label = label
+
+    class LabelledSensor(esc.TankTemperatureSensor):
+        pass
+
+    port = LabelledHeatPort("p", "supply")
+    assert port.label == "supply" and port.flows == {"heat": None}
+    sensor = LabelledSensor("T", "tank")
+    sensor.label = "top"
+    assert sensor.label == "top" and sensor.component_name == "tank"
+
+
+def test_built_in_sensors_are_slotted():
+    sensor = esc.ElectricPowerSensor("P", "grid_electricity_port")
+    assert not hasattr(sensor, "__dict__")
+    assert sensor.current_measurement is None and sensor.execution_interval_h is None and sensor.execution_steps == 1
+    sensor.execution_interval_h = 1.0
+    assert sensor.execution_interval_h == 1.0
@@ -0,0 +1,69 @@
+import pytest
+import numpy as np
+import pandas as pd
+import energy_system_control as esc
+from energy_system_control.sim.ensemble import EnsembleRunner, StreamingPercentiles
+from energy_system_control.uncertainty import GaussianUncertainty
+
+PERCENTILES = (5, 50, 95)
+
+
+def build_system(scale: float = 1.0):
+    index = pd.date_range("2023-01-01", periods=24, freq="h")
+    demand = esc.ElectricityDemand.from_dataframe("demand", pd.Series(scale * np.ones(24), index=index), time_alignment="daily",
+                                                  uncertainty_model=GaussianUncertainty(sigma=0.2, mode="multiplicative"))
+    return esc.Environment(components=[demand, esc.ElectricityGrid("grid")],
+                           sensors=[esc.ElectricPowerSensor("grid_power", "grid_electricity_port")],
+                           connections=[("demand_electricity_port", "grid_electricity_port")])
+
+
+def build_scaled_system():
+    return build_system(scale=2.0)
+
+
+@pytest.fixture
+def runner():
+    return EnsembleRunner(esc.SimulationConfig(simulation_end_h=24, time_step_h=1.0), n_runs=12, seed=3,
+                          kpis={"E_grid": lambda r: r.get_cumulated_electricity("grid_electricity_port")},
+                          signals=["grid_power", "grid_electricity_port:electricity"], percentiles=PERCENTILES, exact_runs=5)
+
+
+def test_streaming_percentiles():
+    rng = np.random.default_rng(0)
+    runs = rng.normal(size=(2000, 3)) * [1.0, 2.0, 0.5] + [0.0, 10.0, -3.0]
+    exact = StreamingPercentiles(PERCENTILES, exact_runs=50)
+    streaming = StreamingPercentiles(PERCENTILES, exact_runs=50)
+    for values in runs[:50]:
+        exact.update(values)
+    assert np.allclose(exact.result(), np.percentile(runs[:50], PERCENTILES, axis=0))
+    for values in runs:
+        streaming.update(values)
+    assert np.allclose(streaming.mean, runs.mean(axis=0))
+    assert np.allclose(streaming.result(), np.percentile(runs, PERCENTILES, axis=0), atol=0.1 * np.array([1.0, 2.0, 0.5]))
+
+
+def test_ensemble_percentile_bands(runner):
+    outcome = runner.run(build_system)
+    assert len(outcome.kpis) == 12
+    assert outcome.kpis["E_grid"].std() > 0  # Each run has its own noise realization
+    band = outcome.signal_percentiles["grid_electricity_port:electricity"]
+    assert list(band.columns) == ["p5", "p50", "p95"]
+    assert (band["p5"] <= band["p50"]).all() and (band["p50"] <= band["p95"]).all()
+    assert np.isclose(outcome.signal_means["grid_electricity_port:electricity"].mean(), -1.0, atol=0.1)
+    kpi_bands = outcome.kpi_percentiles()
+    assert kpi_bands.loc["p5", "E_grid"] <= kpi_bands.loc["p95", "E_grid"]
+
+
+def test_common_random_numbers(runner):
+    # Variants are run on the same noise realizations: with the demand doubled, every run doubles its consumption
+    outcome = runner.compare({"base": build_system, "scaled": build_scaled_system})
+    assert outcome["base"].seeds == outcome["scaled"].seeds
+    assert np.allclose(outcome["scaled"].kpis["E_grid"], 2 * outcome["base"].kpis["E_grid"], rtol=1e-5)
+
+
+def test_parallel_ensemble(runner):
+    sequential = runner.run(build_system)
+    runner.n_workers = 2
+    parallel = runner.run(build_system)
+    pd.testing.assert_frame_equal(parallel.kpis, sequential.kpis)
+    pd.testing.assert_frame_equal(parallel.signal_percentiles["grid_power"], sequential.signal_percentiles["grid_power"])
@@ -0,0 +1,91 @@
+import pytest
+import numpy as np
+import pandas as pd
+import energy_system_control as esc
+from energy_system_control.sim.simulator import Simulator
+
+
+class SquaredTemperatureSensor(esc.TankTemperatureSensor):
+    # Not affine in the state of the tank: the skipped rows cannot be filled exactly from a few steps
+    def measure(self, environment, state):
+        super().measure(environment, state)
+        self.current_measurement = (self.current_measurement - 273.15) ** 2
+        return self.current_measurement
+
+
+def build_system(integration="euler", memory_sensor=False, extra_sensors=()):
+    # Hot water draws in the morning and in the evening only: the tank cools down slowly for most of the day
+    index = pd.date_range("2025-01-01", periods=24, freq="h")
+    profile = pd.Series(np.where(np.isin(index.hour, [7, 8, 19]), 0.8, 0.0), index=index)
+    sensors = [esc.TankTemperatureSensor('T', 'tank'), esc.ElectricPowerSensor('P', 'hp_electricity_input_port')]
+    if memory_sensor:
+        sensors.append(esc.SensorWithMemory('T_history', 'T', lookback_time=2, n_samples=4))
+    sensors.extend(extra_sensors)
+    return esc.Environment(
+        components=[esc.HotWaterDemand.from_dataframe('dhw', profile, time_alignment='daily'),
+                    esc.HotWaterStorage('tank', tank_volume=200, T_0=55, integration=integration),
+                    esc.HeatPumpConstantEfficiency(name='hp', Qdot_design=2.0, COP_design=3.0),
+                    esc.ElectricityGrid('grid'), esc.ColdWaterGrid('water', 'fluid')],
+        sensors=sensors,
+        controllers=[esc.HeaterControllerWithBandwidth('c', 'hp', 'T', 45, 5)],
+        connections=[('dhw_fluid_port', 'tank_hot_water_output_port'), ('hp_heat_output_port', 'tank_main_heat_input_port'),
+                     ('hp_electricity_input_port', 'grid_electricity_port'), ('tank_cold_water_input_port', 'water_fluid_port')])
+
+
+def run(fast_forward_steps=0, **kwargs):
+    cfg = esc.SimulationConfig(simulation_end_h=72, time_step_h=1 / 12, fast_forward_steps=fast_forward_steps)
+    simulator = Simulator(build_system(**kwargs), cfg)
+    return simulator, simulator.run()
+
+
+@pytest.fixture
+def count_skipped_steps(monkeypatch):
+    skipped = []
+    original = Simulator._fast_forward
+    def counted(self, sim_data):
+        start_id = self.state.time_id
+        done = original(self, sim_data)
+        if done:
+            skipped.append(self.state.time_id - start_id)
+        return done
+    monkeypatch.setattr(Simulator, "_fast_forward", counted)
+    return skipped
+
+
+@pytest.fixture
+def count_rollbacks(monkeypatch):
+    rollbacks = []
+    original = Simulator._restore_snapshot
+    def counted(self, snapshot):
+        rollbacks.append(self.state.time_id)
+        return original(self, snapshot)
+    monkeypatch.setattr(Simulator, "_restore_snapshot", counted)
+    return rollbacks
+
+
+@pytest.mark.parametrize("integration", ["euler", "exponential"])
+def test_fast_forward_matches_step_by_step(integration, count_skipped_steps):
+    reference_simulator, reference = run(integration=integration)
+    simulator, fast = run(fast_forward_steps=48, integration=integration)
+    assert sum(count_skipped_steps) > len(reference.time_vector) / 2  # Most of the run is quiescent
+    assert np.isclose(fast.get_cumulated_electricity('hp_electricity_input_port'), reference.get_cumulated_electricity('hp_electricity_input_port'))
+    for fast_df, reference_df in zip(fast.to_dataframe(), reference.to_dataframe()):
+        pd.testing.assert_frame_equal(fast_df, reference_df, atol=1e-4, check_dtype=False)
+    assert np.isclose(simulator.env.components['tank'].temperature, reference_simulator.env.components['tank'].temperature)
+
+
+def test_sensors_with_memory_disable_fast_forward(count_skipped_steps):
+    _, reference = run(memory_sensor=True)
+    _, fast = run(fast_forward_steps=48, memory_sensor=True)
+    assert not count_skipped_steps
+    pd.testing.assert_frame_equal(fast.to_dataframe()[2], reference.to_dataframe()[2])
+
+
+def test_non_affine_signals_roll_back_the_fast_forward(count_rollbacks):
+    run(fast_forward_steps=48)
+    n_rollbacks = len(count_rollbacks)  # Due to the changes of the flows only
+    _, reference = run(extra_sensors=[SquaredTemperatureSensor('T2', 'tank')])
+    count_rollbacks.clear()
+    _, fast = run(fast_forward_steps=48, extra_sensors=[SquaredTemperatureSensor('T2', 'tank')])
+    assert len(count_rollbacks) > n_rollbacks
+    pd.testing.assert_frame_equal(fast.to_dataframe()[2], reference.to_dataframe()[2], rtol=1e-5, check_dtype=False)
@@ -0,0 +1,46 @@
+import json
+import subprocess
+import sys
+import pytest
+
+# Heavy dependencies only needed by a few classes: they must not be loaded by `import energy_system_control`
+HEAVY_MODULES = ["cvxpy", "sklearn", "pvlib", "matplotlib", "requests", "scipy.signal", "scipy.linalg", "scipy.interpolate"]
+
+CHECK_LOADED = """
+import json, sys, time, types
+start = time.perf_counter()
+import pandas
+pandas_elapsed = time.perf_counter() - start
+start = time.perf_counter()
+import energy_system_control
+elapsed = time.perf_counter() - start
+# Modules imported with helpers.lazy_import are registered in sys.modules, but only loaded on first use
+loaded = [name for name in {modules!r} if type(sys.modules.get(name)) is types.ModuleType]
+print(json.dumps({{"pandas_elapsed": pandas_elapsed, "elapsed": elapsed, "loaded": loaded}}))
+"""
+
+
+def _import_package():
+    output = subprocess.run([sys.executable, "-c", CHECK_LOADED.format(modules=HEAVY_MODULES)], capture_output=True, text=True, check=True)
+    result = json.loads(output.stdout.strip().splitlines()[-1])
+    return result["pandas_elapsed"], result["elapsed"], result["loaded"]
+
+
+def test_package_import_does_not_load_heavy_dependencies():
+    pandas_elapsed, elapsed, loaded = _import_package()
+    assert loaded == []
+    # Once pandas is loaded, the rest of the import takes a fraction of its time (several times more with the heavy
+    # dependencies loaded eagerly): the bound is relative, so that it holds on slow machines
+    assert elapsed < pandas_elapsed
+
+
+def test_lazy_modules_are_loaded_on_first_use():
+    from energy_system_control.helpers import lazy_import, calculate_solar_angles
+    import pandas as pd
+    zenith, azimuth = calculate_solar_angles(45.0, 9.0, pd.date_range("2025-06-21 12:00", periods=2, freq="h"))
+    assert len(zenith) == 2 and 0 < zenith.iloc[0] < 90
+    requests = lazy_import("requests")
+    assert lazy_import("requests") is requests
+    assert requests.Session is not None
+    with pytest.raises(ModuleNotFoundError):
+        lazy_import("a_module_that_does_not_exist")
@@ -0,0 +1,90 @@
+import pytest
+import numpy as np
+import pandas as pd
+import energy_system_control as esc
+from energy_system_control.controllers.predictors import Predictor, PerfectTimeSeriesPredictor
+from energy_system_control.sim.simulator import Simulator
+from energy_system_control.sim.state import SimulationState
+
+
+class CountingPredictor(Predictor):
+    # Each element of the forecast is the id of the time step it refers to
+    def __init__(self, name: str, execution_interval_h: float | None = None):
+        super().__init__(name=name, variable_to_predict=None, execution_interval_h=execution_interval_h)
+        self.calls = []
+
+    def predict(self, horizon, state):
+        self.calls.append(state.time_id)
+        return state.time_id + np.arange(int(horizon * 3600 / state.time_step), dtype=float)
+
+
+def build_system(controller_interval_h=None, sensor_interval_h=None):
+    index = pd.date_range("2025-01-01", periods=24, freq="h")
+    profile = pd.Series(np.where(np.isin(index.hour, [7, 8, 19]), 0.8, 0.1), index=index)
+    slow_sensor = esc.TankTemperatureSensor('T_slow', 'tank', execution_interval_h=sensor_interval_h)
+    controller = esc.HeaterControllerWithBandwidth('c', 'hp', 'T', 45, 5, execution_interval_h=controller_interval_h)
+    return esc.Environment(
+        components=[esc.HotWaterDemand.from_dataframe('dhw', profile, time_alignment='daily'),
+                    esc.HotWaterStorage('tank', tank_volume=200, T_0=50),
+                    esc.HeatPumpConstantEfficiency(name='hp', Qdot_design=2.0, COP_design=3.0),
+                    esc.ElectricityGrid('grid'), esc.ColdWaterGrid('water', 'fluid')],
+        sensors=[esc.TankTemperatureSensor('T', 'tank'), slow_sensor],
+        controllers=[controller],
+        connections=[('dhw_fluid_port', 'tank_hot_water_output_port'), ('hp_heat_output_port', 'tank_main_heat_input_port'),
+                     ('hp_electricity_input_port', 'grid_electricity_port'), ('tank_cold_water_input_port', 'water_fluid_port')])
+
+
+def run(**kwargs):
+    cfg = esc.SimulationConfig(simulation_end_h=48, time_step_h=0.25)
+    return Simulator(build_system(**kwargs), cfg).run()
+
+
+def test_controller_actions_are_held_between_executions():
+    results = run(controller_interval_h=1.0)
+    actions = results.to_dataframe()[1]['c:hp'].to_numpy()
+    switches = np.flatnonzero(np.diff(actions)) + 1
+    assert len(switches) > 0
+    assert np.all(switches % 4 == 0)  # The controller only acts on the hour
+    assert not np.all(np.flatnonzero(np.diff(run().to_dataframe()[1]['c:hp'].to_numpy())) % 4 == 0)
+
+
+def test_sensor_measurements_are_held_between_executions():
+    sensors = run(sensor_interval_h=0.5).get_sensor_values(['T', 'T_slow'])
+    assert np.allclose(sensors[::2, 0], sensors[::2, 1])
+    assert np.allclose(sensors[1::2, 1], sensors[::2, 1])
+
+
+def test_predictor_forecasts_are_held_between_executions():
+    predictor = CountingPredictor('p', execution_interval_h=1.0)
+    predictor.execution_steps = 4  # Set by the simulator from execution_interval_h
+    state = SimulationState()
+    state.time_step = 900.0
+    for time_id in range(10):
+        state.time_id = time_id
+        # The held forecast starts at the current time step, and covers the whole horizon
+        assert np.array_equal(predictor.get_prediction(2.0, state), time_id + np.arange(8))
+    assert predictor.calls == [0, 4, 8]
+    predictor.clear_forecasts()
+    state.time_id = 9
+    predictor.get_prediction(2.0, state)
+    assert predictor.calls == [0, 4, 8, 9]
+
+
+def test_held_forecast_matches_the_forecast_at_each_step_on_perfect_data():
+    cfg = esc.SimulationConfig(simulation_end_h=12, time_step_h=0.25)
+    state = SimulationState()
+    state.initialize(cfg)
+    data = np.random.default_rng(0).random(len(state.time_vector_for_prediction))
+    held = PerfectTimeSeriesPredictor('held', 'dhw', execution_interval_h=1.0)
+    held.execution_steps = 4
+    held.data = data
+    reference = PerfectTimeSeriesPredictor('reference', 'dhw')
+    reference.data = data
+    for time_id in range(len(state.time_vector)):
+        state.time_id, state.time = time_id, state.time_vector[time_id]
+        assert np.array_equal(held.get_prediction(3.0, state), reference.predict(3.0, state))
+
+
+def test_execution_interval_must_be_a_multiple_of_the_time_step():
+    with pytest.raises(ValueError):
+        Simulator(build_system(controller_interval_h=0.6), esc.SimulationConfig(simulation_end_h=4, time_step_h=0.25)).run()
@@ -0,0 +1,75 @@
+import pytest
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from energy_system_control.helpers import PeriodicArray, resample_periodic, resample_with_interpolation
+from energy_system_control.io.resample_cache import ResampleCache, cached_resample_with_interpolation
+
+
+@pytest.fixture
+def daily_profile():
+    index = pd.date_range("2020-01-01", periods=24, freq="h")
+    return pd.Series(np.arange(24, dtype=float), index=index, name="volume")
+
+
+def test_periodic_array_indexing():
+    array = PeriodicArray(np.array([1.0, 2.0, 3.0]), 8)
+    assert len(array) == 8
+    assert array[4] == 2.0
+    assert array[-1] == 2.0
+    assert np.array_equal(array[2:6], [3.0, 1.0, 2.0, 3.0])
+    assert np.array_equal(array[[0, 5]], [1.0, 3.0])
+    assert np.array_equal(np.asarray(array), [1, 2, 3, 1, 2, 3, 1, 2])
+    with pytest.raises(IndexError):
+        array[8]
+
+
+def test_periodic_array_operations():
+    array = PeriodicArray(np.array([1.0, 2.0]), 5)
+    scaled = array * 2.0
+    assert isinstance(scaled, PeriodicArray)
+    assert np.array_equal(np.asarray(scaled), [2, 4, 2, 4, 2])
+    assert np.isclose(np.sum(array), 7.0)
+    assert np.array_equal(array + np.arange(5), [1, 3, 3, 5, 5])
+
+
+@pytest.mark.parametrize("var_type", ["intensive", "extensive"])
+@pytest.mark.parametrize("target_freq", ["900s", "7200s"])
+def test_periodic_matches_dense(daily_profile, var_type, target_freq):
+    kwargs = dict(target_freq=target_freq, simulation_end_s=24 * 5.5 * 3600, var_type=var_type,
+                  simulation_start_datetime=datetime(2023, 6, 1), time_alignment="daily")
+    periodic = resample_periodic(daily_profile, **kwargs)
+    assert isinstance(periodic, PeriodicArray)
+    assert np.allclose(np.asarray(periodic), resample_with_interpolation(daily_profile, **kwargs))
+
+
+def test_memory_bounded_by_one_period(daily_profile):
+    periodic = resample_periodic(daily_profile, "900s", simulation_end_s=10 * 365 * 24 * 3600.0, var_type="extensive")
+    assert len(periodic) > 350_000
+    assert len(periodic.period) == 96
+    # Extensive data is scaled when upsampling: each hour is split in four quarters
+    assert np.isclose(periodic[96 * 1000 + 4 * 7 + 2], 7.0 / 4)
+
+
+def test_start_in_the_middle_wraps_around(daily_profile):
+    output = resample_with_interpolation(daily_profile, "3600s", simulation_end_s=48 * 3600.0, var_type="intensive",
+                                         simulation_start_datetime=datetime(2023, 6, 1, 18), time_alignment="daily")
+    # The day restarts from midnight after the end of the data, and the period stays equal to 24 hours
+    assert np.array_equal(output[:8], [18, 19, 20, 21, 22, 23, 0, 1])
+    assert np.array_equal(output[24:32], output[:8])
+
+
+def test_fallback_to_dense_output(daily_profile):
+    # 24 hours are not a multiple of 7 minutes: the repetitions are materialized
+    output = resample_periodic(daily_profile, "420s", simulation_end_s=72 * 3600.0, var_type="intensive")
+    assert isinstance(output, np.ndarray)
+    assert len(output) == 72 * 60 // 7 + 1
+
+
+def test_periodic_array_in_disk_cache(daily_profile, tmp_path):
+    kwargs = dict(target_freq="900s", simulation_end_s=30 * 24 * 3600.0, var_type="extensive")
+    first = cached_resample_with_interpolation(daily_profile, cache=ResampleCache(cache_dir=str(tmp_path)), periodic=True, **kwargs)
+    loaded = cached_resample_with_interpolation(daily_profile, cache=ResampleCache(cache_dir=str(tmp_path)), periodic=True, **kwargs)
+    assert isinstance(loaded, PeriodicArray)
+    assert len(loaded) == len(first)
+    assert np.array_equal(np.asarray(loaded), np.asarray(first))
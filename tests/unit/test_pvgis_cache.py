@@ -0,0 +1,47 @@
+import os
+import pytest
+import numpy as np
+import pandas as pd
+from unittest.mock import Mock, patch
+from energy_system_control.components.explicit_components.pv_panels import PVpanelFromPVGIS
+from energy_system_control.io.pvgis_cache import PVGISCache, cached_pvgis_hourly
+
+__TEST__ = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+PARAMS = dict(lat=45, lon=8, peakpower=1000, loss=14, angle=30, azimuth=0, startyear=2023, endyear=2023)
+
+
+@pytest.fixture
+def pvgis_response():
+    """A mocked PVGIS response, built from the series saved in the test data"""
+    hourly = pd.read_csv(os.path.join(__TEST__, "DATA", "pvgis_data.csv"), sep=";", skipfooter=11, engine="python")
+    response = Mock()
+    response.json.return_value = {"outputs": {"hourly": hourly.to_dict(orient="records")}}
+    return response
+
+
+def test_download_is_cached_on_disk(pvgis_response, tmp_path):
+    with patch("energy_system_control.io.pvgis_cache.requests.get", return_value=pvgis_response) as mock_get:
+        first = cached_pvgis_hourly(PARAMS, cache=PVGISCache(cache_dir=str(tmp_path)))
+        # A new cache (e.g. in another session) finds the series on disk, also with the parameters in another order
+        cache = PVGISCache(cache_dir=str(tmp_path))
+        second = cached_pvgis_hourly(dict(reversed(list(PARAMS.items())), lat=45.0), cache=cache)
+    assert mock_get.call_count == 1
+    assert "lat=45" in mock_get.call_args[0][0] and "outputformat=json" in mock_get.call_args[0][0]
+    assert cache.hits == 1
+    assert list(second.columns) == ["P", "G(i)", "H_sun", "T2m", "WS10m", "Int"]
+    assert second.index.equals(first.index)
+    # Values are stored as float32, so the downloaded and the cached series are the same
+    assert (first.dtypes == np.float32).all()
+    assert second.equals(first)
+
+
+def test_offline_mode(pvgis_response, tmp_path):
+    with patch("energy_system_control.io.pvgis_cache.requests.get", return_value=pvgis_response):
+        cached_pvgis_hourly(PARAMS, cache=PVGISCache(cache_dir=str(tmp_path)))
+    offline = PVGISCache(cache_dir=str(tmp_path), offline=True)
+    with patch("energy_system_control.io.pvgis_cache.requests.get") as mock_get:
+        pv = PVpanelFromPVGIS(name="pv", installed_power=1000, latitude=45, longitude=8, tilt=30, azimuth=0, cache=offline)
+        with pytest.raises(LookupError):
+            cached_pvgis_hourly(dict(PARAMS, angle=35), cache=offline)
+    mock_get.assert_not_called()
+    assert pv.ts.raw.iloc[9] == pytest.approx(526.82, rel=1e-6)
@@ -0,0 +1,89 @@
+import pytest
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+from energy_system_control.components.base import TimeSeriesData
+from energy_system_control.helpers import resample_with_interpolation
+from energy_system_control.io.resample_cache import ResampleCache, cached_resample_with_interpolation, get_resample_cache, set_resample_cache
+
+
+@pytest.fixture
+def raw():
+    index = pd.date_range("2023-01-01", periods=48, freq="h")
+    return pd.Series(np.arange(48, dtype=float), index=index, name="P")
+
+
+@pytest.fixture
+def default_cache():
+    """Replace the default cache with an empty one for the duration of the test"""
+    previous = get_resample_cache()
+    cache = ResampleCache()
+    set_resample_cache(cache)
+    yield cache
+    set_resample_cache(previous)
+
+
+def test_cache_hit_returns_same_result(raw):
+    cache = ResampleCache()
+    kwargs = dict(target_freq="900s", simulation_end_s=24 * 3600.0, var_type="intensive")
+    first = cached_resample_with_interpolation(raw, cache=cache, **kwargs)
+    second = cached_resample_with_interpolation(raw, cache=cache, **kwargs)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert second is first
+    assert np.array_equal(first, resample_with_interpolation(raw, **kwargs))
+    assert not first.flags.writeable
+
+
+def test_key_depends_on_content_and_parameters(raw):
+    key = ResampleCache.make_key(raw, target_freq="900s")
+    assert key == ResampleCache.make_key(raw.copy(), target_freq="900s")
+    assert key != ResampleCache.make_key(raw, target_freq="1800s")
+    modified = raw.copy()
+    modified.iloc[5] += 1.0
+    assert key != ResampleCache.make_key(modified, target_freq="900s")
+    shifted = raw.copy()
+    shifted.index = shifted.index + pd.Timedelta(days=1)
+    assert key != ResampleCache.make_key(shifted, target_freq="900s")
+    with patch("energy_system_control.io.resample_cache.CACHE_VERSION", 0):
+        assert key != ResampleCache.make_key(raw, target_freq="900s")
+
+
+def test_lru_eviction():
+    cache = ResampleCache(maxsize=2)
+    for key in ["a", "b", "a", "c"]:
+        if cache.get(key) is None:
+            cache.put(key, np.zeros(3))
+    assert len(cache) == 2
+    assert cache.get("b") is None  # "b" was the least recently used one
+    assert cache.get("a") is not None
+
+
+def test_disk_store(raw, tmp_path):
+    kwargs = dict(target_freq="1800s", simulation_end_s=12 * 3600.0, var_type="extensive")
+    expected = cached_resample_with_interpolation(raw, cache=ResampleCache(cache_dir=str(tmp_path)), **kwargs)
+    # A new cache (e.g. in another process) finds the array on disk
+    cache = ResampleCache(cache_dir=str(tmp_path))
+    loaded = cached_resample_with_interpolation(raw, cache=cache, **kwargs)
+    assert cache.hits == 1
+    assert isinstance(loaded, np.memmap)
+    assert np.array_equal(loaded, expected)
+    cache.clear(disk=True)
+    assert cache.get(ResampleCache.make_key(raw, **kwargs)) is None
+
+
+def test_time_series_data_uses_default_cache(raw, default_cache):
+    ts = TimeSeriesData(raw=raw, var_type="power", var_unit="W", time_alignment="datetime")
+    ts.resample(time_step_h=0.25, simulation_end_h=24)
+    first = ts.data.copy()
+    ts.resample(time_step_h=0.25, simulation_end_h=24)
+    assert default_cache.hits == 1
+    assert np.array_equal(ts.data, first)
+    assert np.isclose(first[4], 1.0e-3)  # Unit conversion is applied after the cached resampling
+
+
+def test_disabled_cache(raw, default_cache):
+    set_resample_cache(None)
+    ts = TimeSeriesData(raw=raw, var_type="energy", var_unit="kWh", time_alignment="datetime")
+    ts.resample(time_step_h=1.0, simulation_end_h=24)
+    assert default_cache.hits + default_cache.misses == 0
+    assert np.allclose(ts.data[:24], raw.values[:24])
@@ -0,0 +1,127 @@
+import pytest
+import numpy as np
+import pandas as pd
+from energy_system_control.sim.results import SimulationResults
+from energy_system_control.sim.result_store import ResultStore
+from energy_system_control.sim.simulation_data import SimulationData
+from energy_system_control.core.registry import SignalRegistry
+
+
+def make_results(scale: float, time_steps: int = 96):
+    """Create a SimulationResults object whose signals are proportional to ``scale``."""
+    registry_ports = SignalRegistry()
+    registry_ports.register("grid", "electricity")
+    registry_controllers = SignalRegistry()
+    registry_controllers.register("controller", "heat_pump")
+    registry_sensors = SignalRegistry()
+    registry_sensors.register("temperature_sensor", "")
+    registry_sensors.register("soc_sensor", "")
+    data = SimulationData()
+    data.ports = np.ones((time_steps, 1), dtype=np.float32) * scale
+    data.controllers = np.zeros((time_steps, 1), dtype=np.float32)
+    data.sensors = np.zeros((time_steps, 2), dtype=np.float32)
+    data.sensors[:, 0] = np.linspace(0, 1, time_steps) * scale
+    data.sensors[:, 1] = 0.5
+    return SimulationResults(
+        data=data,
+        time_step=900,
+        time_vector=np.arange(0, 900 * time_steps, 900),
+        signal_registry_ports=registry_ports,
+        signal_registry_controllers=registry_controllers,
+        signal_registry_sensors=registry_sensors)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultStore(str(tmp_path / "store"))
+    for scale in [1.0, 2.0, 3.0, 4.0]:
+        store.append(make_results(scale),
+                     parameters={"scale": scale, "group": "a" if scale < 3 else "b"},
+                     kpis={"E_grid": lambda r: r.get_cumulated_electricity("grid"), "constant": 1.0},
+                     signals=["temperature_sensor", "grid:electricity"])
+    return store
+
+
+def test_append_assigns_run_ids(store):
+    assert store.n_runs == 4
+    assert list(store.runs.index) == [0, 1, 2, 3]
+    assert list(store.parameters.columns) == ["scale", "group"]
+    assert list(store.kpis.columns) == ["E_grid", "constant"]
+
+
+def test_kpis_from_callables(store):
+    # 1 kW for 24 hours, times the scale
+    assert np.allclose(store.kpis["E_grid"].values, [24.0, 48.0, 72.0, 96.0])
+
+
+def test_lazy_signal_loading(store):
+    signal = store.get_signal("temperature_sensor")
+    assert isinstance(signal, np.memmap)
+    assert signal.shape == (4, 96)
+    assert np.isclose(store.get_signal("temperature_sensor", 2)[-1], 3.0)
+    assert store.get_signal("grid:electricity", [0, 3]).shape == (2, 96)
+
+
+def test_signal_dataframe(store):
+    df = store.get_signal_dataframe("temperature_sensor", run_ids=[1, 2])
+    assert list(df.columns) == [1, 2]
+    assert df.index[-1] == pytest.approx(23.75)
+
+
+def test_aggregate_signal_is_chunk_independent(store):
+    full = store.aggregate_signal("temperature_sensor", how="max")
+    chunked = store.aggregate_signal("temperature_sensor", how="max", chunk_size=1)
+    assert np.allclose(full.values, [1.0, 2.0, 3.0, 4.0])
+    assert np.allclose(full.values, chunked.values)
+    integral = store.aggregate_signal("grid:electricity", how="integral", time_interval_h=(0, 12))
+    assert np.allclose(integral.values, [12.0, 24.0, 36.0, 48.0])
+
+
+def test_aggregate_signal_invalid_method(store):
+    with pytest.raises(ValueError):
+        store.aggregate_signal("temperature_sensor", how="median_of_means")
+
+
+def test_kpi_table(store):
+    table = store.kpi_table(index="group", values="E_grid")
+    assert table.loc["a", "E_grid"] == pytest.approx(36.0)
+    assert table.loc["b", "E_grid"] == pytest.approx(84.0)
+    table = store.kpi_table(index="scale", values="temperature_sensor")
+    assert table.loc[2.0, "temperature_sensor"] == pytest.approx(1.0)
+
+
+def test_reopen_store(store):
+    reopened = ResultStore(store.path)
+    assert reopened.n_runs == 4
+    assert reopened.signal_names == ["temperature_sensor", "grid:electricity"]
+    assert np.allclose(reopened.get_signal("temperature_sensor"), store.get_signal("temperature_sensor"))
+    reopened.append(make_results(5.0), parameters={"scale": 5.0})
+    assert reopened.get_signal("temperature_sensor").shape == (5, 96)
+
+
+def test_runs_table_is_appended_row_by_row(store, monkeypatch):
+    written_rows = []
+    to_csv = pd.DataFrame.to_csv
+
+    def counted(self, *args, **kwargs):
+        written_rows.append(len(self))
+        return to_csv(self, *args, **kwargs)
+    monkeypatch.setattr(pd.DataFrame, "to_csv", counted)
+    for scale in [5.0, 6.0]:
+        store.append(make_results(scale), parameters={"scale": scale, "group": "c"}, kpis={"constant": 1.0})
+    assert written_rows == [1, 1]  # The existing runs are not rewritten
+    store.append(make_results(7.0), parameters={"scale": 7.0, "seed": 1})
+    assert written_rows[-1] == 7  # A new column rewrites the table
+    reopened = ResultStore(store.path)
+    pd.testing.assert_frame_equal(reopened.runs, store.runs, check_dtype=False)
+    assert reopened.runs["seed"].isna().sum() == 6 and reopened.runs.loc[4, "group"] == "c"
+
+
+def test_inconsistent_runs_are_rejected(store):
+    with pytest.raises(ValueError):
+        store.append(make_results(1.0, time_steps=48))
+    with pytest.raises(ValueError):
+        store.append(make_results(1.0), signals=["soc_sensor"])
+    with pytest.raises(KeyError):
+        ResultStore(store.path + "_new").append(make_results(1.0), signals=["missing_sensor"])
+    assert store.n_runs == 4
@@ -362,6 +362,30 @@ class TestGetDHWTemperatureComfortIndex:
         pass
 
 
+class TestBulkSignalLookup:
+    """Test the bulk lookup of several signals at once."""
+
+    def test_get_sensor_values(self, simulation_results, simulation_data):
+        values = simulation_results.get_sensor_values(["soc_sensor", "temperature_sensor"])
+        assert values.shape == (96, 2)
+        assert np.allclose(values[:, 0], simulation_data.sensors[:, 1])
+        assert np.allclose(values[:, 1], simulation_data.sensors[:, 0])
+
+    def test_get_port_values(self, simulation_results, simulation_data):
+        values = simulation_results.get_port_values([("grid", "electricity"), ("pv_panel", "electricity")])
+        assert np.allclose(values, simulation_data.ports[:, [2, 0]])
+
+    def test_unknown_signal(self, simulation_results):
+        with pytest.raises(KeyError):
+            simulation_results.get_sensor_values(["temperature_sensor", "missing_sensor"])
+
+    def test_registry_rejects_duplicates(self, signal_registry_sensors):
+        with pytest.raises(ValueError):
+            signal_registry_sensors.register("temperature_sensor", "")
+        assert ("soc_sensor", "") in signal_registry_sensors
+        assert ("soc_sensor", "x") not in signal_registry_sensors
+
+
 class TestIntegration:
     """Integration tests for multiple methods."""
     
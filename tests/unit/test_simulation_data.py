@@ -0,0 +1,211 @@
+import os
+import pytest
+import numpy as np
+from energy_system_control.sim.simulation_data import SimulationData, RunLengthSignal, SparseSignal
+from energy_system_control.core.registry import SignalRegistry
+
+
+N_STEPS = 96
+
+
+@pytest.fixture
+def registries():
+    """Create registries using every kind of storage policy."""
+    registry_ports = SignalRegistry()
+    registry_ports.register("pv", "electricity")
+    registry_ports.register("tank", "mass", "sparse")
+    registry_ports.register("tank", "temperature", "float64")
+    registry_controllers = SignalRegistry()
+    registry_controllers.register("controller", "heat_pump", "rle")
+    registry_controllers.register("controller", "heater", "int8")
+    registry_sensors = SignalRegistry()
+    registry_sensors.register("temperature_sensor", "")
+    return registry_ports, registry_controllers, registry_sensors
+
+
+@pytest.fixture
+def expected():
+    """Reference signals, one per column"""
+    t = np.arange(N_STEPS)
+    return {
+        ("ports", 0): np.sin(t / 10).astype(np.float32),
+        ("ports", 1): np.where(t % 10 == 0, 0.2, 0.0),
+        ("ports", 2): 320.0 + t / 7,
+        ("controllers", 0): (t // 24 % 2).astype(float),
+        ("controllers", 1): (t % 3 == 0).astype(float),
+        ("sensors", 0): np.cos(t / 10),
+    }
+
+
+@pytest.fixture
+def recorded_data(registries, expected):
+    data = SimulationData()
+    data.create_empty_datasets(np.arange(N_STEPS) * 900.0, *registries)
+    for time_id in range(N_STEPS):
+        for (category, col), signal in expected.items():
+            data.record(category, time_id, col, signal[time_id])
+    return data
+
+
+def test_record_rows(registries, expected):
+    data = SimulationData()
+    data.create_empty_datasets(np.arange(N_STEPS) * 900.0, *registries)
+    for category in ("ports", "controllers", "sensors"):
+        block = np.column_stack([signal for (signal_category, _), signal in expected.items() if signal_category == category])
+        data.record_rows(category, 0, block[:40])
+        data.record_rows(category, 40, block[40:])
+    for (category, col), signal in expected.items():
+        assert np.allclose(data.get_signal(category, col), signal, atol=1e-5)
+
+
+def test_round_trip(recorded_data, expected):
+    for (category, col), signal in expected.items():
+        assert np.allclose(recorded_data.get_signal(category, col), signal, atol=1e-5)
+
+
+def test_dtypes(recorded_data):
+    assert recorded_data.ports.dtype == np.float32
+    assert recorded_data.ports.shape == (N_STEPS, 1)  # Only the float32 column is stored in the main array
+    assert recorded_data.get_signal("ports", 2).dtype == np.float64
+    assert recorded_data.get_signal("controllers", 1).dtype == np.int8
+    assert recorded_data.controllers.shape == (N_STEPS, 0)
+
+
+def test_encoded_signals_reduce_memory(recorded_data):
+    rle = recorded_data.encoded_signals["controllers"][0]
+    sparse = recorded_data.encoded_signals["ports"][1]
+    assert len(rle.starts) == 4
+    assert len(sparse.indices) == 10
+    dense_nbytes = 6 * N_STEPS * 4
+    assert recorded_data.nbytes < dense_nbytes
+
+
+def test_to_dataframe_decodes_signals(recorded_data, registries, expected):
+    df_ports, df_controllers, df_sensors = recorded_data.to_dataframe(np.arange(N_STEPS) * 900.0, *registries)
+    assert list(df_ports.columns) == ["pv:electricity", "tank:mass", "tank:temperature"]
+    assert np.allclose(df_ports["tank:mass"].values, expected[("ports", 1)])
+    assert np.allclose(df_controllers["controller:heat_pump"].values, expected[("controllers", 0)])
+    assert df_sensors.shape == (N_STEPS, 1)
+
+
+def test_run_length_signal_handles_nan():
+    signal = RunLengthSignal(5)
+    for time_id, value in enumerate([np.nan, np.nan, 1.0, 1.0, np.nan]):
+        signal.record(time_id, value)
+    assert signal.starts == [0, 2, 4]
+    assert np.allclose(signal.decode(), [np.nan, np.nan, 1.0, 1.0, np.nan], equal_nan=True)
+    assert np.isnan(RunLengthSignal(3).decode()).all()
+
+
+def test_sparse_signal_keeps_nan():
+    signal = SparseSignal(4)
+    for time_id, value in enumerate([0.0, np.nan, 2.0, 0.0]):
+        signal.record(time_id, value)
+    assert np.allclose(signal.decode(), [0.0, np.nan, 2.0, 0.0], equal_nan=True)
+
+
+def test_unknown_policy(registries):
+    registry_ports, registry_controllers, registry_sensors = registries
+    registry_sensors.set_storage("temperature_sensor", "", "float16")
+    with pytest.raises(ValueError):
+        SimulationData().create_empty_datasets(np.arange(N_STEPS), registry_ports, registry_controllers, registry_sensors)
+
+
+def test_encoded_signals_decode_to_their_dtype():
+    signal = RunLengthSignal(4, np.float64)
+    signal.record(1, 0.1)
+    decoded = signal.decode()
+    assert decoded.dtype == np.float64
+    assert np.isnan(decoded[0]) and decoded[1] == 0.1
+    sparse = SparseSignal(3, np.int8)
+    sparse.record(2, 5)
+    assert sparse.decode().dtype == np.int8
+    assert list(sparse.decode()) == [0, 0, 5]
+
+
+def test_encoded_policy_with_dtype(registries):
+    registry_ports, registry_controllers, registry_sensors = registries
+    registry_sensors.set_storage("temperature_sensor", "", "rle:float64")
+    data = SimulationData()
+    data.create_empty_datasets(np.arange(N_STEPS), registry_ports, registry_controllers, registry_sensors)
+    data.record("sensors", 0, 0, 0.1)
+    assert data.get_signal("sensors", 0).dtype == np.float64
+    assert data.get_signal("sensors", 0)[0] == 0.1
+
+
+@pytest.mark.parametrize("policy", ["int8", "bool", "sparse:int16"])
+def test_nullable_signals_reject_integer_policies(registries, policy):
+    registry_ports, registry_controllers, registry_sensors = registries
+    registry_sensors.set_storage("temperature_sensor", "", policy)
+    with pytest.raises(ValueError):
+        SimulationData().create_empty_datasets(np.arange(N_STEPS), registry_ports, registry_controllers, registry_sensors)
+
+
+def test_unrecorded_rows_are_missing(registries):
+    data = SimulationData()
+    data.create_empty_datasets(np.arange(N_STEPS), *registries)
+    assert np.isnan(data.get_signal("ports", 2)).all()
+    assert (data.get_signal("controllers", 1) == 0).all()
+
+
+def test_get_signal_with_dense_arrays():
+    data = SimulationData()
+    data.sensors = np.arange(6, dtype=np.float32).reshape(3, 2)
+    assert np.allclose(data.get_signal("sensors", 1), [1, 3, 5])
+
+
+def build_environment(signal_storage=None):
+    import energy_system_control as esc
+    from energy_system_control.components.explicit_components.demands import HotWaterDemand
+    path = os.path.join(os.path.dirname(esc.__file__), 'data', 'DHW_profiles_IEA.csv')
+    components = [
+        HotWaterDemand.from_csv(name='dhw', time_alignment='daily', path=path, column_name='M'),
+        esc.HotWaterStorage(name='tank', tank_volume=200, T_0=55),
+        esc.HeatPumpLorentzEfficiency(name='hp', Qdot_design=2.0, COP_design=3.0),
+        esc.ElectricityGrid('grid'),
+        esc.ColdWaterGrid('water', 'fluid'),
+    ]
+    connections = [('dhw_fluid_port', 'tank_hot_water_output_port'),
+                   ('hp_heat_output_port', 'tank_main_heat_input_port'),
+                   ('hp_electricity_input_port', 'grid_electricity_port'),
+                   ('tank_cold_water_input_port', 'water_fluid_port')]
+    return esc.Environment(components=components,
+                           sensors=[esc.TankTemperatureSensor('T', 'tank')],
+                           controllers=[esc.HeaterControllerWithBandwidth('c', 'hp', 'T', 45, 10)],
+                           connections=connections,
+                           signal_storage=signal_storage)
+
+
+def test_environment_storage_policies():
+    import energy_system_control as esc
+    env = build_environment(signal_storage={'T': 'float64', 'grid_electricity_port:electricity': 'rle'})
+    cfg = esc.SimulationConfig(simulation_end_h=12, time_step_h=0.25)
+    results = esc.Simulator(env, cfg).run()
+    registry = env.signal_registry_ports
+    assert registry.storage(registry.col_index('water_fluid_port', 'mass')) == 'sparse'
+    assert registry.storage(registry.col_index('grid_electricity_port', 'electricity')) == 'rle'
+    assert env.signal_registry_controllers.storage(0) == 'rle'
+    assert results.data.get_signal('sensors', 0).dtype == np.float64
+    # Running again does not duplicate the registered signals
+    n_columns = len(registry._col_to_key)
+    esc.Simulator(env, cfg).run()
+    assert len(env.signal_registry_ports._col_to_key) == n_columns
+    df_ports, _, _ = results.to_dataframe()
+    assert df_ports.columns.is_unique
+
+
+def test_environment_unknown_storage_override():
+    import energy_system_control as esc
+    env = build_environment(signal_storage={'missing_sensor': 'rle'})
+    with pytest.raises(KeyError):
+        esc.Simulator(env, esc.SimulationConfig(simulation_end_h=1, time_step_h=0.25)).run()
+
+
+def test_get_signals_bulk(recorded_data, registries, expected):
+    registry_ports = registries[0]
+    cols = registry_ports.col_indices([("tank", "temperature"), ("pv", "electricity")])
+    assert list(cols) == [2, 0]
+    values = recorded_data.get_signals("ports", cols)
+    assert values.shape == (N_STEPS, 2)
+    assert np.allclose(values[:, 0], expected[("ports", 2)])
+    assert np.allclose(values[:, 1], expected[("ports", 0)])
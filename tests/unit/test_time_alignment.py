@@ -0,0 +1,59 @@
+import pytest
+import numpy as np
+import pandas as pd
+from energy_system_control.helpers import align_timestamps, _find_simulation_start_matching_index
+
+
+@pytest.fixture
+def leap_year_index():
+    return pd.date_range("2020-01-01", "2020-12-31 23:00", freq="h")
+
+
+def test_yearly_alignment_matches_timestamp_replace():
+    index = pd.date_range("2019-01-01", periods=8760, freq="h")
+    start = pd.Timestamp("2023-05-17 13:00")
+    expected = pd.DatetimeIndex([t.replace(year=2023) for t in index])
+    assert np.array_equal(align_timestamps(index, start, "yearly"), expected.to_numpy())
+    assert _find_simulation_start_matching_index(index, start, "yearly") == pd.Timestamp("2019-05-17 13:00")
+
+
+def test_yearly_alignment_with_leap_day(leap_year_index):
+    # Leap-year data in a non-leap simulation year: February 29 is mapped to February 28
+    aligned = pd.DatetimeIndex(align_timestamps(leap_year_index, pd.Timestamp("2023-01-01"), "yearly"))
+    assert aligned[leap_year_index.get_loc(pd.Timestamp("2020-02-29 10:00"))] == pd.Timestamp("2023-02-28 10:00")
+    match = _find_simulation_start_matching_index(leap_year_index, pd.Timestamp("2023-02-28 10:00"), "yearly")
+    assert match == pd.Timestamp("2020-02-28 10:00")  # The first of the equivalent timestamps is used
+    match = _find_simulation_start_matching_index(leap_year_index, pd.Timestamp("2023-03-01"), "yearly")
+    assert match == pd.Timestamp("2020-03-01")
+    # Leap-year simulation
+    match = _find_simulation_start_matching_index(leap_year_index, pd.Timestamp("2024-02-29 05:00"), "yearly")
+    assert match == pd.Timestamp("2020-02-29 05:00")
+
+
+def test_daily_alignment_with_multiple_days():
+    index = pd.date_range("2020-01-01", periods=72, freq="h")
+    match = _find_simulation_start_matching_index(index, pd.Timestamp("2023-07-04 06:10"), "daily")
+    assert match == pd.Timestamp("2020-01-01 06:00")
+
+
+@pytest.mark.parametrize("method, expected", [("nearest", "2020-01-01 06:00"), ("forward", "2020-01-01 07:00")])
+def test_match_methods(method, expected):
+    index = pd.date_range("2020-01-01", periods=24, freq="h")
+    match = _find_simulation_start_matching_index(index, pd.Timestamp("2020-01-01 06:20"), "datetime", match_method=method, tolerance=pd.Timedelta(hours=1))
+    assert match == pd.Timestamp(expected)
+
+
+def test_no_match_within_tolerance():
+    index = pd.date_range("2020-01-01", periods=24, freq="h")
+    with pytest.raises(ValueError):
+        _find_simulation_start_matching_index(index, pd.Timestamp("2020-01-01 06:20"), "datetime", match_method="exact")
+    with pytest.raises(ValueError):
+        _find_simulation_start_matching_index(index, pd.Timestamp("2020-01-05"), "datetime")
+    with pytest.raises(ValueError):
+        align_timestamps(index, pd.Timestamp("2020-01-01"), "weekly")
+
+
+def test_timezone_aware_index():
+    index = pd.date_range("2020-01-01", periods=24, freq="h", tz="Europe/Rome")
+    match = _find_simulation_start_matching_index(index, pd.Timestamp("2021-06-01 08:00"), "daily")
+    assert match == pd.Timestamp("2020-01-01 08:00", tz="Europe/Rome")
@@ -0,0 +1,80 @@
+import pytest
+import numpy as np
+import pandas as pd
+import energy_system_control as esc
+from energy_system_control.sim.typical_periods import TypicalPeriodSimulator, cluster_periods, error_report, k_medoids
+
+N_DAYS = 28
+
+
+def daily_profiles():
+    # Four kinds of days, and one day with a much higher demand
+    rng = np.random.default_rng(0)
+    hours = np.arange(24)
+    shapes = [0.5 + 0.4 * np.sin(hours * 2 * np.pi / 24 + phase) for phase in (0, 1.5, 3, 4.5)]
+    days = [shapes[day % 4] * (1 + 0.02 * rng.normal(size=24)) for day in range(N_DAYS)]
+    days[17] = 3 * shapes[1]
+    index = pd.date_range("2025-01-01", periods=24 * N_DAYS, freq="h")
+    return pd.Series(np.concatenate(days), index=index)
+
+
+def build_system(**env_kwargs):
+    tank = esc.HotWaterStorage('tank', tank_volume=200, T_0=50)
+    return esc.Environment(
+        components=[esc.HotWaterDemand.from_dataframe('dhw', daily_profiles(), time_alignment='datetime'), tank,
+                    esc.HeatPumpLorentzEfficiency(name='hp', Qdot_design=2.0, COP_design=3.2),
+                    esc.ElectricityGrid('grid'), esc.ColdWaterGrid('water', 'fluid')],
+        sensors=[esc.TankTemperatureSensor('T', 'tank')],
+        controllers=[esc.HeaterControllerWithBandwidth('c', 'hp', 'T', 45, 5)],
+        connections=[('dhw_fluid_port', 'tank_hot_water_output_port'), ('hp_heat_output_port', 'tank_main_heat_input_port'),
+                     ('hp_electricity_input_port', 'grid_electricity_port'), ('tank_cold_water_input_port', 'water_fluid_port')],
+        **env_kwargs)
+
+
+def test_k_medoids_finds_separated_clusters():
+    rng = np.random.default_rng(1)
+    centers = np.array([[0.0, 0.0], [10.0, 0.0], [0.0, 10.0]])
+    X = np.vstack([center + rng.normal(scale=0.5, size=(20, 2)) for center in centers])
+    medoids, labels = k_medoids(X, 3, rng=rng)
+    assert len(set(labels[:20])) == len(set(labels[20:40])) == len(set(labels[40:])) == 1
+    assert len(set(labels)) == 3
+    assert all(labels[medoid] == cluster for cluster, medoid in enumerate(medoids))
+
+
+def test_extreme_periods_are_preserved():
+    series = {"dhw": daily_profiles().to_numpy()}
+    periods = cluster_periods(series, steps_per_period=24, n_periods=5, extreme_periods={"dhw": "max"}, rng=np.random.default_rng(0))
+    assert 17 in periods.medoids
+    assert periods.weights[list(periods.medoids).index(17)] == 1
+    assert periods.weights.sum() == N_DAYS
+    assert np.all(np.diff(periods.medoids) > 0)  # Chronological order
+    with pytest.raises(ValueError):
+        cluster_periods(series, steps_per_period=24, n_periods=1, extreme_periods={"dhw": "max"})
+
+
+def test_typical_period_simulation_matches_full_run():
+    cfg = esc.SimulationConfig(simulation_end_h=24 * N_DAYS, time_step_h=0.25)
+    reference = esc.Simulator(build_system(), cfg).run()
+    simulator = TypicalPeriodSimulator(build_system(), cfg, n_periods=5, extreme_periods={"dhw": "max"})
+    typical = simulator.run()
+    assert len(simulator.typical_periods.simulated_steps) == 5 * 96
+    assert len(typical.time_vector) == len(reference.time_vector)
+    report = error_report(reference, typical, {"E_hp": lambda r: r.get_cumulated_electricity('hp_electricity_input_port'),
+                                               "T_mean": lambda r: r.get_sensor_values(['T']).mean()})
+    assert list(report.columns) == ["reference", "typical", "error", "relative_error"]
+    assert (report["relative_error"].abs() < 0.1).all()
+
+
+def test_reconstruction_keeps_the_storage_policies():
+    cfg = esc.SimulationConfig(simulation_end_h=24 * N_DAYS, time_step_h=0.25)
+    reference = esc.Simulator(build_system(signal_storage={'T': 'float64'}), cfg).run()
+    typical = TypicalPeriodSimulator(build_system(signal_storage={'T': 'float64'}), cfg, n_periods=5).run()
+    assert typical.data.layouts == reference.data.layouts
+    assert typical.data.layouts["controllers"][0][0] == "rle"
+    assert typical.get_sensor_values(['T']).dtype == np.float64
+
+
+def test_horizon_must_be_made_of_whole_periods():
+    cfg = esc.SimulationConfig(simulation_end_h=30, time_step_h=0.25)
+    with pytest.raises(ValueError):
+        TypicalPeriodSimulator(build_system(), cfg, n_periods=1).run()
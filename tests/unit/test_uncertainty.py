@@ -0,0 +1,70 @@
+import pytest
+import numpy as np
+import pandas as pd
+from energy_system_control import ElectricityDemand
+from energy_system_control.core.base_classes import InitContext
+from energy_system_control.uncertainty import AR1GaussianUncertainty, GaussianUncertainty, UniformUncertainty, UncertaintyModel
+
+
+@pytest.mark.parametrize("model", [
+    GaussianUncertainty(sigma=0.2, mode="multiplicative", clip_min=0.0),
+    UniformUncertainty(half_width=0.5),
+    AR1GaussianUncertainty(sigma=0.3, rho=0.8, clip_max=1.5),
+])
+def test_bulk_generation_matches_step_by_step(model):
+    values = np.linspace(0.0, 2.0, 50)
+    rng = np.random.default_rng(3)
+    expected = [model.apply(value, rng=rng) for value in values]
+    model.reset()
+    assert np.allclose(model.apply_array(values, rng=np.random.default_rng(3)), expected)
+
+
+
+class ScaledUncertainty(UncertaintyModel):
+    # User-defined model implementing apply only
+    def apply(self, value, *, rng):
+        return value * rng.uniform(0.5, 1.5)
+
+
+def test_models_without_sample_are_applied_value_by_value():
+    model = ScaledUncertainty()
+    values = np.linspace(0.0, 2.0, 50).reshape(25, 2)
+    rng = np.random.default_rng(3)
+    expected = np.array([model.apply(value, rng=rng) for value in values.ravel()]).reshape(values.shape)
+    assert np.array_equal(model.apply_array(values, rng=np.random.default_rng(3)), expected)
+    demand = _demand_data(seed=1, uncertainty_model=model)  # Initializing a demand used to fail with NotImplementedError
+    assert np.all((0.5 <= demand.data) & (demand.data <= 1.5)) and np.std(demand.data) > 0.1
+
+
+def test_ar1_trajectories():
+    model = AR1GaussianUncertainty(sigma=1.0, rho=0.9)
+    eps = model.sample((20_000, 3), rng=np.random.default_rng(0))
+    assert eps.shape == (20_000, 3)
+    # Stationary variance and lag-one correlation of the process
+    assert np.allclose(eps.var(axis=0), 1 / (1 - 0.9**2), rtol=0.15)
+    assert np.allclose([np.corrcoef(eps[1:, i], eps[:-1, i])[0, 1] for i in range(3)], 0.9, atol=0.02)
+    # A new trajectory continues from the end of the previous one, unless the model is reset
+    assert np.allclose(model._eps_prev, eps[-1])
+    model.reset()
+    assert np.array_equal(model.sample(10, rng=np.random.default_rng(1)), AR1GaussianUncertainty(sigma=1.0, rho=0.9).sample(10, rng=np.random.default_rng(1)))
+
+
+def _demand_data(seed, name="demand", uncertainty_seed=None, uncertainty_model=GaussianUncertainty(sigma=0.1)):
+    index = pd.date_range("2023-01-01", periods=24, freq="h")
+    demand = ElectricityDemand.from_dataframe(name, pd.Series(np.ones(24), index=index), time_alignment="daily",
+                                              uncertainty_model=uncertainty_model, uncertainty_seed=uncertainty_seed)
+    demand.resample_data(time_step_h=0.5, simulation_end_h=48, simulation_start_datetime=None)
+    demand.initialize(InitContext(environment=None, state=None, config={"seed": seed}))
+    return demand
+
+
+def test_demand_uncertainty_is_pregenerated_and_reproducible():
+    demand = _demand_data(seed=7)
+    assert len(demand.data) == len(demand.ts.data)
+    assert np.allclose(np.asarray(demand.ts.data), 1.0)  # The nominal data (e.g. for the predictors) is not changed
+    assert np.std(demand.data) > 0.05
+    assert np.array_equal(demand.data, _demand_data(seed=7).data)
+    assert not np.array_equal(demand.data, _demand_data(seed=8).data)
+    # Each component has its own stream, and its own seed takes precedence over the one of the simulation
+    assert not np.array_equal(demand.data, _demand_data(seed=7, name="other_demand").data)
+    assert np.array_equal(_demand_data(seed=1, uncertainty_seed=5).data, _demand_data(seed=2, uncertainty_seed=5).data)